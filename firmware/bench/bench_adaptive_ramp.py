@@ -0,0 +1,106 @@
+"""
+Current aware ramp benchmark, time to target and peak current against the fixed rate.
+
+Ramps the simulated motor through MotorControl with the executive and the ramp timer
+running like on the device, once at the fixed ramp rate and once paced from the current
+by set_ramp_current_limit(). Three cases per target voltage: starting from rest, stepping
+up from a lower voltage with the motor already spinning, and ramping back down. Reports
+each ramp's time to target and the peak supply current seen while it ran, polled from the
+simulated motor well above the current sampling rate. The fixed rate draws more inrush
+than the over-current trip allows, so its start-up allowance is raised for those runs.
+Either fails if the motor trips part way.
+
+Fails if a current paced ramp peaks more than --tolerance-pct over the limit. The
+tolerance covers the INA219 noise and a 50mV DAC step's worth of current that the pacing
+can't see coming.
+
+Usage:
+
+    python firmware/bench/bench_adaptive_ramp.py [--limit-ma 2000] [--targets 1000 2000 3000]
+"""
+
+import argparse
+import time
+
+from benchlib import sim
+
+
+def _ramp(board, motor, direction, target_mv, timeout_s=5.0):
+    """Ramp to target_mv, returns (ramp ms, peak mA) once the motor is there"""
+    peak = 0.0
+    motor.set_state(direction, target_mv)
+    end = time.perf_counter() + timeout_s
+    while motor.in_transition():
+        if time.perf_counter() > end:
+            raise RuntimeError(f"Ramp to {target_mv}mV timed out")
+        peak = max(peak, board.motor.supply()[1])
+        time.sleep(0.0001)
+    if motor.trip_reason:
+        raise RuntimeError(
+            f"Ramp to {target_mv}mV tripped on {motor.TRIP_NAMES[motor.trip_reason]}"
+        )
+    return motor.get_last_ramp_ms(), peak
+
+
+def _settle(board, seconds=1.0):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        board.motor.advance()
+        time.sleep(0.01)
+
+
+def _run(limit_ma, targets, low_mv):
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    motor = fw.motor
+    motor.set_ramp_current_limit(limit_ma)
+    if limit_ma is None:
+        fw.trip.inrush_ma = 1 << 16  # The baseline isn't held under any limit
+    fw.executive.start()
+    rows = []
+    try:
+        for target in targets:
+            rest = _ramp(board, motor, motor.MOTOR_FORWARD, target)
+            _settle(board)
+            down = _ramp(board, motor, motor.MOTOR_FORWARD, low_mv)
+            _settle(board)
+            up = _ramp(board, motor, motor.MOTOR_FORWARD, target)
+            motor.set_state(motor.MOTOR_BRAKE, motor.VOLTAGE_MIN_MV)
+            _ramp(board, motor, motor.MOTOR_BRAKE, motor.VOLTAGE_MIN_MV)
+            _settle(board, 0.5)
+            rows.append((target, rest, up, down))
+    finally:
+        fw.executive.stop()
+        board.stop()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--limit-ma", type=int, default=2000)
+    parser.add_argument("--low-mv", type=int, default=1000)
+    parser.add_argument("--targets", type=int, nargs="*", default=[1500, 2000, 2500, 3000])
+    parser.add_argument("--tolerance-pct", type=float, default=5)
+    args = parser.parse_args()
+
+    for name, limit in (("fixed", None), (f"current {args.limit_ma}mA", args.limit_ma)):
+        print(f"{name}:")
+        print("    target_mv  rest_ms  rest_peak_ma  up_ms  up_peak_ma  down_ms")
+        for target, rest, up, down in _run(limit, args.targets, args.low_mv):
+            print(
+                f"    {target:9} {rest[0]:8.1f} {rest[1]:13.0f} {up[0]:6.1f} "
+                f"{up[1]:11.0f} {down[0]:8.1f}"
+            )
+            if limit is not None:
+                allowed = limit * (1 + args.tolerance_pct / 100)
+                peak = max(rest[1], up[1])
+                if peak > allowed:
+                    raise RuntimeError(
+                        f"Paced ramp to {target}mV peaked at {peak:.0f}mA, "
+                        f"over {allowed:.0f}mA"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Brake benchmark, time a direction reversal spends braking before the motor moves off.
+
+Reverses the simulated motor a number of times at speed with the executive running like on
+the device, once braking for the fixed brake_time and once ending the brake when the RPM
+sensor confirms the rotor has stopped. Reports each direction change's brake wait, the
+whole reversal from set_state() to running at speed again, and the rotor speed when the
+DRV8837 was switched to the new direction, which should be 0.
+
+Usage:
+
+    python firmware/bench/bench_brake.py [--reversals 5] [--voltage-mv 3000] [--spin-ms 1000]
+"""
+
+import argparse
+import time
+
+from benchlib import sim
+
+
+def _wait(motor, timeout_s=10):
+    end = time.perf_counter() + timeout_s
+    while motor.in_transition():
+        if time.perf_counter() > end:
+            raise RuntimeError("Motor never finished its transition")
+        time.sleep(0.001)
+
+
+def _run(confirmed, reversals, voltage_mv, spin_ms):
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    motor = fw.motor
+    if not confirmed:
+        motor.brake_min_ms = motor.brake_time_ms  # Fixed brake time, as before
+    switch_rpm = []
+    for name in ("forward", "reverse"):
+        drive = getattr(fw.drv, name)
+
+        def switched(drive=drive):
+            switch_rpm.append(abs(board.motor.rpm))
+            drive()
+
+        setattr(fw.drv, name, switched)
+
+    fw.executive.start()
+    reversal_ms = []
+    brake_ms = []
+    try:
+        motor.set_state(motor.MOTOR_FORWARD, voltage_mv)
+        _wait(motor)
+        switch_rpm.clear()
+        direction = motor.MOTOR_REVERSE
+        for _ in range(reversals):
+            time.sleep(spin_ms / 1000)
+            start = time.perf_counter()
+            motor.set_state(direction, voltage_mv)
+            _wait(motor)
+            reversal_ms.append((time.perf_counter() - start) * 1000)
+            brake_ms.append(motor.get_last_brake_ms())
+            if direction == motor.MOTOR_REVERSE:
+                direction = motor.MOTOR_FORWARD
+            else:
+                direction = motor.MOTOR_REVERSE
+        motor.set_state(motor.MOTOR_BRAKE, motor.VOLTAGE_MIN_MV)
+        _wait(motor)
+    finally:
+        fw.executive.stop()
+        board.stop()
+    return motor, brake_ms, reversal_ms, switch_rpm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reversals", type=int, default=5)
+    parser.add_argument("--voltage-mv", type=int, default=3000)
+    parser.add_argument("--spin-ms", type=int, default=1000)
+    args = parser.parse_args()
+
+    for name, confirmed in (("fixed", False), ("confirmed", True)):
+        motor, brake_ms, reversal_ms, switch_rpm = _run(
+            confirmed, args.reversals, args.voltage_mv, args.spin_ms
+        )
+        print(f"{name} ({args.reversals} reversals at {args.voltage_mv}mV):")
+        print(f"    brake_ms                {' '.join(str(b) for b in brake_ms):>12}")
+        print(f"    brake_ms_mean           {sum(brake_ms) / len(brake_ms):12.1f}")
+        print(f"    reversal_ms_mean        {sum(reversal_ms) / len(reversal_ms):12.1f}")
+        print(f"    switch_rpm_max          {max(switch_rpm):12.0f}")
+        print(f"    brake_timeouts          {motor.brake_timeouts:12}")
+        motor.brake_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Break-in benchmark, runs a short break-in program and resets part way through.
+
+Runs a BreakIn on the simulated motor with the executive running like on the device,
+calling update() and save_checkpoint() from a loop at about the screen loop's rate. The
+30s step unit is scaled down so the program takes seconds. Part way through the engine
+is dropped without a pause, as a reset would, and a new one resumes from the checkpoint.
+Reports the program time redone after the reset against restarting the whole program,
+the current step's samples at the reset against those the checkpoint kept, each step's
+results, and the executive's per group rates while the program ran.
+
+Usage:
+
+    python firmware/bench/bench_break_in.py [--unit-ms 1000] [--reset-s 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchlib import sim
+
+import break_in
+from break_in import BreakIn, DIR_FWD, DIR_REV
+
+PROGRAM = [
+    [DIR_FWD, 15, 2, 1],
+    [DIR_REV, 15, 2, 1],
+    [DIR_FWD, 30, 2, 1],
+]
+
+
+def _drive(engine, until_s, timeout_s=120):
+    """Update the engine like the screen loop until it's done or until_s has passed"""
+    start = time.perf_counter()
+    end = start + (timeout_s if until_s is None else until_s)
+    while not engine.done():
+        if time.perf_counter() > end:
+            if until_s is None:
+                raise RuntimeError("Break-in timed out")
+            return
+        engine.update()
+        engine.save_checkpoint()
+        time.sleep(0.005)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--unit-ms", type=int, default=1000)
+    parser.add_argument("--reset-s", type=float, default=4)
+    args = parser.parse_args()
+
+    break_in.STEP_UNIT_MS = args.unit_ms
+    path = os.path.join(tempfile.mkdtemp(), "breakin.bin")
+
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    fw.executive.start()
+    try:
+        engine = BreakIn(fw.motor, PROGRAM, checkpoint_path=path, checkpoint_ms=500)
+        engine.start()
+        _drive(engine, args.reset_s)
+        at_reset_ms = engine.phase_done_ms
+        samples_at_reset = engine._samples
+        for i in range(engine.step):
+            at_reset_ms += engine.phase_ms(i, break_in.PHASE_RUN)
+            at_reset_ms += engine.phase_ms(i, break_in.PHASE_COOL)
+        if engine.phase == break_in.PHASE_COOL:
+            at_reset_ms += engine.phase_ms(phase=break_in.PHASE_RUN)
+
+        # Reset: the engine goes without a pause, the motor brakes on power up
+        del engine
+        fw.motor.set_state(fw.motor.MOTOR_BRAKE, fw.motor.VOLTAGE_MIN_MV)
+        engine = BreakIn(fw.motor, PROGRAM, checkpoint_path=path, checkpoint_ms=500)
+        if not engine.resumable():
+            raise RuntimeError("No checkpoint to resume from")
+        resumed_ms = engine.total_remaining_ms()
+        samples_resumed = engine._samples
+        engine.resume()
+        _drive(engine, None)
+    finally:
+        fw.executive.stop()
+        board.stop()
+
+    program_ms = sum((s[2] + s[3]) * args.unit_ms for s in PROGRAM)
+    redone_ms = resumed_ms - (program_ms - at_reset_ms)
+    print(f"program ({len(PROGRAM)} steps, {program_ms}ms):")
+    print(f"    progress_at_reset_ms    {at_reset_ms:12}")
+    print(f"    redone_after_resume_ms  {redone_ms:12}")
+    print(f"    redone_if_restarted_ms  {at_reset_ms:12}")
+    print(f"    step_samples_at_reset   {samples_at_reset:12}")
+    print(f"    step_samples_resumed    {samples_resumed:12}")
+    print(f"    checkpoint_left         {os.path.exists(path)!s:>12}")
+    engine.report()
+    fw.executive.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Motor characterisation benchmark, runs fitted per minute and how close the fit gets.
+
+Simulates runs of motors with known, randomly spread parameters: a ramp up to half
+voltage with its start up inrush, a settled hold, then the same up to full voltage. These
+are sampled every 10ms into telemetry log records with INA219-like quantisation and
+noise, the RPM as the logger sees it, a 1 pulse per rev edge count and the 100ms gated
+rate. telemetry_log.characterize fits them all and the recovered R, Kv and no load
+current are compared to the truth.
+
+Then checks the same against the real signal path: the simulated board runs the firmware
+with the executive and TelemetryLogger like on the device, through the same two steps,
+and the log files it writes are fitted against the sim motor's parameters. Needs NumPy.
+
+Usage:
+
+    python firmware/bench/bench_characterize.py [--motors 500] [--runs 4] [--seconds 5]
+        [--sim-runs 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchlib import sim
+
+import numpy as np
+
+import telemetry
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from telemetry_log import dtype_from_format, open_logs  # noqa: E402
+from telemetry_log.characterize import RPM_TO_RAD_S, characterize  # noqa: E402
+
+DTYPE = dtype_from_format(telemetry.RECORD_FORMAT, telemetry.RECORD_FIELDS)
+
+
+def _motors(count, rng):
+    """True parameters of count motors around a Mabuchi FA-130 at 3V"""
+    return {
+        "r_ohm": rng.uniform(1.2, 2.4, count),
+        "ke": rng.uniform(1.0e-3, 1.6e-3, count),  # V.s/rad, roughly 6000-9500 rpm/V
+        "i0_a": rng.uniform(0.10, 0.25, count),
+        "b_a_per_rad_s": rng.uniform(0.0, 2e-5, count),
+    }
+
+
+def _simulate(truth, runs, seconds, rng, volts=3.0, period_ms=10):
+    """One record array per run, every motor's runs simulated together a step at a time"""
+    r = np.repeat(truth["r_ohm"], runs)
+    ke = np.repeat(truth["ke"], runs)
+    i0 = np.repeat(truth["i0_a"], runs)
+    b = np.repeat(truth["b_a_per_rad_s"], runs)
+    n = len(r)
+    steps = int(seconds * 1000 // period_ms)
+    hold_steps = steps // 2  # Half at the half way voltage, then half at volts
+    ramp_steps = 25  # Up to each voltage in 0.25s
+    dt = period_ms / 1000
+    inertia = 8e-8  # kg.m^2, just the armature at this size
+
+    out = np.zeros((n, steps), dtype=DTYPE)
+    w = np.zeros(n)
+    revs = rng.uniform(0, 1, n)  # Sensor phase at the start
+    gate_start = np.zeros(n)
+    gate_rpm = np.zeros(n)
+    gate_ms = 100
+    for k in range(steps):
+        hold = k % hold_steps
+        low = 0.5 if k < hold_steps else volts / 2
+        high = volts / 2 if k < hold_steps else volts
+        v = low + (high - low) * min(1.0, hold / ramp_steps)
+        current = (v - ke * w) / r
+        # A few substeps, the mechanical time constant is shorter than a sample
+        for _ in range(10):
+            torque = ke * (current - i0 - b * w)
+            w = np.maximum(w + torque / inertia * dt / 10, 0.0)
+            current = (v - ke * w) / r
+            revs += w / (2 * np.pi) * dt / 10
+        edges = np.floor(revs)
+        if k * period_ms % gate_ms == 0:
+            gate_rpm = (edges - gate_start) * 60000 / gate_ms
+            gate_start = edges
+        row = out[:, k]
+        row["t_ms"] = k * period_ms
+        row["set_mv"] = v * 1000
+        row["bus_mv"] = np.round((v * 1000 + rng.normal(0, 4, n)) / 4) * 4  # 4mV LSB
+        row["current_ma"] = np.round(current * 1000 + rng.normal(0, 2, n))
+        row["rpm"] = gate_rpm
+        row["edges"] = edges.astype(np.int64) & 0xFFFF
+        row["direction"] = 2
+        row["flags"] = telemetry.FLAG_TRANSITION if hold < ramp_steps + 30 else 0
+    return out
+
+
+def _wait(motor, timeout_s=10):
+    end = time.perf_counter() + timeout_s
+    while motor.in_transition():
+        if time.perf_counter() > end:
+            raise RuntimeError("Motor never finished its transition")
+        time.sleep(0.001)
+
+
+def _sim_logs(runs, hold_s):
+    """
+    Log runs through the simulated firmware, each a step to half then full voltage,
+    returns the logs' records and the sim motor
+    """
+    board = sim.Board(log_dir=tempfile.mkdtemp())
+    board.start()
+    fw = board.build_firmware()
+    motor = fw.motor
+    fw.executive.start()
+    try:
+        for _ in range(runs):
+            fw.telemetry.start()
+            for voltage_mv in (motor.VOLTAGE_MAX_MV // 2, motor.VOLTAGE_MAX_MV):
+                motor.set_state(motor.MOTOR_FORWARD, voltage_mv)
+                end = time.perf_counter() + hold_s
+                while time.perf_counter() < end:
+                    time.sleep(0.05)
+                    fw.telemetry.flush()  # As the UI's idle points do
+            motor.set_state(motor.MOTOR_BRAKE, motor.VOLTAGE_MIN_MV)
+            _wait(motor)
+            fw.telemetry.stop()
+            time.sleep(0.5)
+    finally:
+        fw.executive.stop()
+        board.stop()
+    return [log.records for log in open_logs(board.log_dir)], board.motor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--motors", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=4, help="runs per motor")
+    parser.add_argument("--seconds", type=float, default=5.0, help="per run")
+    parser.add_argument("--sim-runs", type=int, default=3, help="through the firmware")
+    parser.add_argument("--sim-hold-s", type=float, default=3.0, help="per voltage")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    truth = _motors(args.motors, rng)
+    records = _simulate(truth, args.runs, args.seconds, rng)
+    motors = {
+        f"motor_{m:04d}": list(records[m * args.runs : (m + 1) * args.runs])
+        for m in range(args.motors)
+    }
+
+    start = time.perf_counter()
+    summary = characterize(motors)
+    elapsed = time.perf_counter() - start
+
+    def error(fitted, true):
+        return np.abs(fitted / true - 1) * 100
+
+    r_err = error(summary["r_ohm"], truth["r_ohm"])
+    kv_err = error(summary["kv_rpm_per_v"], 1 / (truth["ke"] * RPM_TO_RAD_S))
+    i0_err = error(summary["i0_ma"], truth["i0_a"] * 1000)
+    runs = args.motors * args.runs
+
+    print(f"{args.motors} motors x {args.runs} runs of {args.seconds}s:")
+    print(f"    fit_ms                  {elapsed * 1000:12.1f}")
+    print(f"    runs_per_minute         {runs / elapsed * 60:12.0f}")
+    print(f"    samples_per_s           {records.size / elapsed:12.0f}")
+    print(f"    r_error_pct_median      {np.median(r_err):12.2f} (max {r_err.max():.2f})")
+    print(f"    kv_error_pct_median     {np.median(kv_err):12.2f} (max {kv_err.max():.2f})")
+    print(f"    i0_error_pct_median     {np.median(i0_err):12.2f} (max {i0_err.max():.2f})")
+    print(f"    peak_eff_median         {np.median(summary['peak_eff']):12.3f}")
+
+    if not args.sim_runs:
+        return
+    logs, model = _sim_logs(args.sim_runs, args.sim_hold_s)
+    sim_row = characterize({"sim": logs})[0]
+    kv = 1 / (model.ke * RPM_TO_RAD_S)
+    i0_ma = model.t_friction / model.ke * 1000
+    print(f"firmware logs, {len(logs)} runs on the simulated board:")
+    print(f"    samples                 {sim_row['samples']:12}")
+    print(f"    r_ohm                   {sim_row['r_ohm']:12.3f} (true {model.r_ohm:.3f})")
+    print(f"    kv_rpm_per_v            {sim_row['kv_rpm_per_v']:12.0f} (true {kv:.0f})")
+    print(f"    i0_ma                   {sim_row['i0_ma']:12.0f} (true {i0_ma:.0f})")
+    print(f"    fit_rms_mv              {sim_row['fit_rms_mv']:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Control loop benchmark, runs the real firmware against the host stand-ins in ../host.
+
+Drives ManualScreen._run_loop (motor braked and motor running) and UI.show_menu and
+reports loop iterations per second, I2C transactions per tick and bytes allocated per
+tick. The rate group executive from main.py runs in the background and the
+RenderScheduler renders from the loop like on the device. The executive's per group
+report, the render report and the GCManager's pause histogram are printed after each
+scenario. I2C transfers block for their time on the wire (400kHz) unless
+--no-bus-timing is given.
+
+Usage:
+
+    python firmware/bench/bench_control_loop.py [--seconds 2] [--alloc-ticks 500] [scenario ...]
+"""
+
+import argparse
+
+from benchlib import TickMeter, print_result, sim
+
+
+def _manual(board, meter, running):
+    from ui_manual import ManualScreen
+
+    fw = board.build_firmware()
+    screen = ManualScreen(fw.display, fw.gc_manager, fw.renderer)
+    if running:
+        screen.motor_run_state = True
+        screen.manual_vol_mv = 3000
+    meter.hook(screen, "_update_readouts")
+    return _run(fw, meter, screen.show, fw.motor, fw.rotary_enc, fw.enc_btn)
+
+
+def _menu(board, meter):
+    from ui import UI
+
+    fw = board.build_firmware()
+    app = UI(fw.display, fw.gc_manager, fw.renderer)
+    meter.hook(fw.enc_btn, "read")
+    return _run(
+        fw, meter, app.show_menu, fw.motor, fw.rotary_enc, fw.enc_btn, fw.wheel_sensor
+    )
+
+
+def _run(fw, meter, fn, *args):
+    # The host has no gc.mem_alloc(), so idle collections only come from the interval
+    fw.gc_manager.max_interval_ms = 200
+    fw.executive.start()
+    fw.renderer.reset_stats()
+    try:
+        return meter.run(fn, *args), fw
+    finally:
+        fw.executive.stop()
+
+
+SCENARIOS = {
+    "manual_idle": lambda board, meter: _manual(board, meter, running=False),
+    "manual_running": lambda board, meter: _manual(board, meter, running=True),
+    "menu": _menu,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--alloc-ticks", type=int, default=500)
+    parser.add_argument("--no-bus-timing", action="store_true")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    for name in args.scenarios:
+        board = sim.Board()
+        board.i2c_stats.stall = not args.no_bus_timing
+        board.start()
+        try:
+            result, fw = SCENARIOS[name](
+                board, TickMeter(duration_s=args.seconds)
+            )
+            allocs, _ = SCENARIOS[name](
+                board, TickMeter(max_ticks=args.alloc_ticks, measure_allocs=True)
+            )
+        finally:
+            board.stop()
+        result["alloc_bytes_per_tick"] = allocs["alloc_bytes_per_tick"]
+        result["alloc_bytes_max_tick"] = allocs["alloc_bytes_max_tick"]
+        print_result(name, result)
+        fw.executive.report()
+        fw.renderer.report()
+        fw.gc_manager.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Current sampling benchmark, software multi-sampling vs INA219 on-chip averaging.
+
+The baseline is the old MotorControl path: every 10ms PSU.get_current_ma(5) reads five
+single conversions back to back. The hardware path configures the INA219 to average N
+shunt conversions and MotorControl.update_current_ma() reads one snapshot (bus voltage,
+shunt and power) after CNVR is set. The INA219 model sees a constant 500mA with per-conversion noise, so the
+spread of the samples shows how much noise each strategy actually removes.
+
+Reports I2C transactions and bus time per sample and the bus time saved per sample
+against the baseline.
+
+Usage:
+
+    python firmware/bench/bench_current_sampling.py [--seconds 2] [--noise-ma 50]
+"""
+
+import argparse
+import math
+import time
+
+from benchlib import sim
+
+
+def _stats(samples):
+    mean = sum(samples) / len(samples)
+    var = sum((s - mean) ** 2 for s in samples) / len(samples)
+    return mean, math.sqrt(var)
+
+
+def software(fw, seconds, sample_ms=10, n_samples=5):
+    fw.psu.set_current_averaging(1)
+    samples = []
+    last = time.ticks_ms()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        now = time.ticks_ms()
+        if time.ticks_diff(now, last) >= sample_ms:
+            last = now
+            samples.append(fw.psu.get_current_ma(n_samples))
+    return samples
+
+
+def hardware(fw, seconds, averaging, sample_ms=10):
+    motor = fw.motor
+    motor.set_current_sampling(sample_ms, averaging)
+    samples = []
+    last = motor.current_last_sample_time
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        motor.update_current_ma()
+        if motor.current_last_sample_time != last:
+            last = motor.current_last_sample_time
+            samples.append(motor.get_current_ma())
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--noise-ma", type=float, default=50.0)
+    args = parser.parse_args()
+
+    strategies = [("software 5x @ 10ms", lambda fw: software(fw, args.seconds))]
+    for n in (4, 8, 16):
+        strategies.append(
+            (f"hardware {n}x @ 10ms", lambda fw, n=n: hardware(fw, args.seconds, n))
+        )
+
+    baseline_us = None
+    for name, run in strategies:
+        board = sim.Board(imon_noise_ma=args.noise_ma)
+        board.imon.source = lambda: (3000, 500)
+        board.i2c_stats.stall = True
+        fw = board.build_firmware()
+        bus = board.i2c_stats
+        bus.reset_stats()
+
+        samples = run(fw)
+        n = len(samples)
+        bus_us = fw.i2c.bus_time_us() / n
+        if baseline_us is None:
+            baseline_us = bus_us
+        mean, std = _stats(samples)
+        print(f"{name}:")
+        print(f"    samples                 {n:12}")
+        print(f"    i2c_per_sample          {bus.transactions / n:12.2f}")
+        print(f"    i2c_bus_us_per_sample   {bus_us:12.1f}")
+        print(f"    bus_us_saved_per_sample {baseline_us - bus_us:12.1f}")
+        print(f"    mean_ma                 {mean:12.1f}")
+        print(f"    std_ma                  {std:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Current trip benchmark, time from a fault to the brake against the worst case bound.
+
+Runs the simulated motor through MotorControl with the executive running like on the
+device, protection group included, and injects faults with the load torque:
+
+- Over-current: a load step at full voltage that pulls the current over the limit with
+  the rotor still turning. Latency runs from the simulated current first crossing the
+  limit to the brake.
+- Stall: a load the motor can't turn at a lower voltage, so the current stays under the
+  limit. Latency runs from the last RPM sensor edge to the brake, less stall_ms.
+- Locked rotor: the rotor held still at rest, then a start to full voltage. The current
+  pacing holds the ramp at its limit while the rotor can't turn, so this has to trip part
+  way through the ramp. Latency runs from the drive starting to the brake, less stall_ms.
+
+A UI thread renders a frame every frame_ms the whole time, with lv.refr_now() holding
+off soft IRQs for --render-ms like a full screen refresh on the device, so the check is
+released late behind it.
+
+Also starts and reverses the motor at full voltage with no fault, which must not trip.
+Reports the measured latencies, CurrentTrip.worst_case_ms() with the render hold-off,
+the protect group's measured release latency and how long the PSU took to ramp down
+behind the brake.
+
+Usage:
+
+    python firmware/bench/bench_current_trip.py [--trips 5] [--limit-ma 1500] [--averaging 16]
+        [--render-ms 8]
+"""
+
+import argparse
+import threading
+import time
+
+from benchlib import sim
+
+import lvgl as lv
+import machine
+
+
+def _wait(motor, timeout_s=10):
+    end = time.perf_counter() + timeout_s
+    while motor.in_transition():
+        if time.perf_counter() > end:
+            raise RuntimeError("Motor never finished its transition")
+        time.sleep(0.001)
+
+
+def _fault(board, fw, load_nm, voltage_mv, limit_ma, timeout_s=5.0):
+    """
+    Spin up, apply load_nm and wait for the trip. Returns (reason, ms from the current
+    crossing limit_ma to the brake, ms from stall_ms after the last RPM edge to the brake,
+    PSU ramp ms)
+    """
+    motor = fw.motor
+    motor.set_state(motor.MOTOR_FORWARD, voltage_mv)
+    _wait(motor)
+    time.sleep(0.6)  # Past the inrush blanking
+    motor.drv.braked_at = None
+    board.motor.load_nm = load_nm
+    crossed = None
+    pulses = board.rpm_pulses.pulses
+    last_edge = time.perf_counter()
+    end = time.perf_counter() + timeout_s
+    while not motor.trip_reason:
+        if time.perf_counter() > end:
+            raise RuntimeError("Never tripped")
+        _, current_ma = board.motor.supply()
+        now = time.perf_counter()
+        if crossed is None and current_ma >= limit_ma:
+            crossed = now
+        if board.rpm_pulses.pulses != pulses:
+            pulses = board.rpm_pulses.pulses
+            last_edge = now
+        time.sleep(0.0001)
+    braked = motor.drv.braked_at
+    board.motor.load_nm = 0.0
+    reason = motor.trip_reason
+    _wait(motor)
+    ramp_ms = (time.perf_counter() - braked) * 1000
+    motor.clear_trip()
+    time.sleep(0.3)
+    over_ms = None if crossed is None else (braked - crossed) * 1000
+    stall_ms = None
+    if reason == motor.TRIP_STALL:
+        stall_ms = (braked - last_edge) * 1000 - fw.trip.stall_ms
+    return reason, over_ms, stall_ms, ramp_ms
+
+
+def _locked(board, fw, voltage_mv, timeout_s=5.0):
+    """
+    Start with the rotor held still and wait for the trip. Returns (reason, None, ms from
+    stall_ms after the drive started to the brake, PSU ramp ms)
+    """
+    motor = fw.motor
+    board.motor.locked = True
+    motor.drv.braked_at = None
+    motor.drv.driven_at = None
+    motor.set_state(motor.MOTOR_FORWARD, voltage_mv)
+    end = time.perf_counter() + timeout_s
+    while not motor.trip_reason:
+        if time.perf_counter() > end:
+            raise RuntimeError(f"Never tripped, {motor.get_current_ma()}mA")
+        time.sleep(0.001)
+    braked = motor.drv.braked_at
+    board.motor.locked = False
+    reason = motor.trip_reason
+    _wait(motor)
+    ramp_ms = (time.perf_counter() - braked) * 1000
+    motor.clear_trip()
+    time.sleep(0.3)
+    stall_ms = (braked - motor.drv.driven_at) * 1000 - fw.trip.stall_ms
+    return reason, None, stall_ms, ramp_ms
+
+
+def _starts(fw, voltage_mv, count):
+    """Start from rest and reverse at voltage_mv, returns the trips that caused"""
+    motor = fw.motor
+    before = fw.trip.trips
+    direction = motor.MOTOR_FORWARD
+    for _ in range(count):
+        motor.set_state(direction, voltage_mv)
+        _wait(motor)
+        time.sleep(0.8)
+        if direction == motor.MOTOR_FORWARD:
+            direction = motor.MOTOR_REVERSE
+        else:
+            direction = motor.MOTOR_FORWARD
+    motor.set_state(motor.MOTOR_BRAKE, motor.VOLTAGE_MIN_MV)
+    _wait(motor)
+    return fw.trip.trips - before
+
+
+def _render_loop(renderer, render_ms, stop):
+    """Render a frame whenever one is due, each blocking soft IRQs for render_ms"""
+
+    def refr_now(disp=None):
+        state = machine.disable_irq()
+        end = time.perf_counter() + render_ms / 1000
+        while time.perf_counter() < end:
+            pass
+        machine.enable_irq(state)
+
+    lv.refr_now = refr_now
+    while not stop.is_set():
+        renderer.dirty = True
+        renderer.poll()
+        time.sleep(0.001)
+
+
+def _stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return "     -      -"
+    return f"{sum(values) / len(values):6.1f} {max(values):6.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trips", type=int, default=5)
+    parser.add_argument("--limit-ma", type=int, default=1500)
+    parser.add_argument("--averaging", type=int, default=16)
+    parser.add_argument("--over-load-nm", type=float, default=0.002)
+    parser.add_argument("--stall-load-nm", type=float, default=0.01)
+    parser.add_argument("--stall-mv", type=int, default=1000)
+    parser.add_argument("--render-ms", type=float, default=8.0)
+    args = parser.parse_args()
+
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    motor = fw.motor
+    motor.set_current_sampling(10, args.averaging)
+    fw.trip.set_limit(args.limit_ma)
+
+    brake = fw.drv.brake
+
+    def timed_brake():
+        if fw.drv.braked_at is None:
+            fw.drv.braked_at = time.perf_counter()
+        brake()
+
+    forward = fw.drv.forward
+
+    def timed_forward():
+        fw.drv.driven_at = time.perf_counter()
+        forward()
+
+    fw.drv.braked_at = None
+    fw.drv.brake = timed_brake
+    fw.drv.forward = timed_forward
+
+    fw.executive.start()
+    stop = threading.Event()
+    ui = threading.Thread(
+        target=_render_loop, args=(fw.renderer, args.render_ms, stop), daemon=True
+    )
+    if args.render_ms:
+        ui.start()
+    try:
+        false_trips = _starts(fw, motor.VOLTAGE_MAX_MV, args.trips)
+        cases = (
+            ("over-current", args.over_load_nm, motor.VOLTAGE_MAX_MV),
+            ("stall", args.stall_load_nm, args.stall_mv),
+        )
+        results = []
+        for name, load_nm, voltage_mv in cases:
+            rows = [
+                _fault(board, fw, load_nm, voltage_mv, args.limit_ma)
+                for _ in range(args.trips)
+            ]
+            results.append((name, rows))
+        rows = [
+            _locked(board, fw, motor.VOLTAGE_MAX_MV)
+            for _ in range(args.trips)
+        ]
+        results.append(("locked rotor", rows))
+    finally:
+        stop.set()
+        if args.render_ms:
+            ui.join()
+        fw.executive.stop()
+        board.stop()
+
+    protect = next(g for g in fw.executive.groups if g.name == "protect")
+    print(
+        f"Limit {args.limit_ma}mA, averaging {args.averaging}, "
+        f"worst case {fw.trip.worst_case_ms():.1f}ms to brake with "
+        f"{fw.trip.holdoff_us() / 1000:.1f}ms hold-off, "
+        f"check released up to {protect.max_late_ms}ms late"
+    )
+    print(f"    false trips in {args.trips} starts   {false_trips:6}")
+    print(
+        "    case          reasons  over_mean over_max stall_mean stall_max ramp_mean"
+    )
+    for name, rows in results:
+        reasons = "".join(
+            "S" if r[0] == motor.TRIP_STALL else "O" if r[0] else "-" for r in rows
+        )
+        over = _stats(r[1] for r in rows)
+        stall = _stats(r[2] for r in rows)
+        ramp = sum(r[3] for r in rows) / len(rows)
+        print(f"    {name:13} {reasons:>8}   {over}    {stall}      {ramp:6.1f}")
+    fw.trip.report()
+    fw.executive.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Telemetry log reader benchmark, how long the host takes to open and query a big log.
+
+Writes a synthetic log of the given size in the TelemetryLogger format, a header from the
+logger itself followed by 10ms records, then times opening it with telemetry_log.LogFile,
+a time_slice() of one second from the middle and a full pass over one column with
+chunks(). The process's own memory is reported after each, it stays flat as the log's
+pages are the OS's to drop. Needs NumPy.
+
+Usage:
+
+    python firmware/bench/bench_log_reader.py [--mb 1024] [--keep path]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchlib import sim  # noqa: F401  (path setup)
+
+import numpy as np
+
+import telemetry
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from telemetry_log import LogFile, dtype_from_format  # noqa: E402
+
+
+def _write_log(path, size_mb, chunk=1 << 20):
+    logger = telemetry.TelemetryLogger(motor=None, period_ms=10)
+    header = logger._header()
+    dtype = dtype_from_format(telemetry.RECORD_FORMAT, telemetry.RECORD_FIELDS)
+    records = size_mb * (1 << 20) // dtype.itemsize
+    with open(path, "wb") as f:
+        f.write(header)
+        for first in range(0, records, chunk):
+            block = np.zeros(min(chunk, records - first), dtype=dtype)
+            block["t_ms"] = np.arange(first, first + len(block), dtype=np.uint32) * 10
+            block["set_mv"] = 3000
+            block["current_ma"] = 200 + (block["t_ms"] % 97).astype(np.int16)
+            block["rpm"] = 15000
+            block.tofile(f)
+    return records
+
+
+def _heap_mb():
+    """
+    Anonymous resident memory on Linux, leaving out the mapped log's pages which the OS
+    can drop at any time, else the peak RSS including them
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    scale = 1 << 20 if sys.platform == "darwin" else 1 << 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=int, default=1024)
+    parser.add_argument("--keep", help="write the log here and keep it")
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.gettempdir(), "m4wd_bench_log.bin")
+    records, write_ms = _timed(lambda: _write_log(path, args.mb))
+    heap_before = _heap_mb()
+    try:
+        log, open_ms = _timed(lambda: LogFile(path))
+        mid = records // 2 * 10
+        window, slice_ms = _timed(lambda: log.time_slice(mid, mid + 1000))
+        heap_slice = _heap_mb()
+        total, scan_ms = _timed(
+            lambda: sum(int(c["current_ma"].sum(dtype=np.int64)) for c in log.chunks())
+        )
+        heap_scan = _heap_mb()
+        assert len(window) == 100 and window["t_ms"][0] == mid
+        assert total == int(log.records["current_ma"].sum(dtype=np.int64))
+
+        print(f"{path} ({os.path.getsize(path) >> 20} MB, {records} records):")
+        print(f"    write_ms                {write_ms:12.1f}")
+        print(f"    open_ms                 {open_ms:12.3f}")
+        print(f"    time_slice_ms           {slice_ms:12.3f}")
+        print(f"    index_entries           {len(log.index):12}")
+        print(f"    column_scan_ms          {scan_ms:12.1f}")
+        print(f"    heap_mb_before          {heap_before:12.1f}")
+        print(f"    heap_mb_after_slice     {heap_slice:12.1f}")
+        print(f"    heap_mb_after_scan      {heap_scan:12.1f}")
+    finally:
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Pulse counter edge rate benchmark, IRQ backend vs PCNT backend.
+
+Runs the real PulseCounter against the host stand-ins on virtual time. Edges arrive at a
+fixed rate, soft IRQ handlers only run when the interpreter is free and each costs
+--isr-cost-us, and every --render-period-ms the LVGL refresh holds the interpreter for
+--render-ms like the Timer callback in main.py. Pending IRQs beyond the scheduler depth
+(8 on the ESP32 port) are dropped. For each backend it reports the pulses lost at each
+rate and the highest rate counted without loss.
+
+Usage:
+
+    python firmware/bench/bench_pulse_counter.py [--isr-cost-us 30] [--render-ms 20]
+"""
+
+import argparse
+import time
+
+from benchlib import sim
+
+import machine
+
+RATES_HZ = (250, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000)
+
+
+class VirtualClock:
+    """Replaces time.ticks_ms while the simulation runs"""
+
+    def __init__(self):
+        self.t = 0.0
+        self._saved = None
+
+    def ticks_ms(self):
+        return int(self.t * 1000)
+
+    def __enter__(self):
+        self._saved = time.ticks_ms
+        time.ticks_ms = self.ticks_ms
+        return self
+
+    def __exit__(self, *exc):
+        time.ticks_ms = self._saved
+
+
+def run(mode, rate_hz, args):
+    from pulse_counter import PulseCounter
+
+    sim.Board()
+    sched = machine.scheduler
+    sched.threaded = False
+    PulseCounter._next_pcnt_unit = 0
+    pin = machine.Pin.get(sim.Board.PIN_RPM)
+    pin.drive(1)
+
+    # Virtual time in integer nanoseconds so render window edges compare exactly
+    isr_cost = int(args.isr_cost_us * 1000)
+    render = int(args.render_ms * 1000000)
+    render_period = int(args.render_period_ms * 1000000)
+    arrivals = []
+    cpu_free = 0
+
+    def serve(until):
+        # Run queued handlers while the interpreter is free, oldest first
+        nonlocal cpu_free
+        while arrivals and cpu_free <= until:
+            cpu_free = max(cpu_free, arrivals[0])
+            render_end = cpu_free - cpu_free % render_period + render
+            if cpu_free < render_end:
+                cpu_free = render_end
+                continue
+            arrivals.pop(0)
+            sched.run_one()
+            cpu_free += isr_cost
+
+    with VirtualClock() as clock:
+        pc = PulseCounter(pin=sim.Board.PIN_RPM, mode=mode)
+        n = int(rate_hz * args.seconds)
+        next_update = 0
+        for k in range(n):
+            t = k * 1000000000 // rate_hz
+            clock.t = t / 1000000000
+            serve(t)
+            if t >= next_update:
+                pc.update_pulse_count()
+                next_update += 1000000
+            dropped = sched.dropped
+            pin.pulse()
+            if sched.dropped == dropped and pc.mode == pc.MODE_IRQ:
+                arrivals.append(t)
+        serve(1 << 62)
+        counted = pc.get_count()
+
+    sched.threaded = True
+    return pc.mode, n, counted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=0.5)
+    parser.add_argument("--isr-cost-us", type=float, default=30)
+    parser.add_argument("--render-ms", type=float, default=20)
+    parser.add_argument("--render-period-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    from pulse_counter import PulseCounter
+
+    names = {PulseCounter.MODE_IRQ: "irq", PulseCounter.MODE_PCNT: "pcnt"}
+    for mode in (PulseCounter.MODE_IRQ, PulseCounter.MODE_PCNT):
+        max_ok = 0
+        lossless = True
+        print(f"{names[mode]}:")
+        for rate in RATES_HZ:
+            used, n, counted = run(mode, rate, args)
+            lost = n - counted
+            lossless = lossless and lost == 0
+            if lossless:
+                max_ok = rate
+            print(
+                f"    {rate:>7} Hz ({rate * 60:>8} RPM @ 1 PPR)  edges {n:>7}  lost {lost:>7}"
+                f"  ({100 * lost / n:5.1f}%)"
+            )
+        print(f"    max lossless rate: {max_ok} Hz (backend used: {names[used]})")
+
+
+if __name__ == "__main__":
+    main()
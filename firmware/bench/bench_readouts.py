@@ -0,0 +1,133 @@
+"""
+Live readout benchmark, bytes allocated and labels redrawn per readout cycle.
+
+Runs the ManualScreen and SpeedScreen _update_readouts() refresh directly, once per cycle
+with the 200ms gate open, while the motor is braked (steady values) and while the sensor
+stats change every cycle. The previous f-string formatting is run against the same values
+as the baseline. The byte counts are only comparable between the two paths on MicroPython,
+where they are gc.mem_alloc() deltas. On CPython every int above 256 and every argument
+tuple is a heap object too, so the fixed point maths in the readout path can count more
+there than the f-strings, and set_text_per_cycle is the figure to compare.
+
+Usage:
+
+    python firmware/bench/bench_readouts.py [--cycles 500]
+"""
+
+import argparse
+
+from benchlib import AllocProbe, sim
+
+import lvgl as lv
+
+from ui_common import WHEEL_CIRCUMFERENCE
+
+
+def _manual_screen(fw):
+    import ui_common
+    from ui_manual import ManualScreen
+
+    ui_common.REPORT_TRANSITIONS = False
+    screen = ManualScreen(fw.display)
+    screen._run_loop = lambda *args: None
+    screen.show(fw.motor, fw.rotary_enc, fw.enc_btn)
+    screen.motor_run_state = True
+    screen.manual_run_start = 0
+    return screen
+
+
+def _speed_screen(fw):
+    from ui_speed import SpeedScreen
+
+    screen = SpeedScreen(fw.display)
+    screen._run_loop = lambda *args: None
+    screen.show(fw.wheel_sensor, fw.enc_btn)
+    return screen
+
+
+class _FStrings:
+    """The per label f-string and compare formatting the readouts replaced"""
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.last = [""] * len(labels)
+
+    def _set(self, i, text):
+        if text != self.last[i]:
+            self.last[i] = text
+            self.labels[i].set_text(text)
+
+    def manual(self, motor):
+        self._set(0, f"{motor.get_rpm_1s():d}")
+        self._set(1, f"{motor.get_voltage_100ms() / 1000:.2f}V")
+        self._set(3, f"{max(0, motor.get_current_1s()):.0f}mA")
+        self._set(4, f"{motor.get_temp_10s():.1f}°C")
+
+    def speed(self, wheel_sensor):
+        wheel_ms = wheel_sensor.get_hz_1s() * WHEEL_CIRCUMFERENCE
+        self._set(0, f"{wheel_sensor.get_rpm_1s():d}")
+        self._set(1, f"{wheel_ms:.1f}")
+        self._set(2, f"{wheel_ms * 3.6:.1f}")
+
+
+def _changing(fw, i):
+    """Move every value shown, as a ramping motor would"""
+    fw.motor.current_stats.add(400 + i % 200)
+    fw.motor.voltage_stats.add(1500 + 10 * (i % 100))
+    fw.motor.temp_stats.add(2500 + i % 300)
+    counts = fw.wheel_sensor.window_counts
+    counts.add(counts.last() + 1 + i % 7)
+    fw.wheel_sensor.window_lengths.add(100)
+
+
+def _measure(fw, cycle, cycles, changing):
+    probe = AllocProbe()
+    probe.start()
+    total = worst = 0
+    texts = lv.stats.text_calls
+    try:
+        for i in range(cycles):
+            if changing:
+                _changing(fw, i)
+            probe.mark()
+            cycle()
+            n = probe.read()
+            total += n
+            worst = max(worst, n)
+    finally:
+        probe.stop()
+    return total / cycles, worst, (lv.stats.text_calls - texts) / cycles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cycles", type=int, default=500)
+    args = parser.parse_args()
+
+    for changing in (False, True):
+        fw = sim.Board().build_firmware()
+        manual = _manual_screen(fw)
+        speed = _speed_screen(fw)
+        readouts = manual._readouts
+        f_manual = _FStrings([r.label for r in readouts])
+        f_speed = _FStrings([r.label for r in speed._readouts])
+
+        cases = (
+            ("manual", lambda: manual._update_readouts(fw.motor, readouts, -1)),
+            ("manual_fstring", lambda: f_manual.manual(fw.motor)),
+            (
+                "speed",
+                lambda: speed._update_readouts(fw.wheel_sensor, *speed._readouts, -1),
+            ),
+            ("speed_fstring", lambda: f_speed.speed(fw.wheel_sensor)),
+        )
+        for name, cycle in cases:
+            mean, worst, texts = _measure(fw, cycle, args.cycles, changing)
+            print(f"{name} ({'changing' if changing else 'steady'}):")
+            print(f"    alloc_bytes_per_cycle   {mean:12.1f}")
+            print(f"    alloc_bytes_max_cycle   {worst:12}")
+            print(f"    set_text_per_cycle      {texts:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
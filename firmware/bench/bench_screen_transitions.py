@@ -0,0 +1,138 @@
+"""
+Screen transition benchmark, cost of navigating between the UI screens.
+
+Enters each screen a number of times the way the menu does and reports the first visit,
+which builds the widget tree (what every visit cost when screens were cleared and rebuilt
+on each navigation), against the average of the later visits, which only reset the live
+values and screen_load the prebuilt tree. Reports time, LVGL objects created and bytes
+allocated per transition.
+
+Usage:
+
+    python firmware/bench/bench_screen_transitions.py [--visits 20] [screen ...]
+"""
+
+import argparse
+import time
+
+from benchlib import AllocProbe, StopBench, sim
+
+import lvgl as lv
+
+
+def _stop(*args, **kwargs):
+    raise StopBench
+
+
+def _enter(fn, *args):
+    try:
+        fn(*args)
+    except StopBench:
+        pass
+
+
+def _menu(fw):
+    from ui import UI
+
+    app = UI(fw.display)
+    fw.rotary_enc.set = _stop  # First thing after the menu screen is loaded
+    return lambda: _enter(
+        app.show_menu, fw.motor, fw.rotary_enc, fw.enc_btn, fw.wheel_sensor
+    )
+
+
+def _manual(fw):
+    from ui_manual import ManualScreen
+
+    screen = ManualScreen(fw.display)
+    screen._run_loop = _stop
+    return lambda: _enter(screen.show, fw.motor, fw.rotary_enc, fw.enc_btn)
+
+
+def _breakin(fw):
+    from ui_breakin import BreakInScreen
+
+    screen = BreakInScreen(fw.display, checkpoint_path=None)
+    screen._run_loop = _stop
+    return lambda: _enter(screen.show, fw.motor, fw.rotary_enc, fw.enc_btn)
+
+
+def _speed(fw):
+    from ui_speed import SpeedScreen
+
+    screen = SpeedScreen(fw.display)
+    screen._run_loop = _stop
+    return lambda: _enter(screen.show, fw.wheel_sensor, fw.enc_btn)
+
+
+def _sweep(fw):
+    from ui_sweep import SweepScreen
+
+    screen = SweepScreen(fw.display)
+    screen._run_loop = _stop
+    return lambda: _enter(screen.show, fw.motor, fw.rotary_enc, fw.enc_btn)
+
+
+def _settings(fw):
+    from ui_common import UIBase
+
+    screen = UIBase(fw.display)
+    screen._update_back_bar = lambda back_fill, enc_btn, pressed_ms: -1
+    return lambda: screen._show_placeholder("Settings", fw.enc_btn)
+
+
+SCREENS = {
+    "menu": _menu,
+    "manual": _manual,
+    "breakin": _breakin,
+    "speed": _speed,
+    "sweep": _sweep,
+    "settings": _settings,
+}
+
+
+def _visit(enter, probe):
+    created = lv.stats.objs_created
+    probe.mark()
+    start = time.perf_counter()
+    enter()
+    lv.refr_now(None)  # Render the new screen like the RenderScheduler would
+    elapsed_us = (time.perf_counter() - start) * 1000000
+    return elapsed_us, lv.stats.objs_created - created, probe.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--visits", type=int, default=20)
+    parser.add_argument("screens", nargs="*", default=list(SCREENS))
+    args = parser.parse_args()
+
+    import ui_common
+
+    ui_common.REPORT_TRANSITIONS = False
+
+    for name in args.screens:
+        board = sim.Board()
+        fw = board.build_firmware()
+        enter = SCREENS[name](fw)
+
+        probe = AllocProbe()
+        probe.start()
+        try:
+            first = _visit(enter, probe)
+            rest = [_visit(enter, probe) for _ in range(max(1, args.visits - 1))]
+        finally:
+            probe.stop()
+        n = len(rest)
+
+        print(f"{name}:")
+        print(f"    first_visit_us          {first[0]:12.1f}")
+        print(f"    repeat_visit_us         {sum(r[0] for r in rest) / n:12.1f}")
+        print(f"    first_objs_created      {first[1]:12}")
+        print(f"    repeat_objs_created     {sum(r[1] for r in rest) / n:12.1f}")
+        print(f"    first_alloc_bytes       {first[2]:12}")
+        print(f"    repeat_alloc_bytes_max  {max(r[2] for r in rest):12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Telemetry logger benchmark, sustained logging rate and its cost to the control loop.
+
+Runs the executive from main.py with the motor ramping up and down while the
+TelemetryLogger samples in the 10ms group, flushing from a loop at the readout refresh
+interval like the UI idle points. Reports the records logged per second, records
+dropped, flash write times and the executive's current group run time with and without
+logging. The log file is read back and checked against the records counted.
+
+Usage:
+
+    python firmware/bench/bench_telemetry.py [--seconds 3] [--flush-ms 200]
+"""
+
+import argparse
+import os
+import struct
+import time
+
+from benchlib import sim
+
+import telemetry
+
+
+def _run(seconds, flush_ms, logging):
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    motor = fw.motor
+    fw.executive.start()
+    try:
+        if logging:
+            fw.telemetry.start()
+        end = time.perf_counter() + seconds
+        target = motor.VOLTAGE_MAX_MV
+        while time.perf_counter() < end:
+            if not motor.in_transition():
+                motor.set_state(motor.MOTOR_FORWARD, target)
+                target = motor.VOLTAGE_MIN_MV + motor.VOLTAGE_MAX_MV - target
+            time.sleep(flush_ms / 1000)
+            fw.telemetry.flush()
+        fw.telemetry.stop()
+    finally:
+        fw.executive.stop()
+        board.stop()
+    current = next(g for g in fw.executive.groups if g.name == "current")
+    return fw.telemetry, current
+
+
+def _check_file(logger):
+    with open(logger.path, "rb") as f:
+        data = f.read()
+    magic, version, header_size, record_size, period_ms = struct.unpack_from(
+        telemetry.HEADER_FORMAT, data
+    )
+    assert magic == telemetry.MAGIC and record_size == logger.record_size
+    records = (len(data) - header_size) // record_size
+    t = [
+        struct.unpack_from(telemetry.RECORD_FORMAT, data, header_size + i * record_size)[0]
+        for i in range(records)
+    ]
+    steps = [b - a for a, b in zip(t, t[1:])]
+    return records, max(steps) if steps else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--flush-ms", type=int, default=200)
+    args = parser.parse_args()
+
+    _, baseline = _run(args.seconds, args.flush_ms, logging=False)
+    logger, current = _run(args.seconds, args.flush_ms, logging=True)
+    records, max_gap = _check_file(logger)
+
+    print(f"{logger.path}:")
+    print(f"    records_per_s           {logger.written / args.seconds:12.1f}")
+    print(f"    records_dropped         {logger.dropped:12}")
+    print(f"    records_in_file         {records:12}")
+    print(f"    max_gap_ms              {max_gap:12}")
+    print(f"    file_bytes              {os.path.getsize(logger.path):12}")
+    print(f"    flush_us_max            {logger.max_flush_us:12}")
+    print(f"    current_group_us_max    {current.max_us:12} (without {baseline.max_us})")
+    print(f"    current_group_overruns  {current.overruns:12} (without {baseline.overruns})")
+
+
+if __name__ == "__main__":
+    main()
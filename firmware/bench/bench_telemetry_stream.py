@@ -0,0 +1,146 @@
+"""
+Telemetry stream benchmark, sustained frame rate and how the host decoder copes with a
+noisy link.
+
+Runs the executive from main.py with the motor ramping up and down while the
+TelemetryStream samples in the 10ms group, pumping frames out to a captured port from a
+loop like the UI idle points. The capture is then mixed with print output and corrupted
+at random before decoding it with tools/telemetry_decode.py, reporting frames sent,
+dropped, decoded and lost to corruption, and the decode rate.
+
+Runs again through a slow port that takes at most --port-bytes a write and refuses every
+third one, like a USB CDC port with a full TX buffer, so pump() has to pick frames up
+part way through, with no print output mixed in. Fails unless every frame the stream
+counts as sent decodes cleanly.
+
+Usage:
+
+    python firmware/bench/bench_telemetry_stream.py [--seconds 3] [--pump-ms 200]
+        [--corrupt 0.001] [--port-bytes 100]
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+
+from benchlib import sim
+
+import telemetry_stream
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from telemetry_decode import FrameDecoder  # noqa: E402
+
+
+class _SlowPort:
+    """Takes at most limit bytes a write and none every third call, returning None"""
+
+    def __init__(self, out, limit):
+        self.out = out
+        self.limit = limit
+        self.calls = 0
+
+    def write(self, data):
+        self.calls += 1
+        if self.calls % 3 == 0:
+            return None
+        return self.out.write(data[: self.limit])
+
+
+def _run(seconds, pump_ms, port_bytes=None):
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    motor = fw.motor
+    if port_bytes:
+        fw.stream.out = _SlowPort(fw.usb, port_bytes)
+    fw.executive.start()
+    try:
+        fw.stream.start()
+        end = time.perf_counter() + seconds
+        target = motor.VOLTAGE_MAX_MV
+        while time.perf_counter() < end:
+            if not motor.in_transition():
+                motor.set_state(motor.MOTOR_FORWARD, target)
+                target = motor.VOLTAGE_MIN_MV + motor.VOLTAGE_MAX_MV - target
+            time.sleep(pump_ms / 1000)
+            if not port_bytes:  # Would land inside the slow port's part sent frames
+                fw.usb.write(b"Manual: 35us, heap 81234\r\n")  # print output in between
+            fw.stream.pump()
+        fw.stream.stop()
+        fw.stream.pump()
+    finally:
+        fw.executive.stop()
+        board.stop()
+    current = next(g for g in fw.executive.groups if g.name == "current")
+    return fw.stream, fw.usb.getvalue(), current
+
+
+def _corrupt(data, rate, rng):
+    data = bytearray(data)
+    flips = int(len(data) * rate)
+    for i in rng.sample(range(len(data)), flips):
+        data[i] ^= 1 << rng.randrange(8)
+    return bytes(data), flips
+
+
+def _decode(data, chunk):
+    decoder = FrameDecoder()
+    payloads = []
+    start = time.perf_counter()
+    for i in range(0, len(data), chunk):
+        payloads += decoder.feed(data[i : i + chunk])
+    elapsed = time.perf_counter() - start
+    return decoder, payloads, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--pump-ms", type=int, default=200)
+    parser.add_argument("--corrupt", type=float, default=0.001, help="bit flips per byte")
+    parser.add_argument("--port-bytes", type=int, default=100)
+    args = parser.parse_args()
+
+    stream, data, current = _run(args.seconds, args.pump_ms)
+    clean, payloads, _ = _decode(data, 4096)
+    ticks = [struct.unpack_from("<I", p)[0] for p in payloads]
+    gaps = [(b - a) % (1 << 30) for a, b in zip(ticks, ticks[1:])]
+    noisy_data, flips = _corrupt(data, args.corrupt, random.Random(1))
+    noisy, _, elapsed = _decode(noisy_data, 4096)
+
+    print(f"stream ({telemetry_stream.FRAME_SIZE} byte frames):")
+    print(f"    frames_per_s            {stream.written / args.seconds:12.1f}")
+    print(f"    frames_sent             {stream.sent:12}")
+    print(f"    frames_dropped          {stream.dropped:12}")
+    print(f"    frames_decoded          {clean.frames:12}")
+    print(f"    max_gap_us              {max(gaps) if gaps else 0:12}")
+    print(f"    current_group_us_max    {current.max_us:12}")
+    print(f"noisy link ({flips} bit flips):")
+    print(f"    frames_decoded          {noisy.frames:12}")
+    print(f"    crc_errors              {noisy.crc_errors:12}")
+    print(f"    bytes_skipped           {noisy.skipped_bytes:12}")
+    print(f"    decode_frames_per_s     {noisy.frames / max(elapsed, 1e-9):12.0f}")
+
+    stream, data, _ = _run(args.seconds, args.pump_ms, args.port_bytes)
+    slow, _, _ = _decode(data, 4096)
+    print(f"slow port ({args.port_bytes} bytes a write):")
+    print(f"    frames_sent             {stream.sent:12}")
+    print(f"    frames_waiting          {stream.written - stream.sent:12}")
+    print(f"    frames_dropped          {stream.dropped:12}")
+    print(f"    frames_decoded          {slow.frames:12}")
+    print(f"    crc_errors              {slow.crc_errors:12}")
+    if slow.frames != stream.sent or slow.crc_errors:
+        raise RuntimeError(
+            f"{stream.sent} frames sent but {slow.frames} decoded, "
+            f"{slow.crc_errors} CRC errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Voltage ramp benchmark, timer driven VoltageRamp at a range of slew rates.
+
+Ramps the PSU from VOLTAGE_MIN_MV to VOLTAGE_MAX_MV and back through MotorControl with the
+executive and the ramp timer running like on the device. For each slew rate it reports
+the expected and measured time to target, the DAC writes per ramp and the worst case
+bytes allocated per step, against PSU.set_voltage_mv() as the baseline. On CPython the
+I2C stand-in itself allocates, so the difference is what matters there.
+
+Usage:
+
+    python firmware/bench/bench_voltage_ramp.py [--rates 10 25 50 100 200]
+"""
+
+import argparse
+import time
+
+from benchlib import AllocProbe, sim
+
+
+def _wait_ramp(motor, target_mv, timeout_s=5.0):
+    motor.set_state(motor.MOTOR_FORWARD, target_mv)
+    expected = motor.get_time_to_target_ms()
+    end = time.perf_counter() + timeout_s
+    while motor.voltage_mv != target_mv or not motor.ramp.at_target():
+        if time.perf_counter() > end:
+            raise RuntimeError(f"Ramp to {target_mv}mV timed out")
+        time.sleep(0.001)
+    return expected, motor.get_last_ramp_ms()
+
+
+def _max_alloc(fn, n=200):
+    probe = AllocProbe()
+    probe.start()
+    worst = 0
+    try:
+        for i in range(n):
+            probe.mark()
+            fn(i)
+            worst = max(worst, probe.read())
+    finally:
+        probe.stop()
+    return worst
+
+
+def _step_allocs(fw):
+    """Worst case bytes per DAC step, ramp table vs computing each voltage"""
+    from voltage_ramp import VoltageRamp
+
+    lo, hi = fw.motor.VOLTAGE_MIN_MV, fw.motor.VOLTAGE_MAX_MV
+    ramp = VoltageRamp(fw.psu, lo, hi, timer_id=None)
+
+    def table_step(i):
+        ramp.target_index = len(ramp.codes) - 1 if i % 100 < 50 else 0
+        ramp.step()
+
+    def computed_step(i):
+        fw.psu.set_voltage_mv(lo + 50 * (i % 50))
+
+    return _max_alloc(table_step), _max_alloc(computed_step)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rates", type=float, nargs="*", default=[10, 25, 50, 100, 200])
+    args = parser.parse_args()
+
+    for rate in args.rates:
+        board = sim.Board()
+        fw = board.build_firmware()
+        motor = fw.motor
+        motor.set_ramp_current_limit(None)  # The fixed rate under test
+        # Unpaced, the faster rates draw more inrush than the trip allows starting up
+        fw.trip.inrush_ma = 1 << 16
+        motor.set_ramp_rate(rate)
+        fw.executive.start()
+        try:
+            # Let the initial brake time pass so the direction change doesn't count
+            _wait_ramp(motor, motor.VOLTAGE_MIN_MV + 50)
+            _wait_ramp(motor, motor.VOLTAGE_MIN_MV)
+            writes = board.dac.writes
+            up = _wait_ramp(motor, motor.VOLTAGE_MAX_MV)
+            down = _wait_ramp(motor, motor.VOLTAGE_MIN_MV)
+            writes = (board.dac.writes - writes) / 2
+        finally:
+            fw.executive.stop()
+        print(f"{rate:g} mV/ms:")
+        print(f"    expected_ms             {up[0]:12.1f}")
+        print(f"    measured_up_ms          {up[1]:12.1f}")
+        print(f"    measured_down_ms        {down[1]:12.1f}")
+        print(f"    dac_writes_per_ramp     {writes:12.1f}")
+        table, computed = _step_allocs(fw)
+        print(f"    step_alloc_bytes_max    {table:12}")
+        print(f"    set_mv_alloc_bytes_max  {computed:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Voltage sweep benchmark, wall time of a sweep that moves on as soon as each point settles.
+
+Runs a VoltageSweep on the simulated motor with the executive running like on the device,
+calling update() from a loop at about the screen loop's rate. Reports each pattern's time
+and points against a fixed dwell per point, i.e. turning the encoder on ManualScreen and
+waiting long enough for the slowest point, plus points that timed out.
+
+Usage:
+
+    python firmware/bench/bench_voltage_sweep.py [--step-mv 250] [--fixed-dwell-ms 3000]
+"""
+
+import argparse
+import time
+
+from benchlib import sim
+
+import voltage_sweep
+from voltage_sweep import VoltageSweep, FLAG_TIMEOUT
+
+
+def _run(pattern, step_mv, timeout_s=300):
+    board = sim.Board()
+    board.start()
+    fw = board.build_firmware()
+    fw.executive.start()
+    try:
+        sweep = VoltageSweep(fw.motor, step_mv=step_mv, pattern=pattern)
+        sweep.start()
+        end = time.perf_counter() + timeout_s
+        while not sweep.done():
+            if time.perf_counter() > end:
+                raise RuntimeError("Sweep timed out")
+            sweep.update()
+            time.sleep(0.005)
+    finally:
+        fw.executive.stop()
+        board.stop()
+    return sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--step-mv", type=int, default=250)
+    parser.add_argument("--fixed-dwell-ms", type=int, default=3000)
+    parser.add_argument(
+        "--patterns", nargs="*", default=list(voltage_sweep.PATTERN_NAMES)
+    )
+    args = parser.parse_args()
+
+    for name in args.patterns:
+        sweep = _run(voltage_sweep.PATTERN_NAMES.index(name), args.step_mv)
+        points = len(sweep.points)
+        settle = [sweep.settle_ms[i] for i in range(sweep.count)]
+        timeouts = sum(1 for i in range(sweep.count) if sweep.flags[i] & FLAG_TIMEOUT)
+        fixed_ms = points * args.fixed_dwell_ms
+
+        print(f"{name} ({points} points of {args.step_mv}mV):")
+        print(f"    sweep_ms                {sweep.elapsed_ms():12}")
+        print(f"    fixed_dwell_ms          {fixed_ms:12}")
+        print(f"    saved_pct               {100 - 100 * sweep.elapsed_ms() // fixed_ms:12}")
+        print(f"    settle_ms_mean          {sum(settle) // len(settle):12}")
+        print(f"    settle_ms_max           {max(settle):12}")
+        print(f"    timeouts                {timeouts:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# Shared plumbing for the host benchmarks: path setup, per-tick metering of loop rate,
+# I2C traffic and heap allocations.
+
+import os
+import sys
+import time
+
+HOST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "host")
+if HOST_DIR not in sys.path:
+    sys.path.insert(0, HOST_DIR)
+
+import sim  # noqa: E402
+
+sim.setup_path()
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import gc  # noqa: E402
+
+
+class StopBench(Exception):
+    """Raised from a tick hook to unwind out of a firmware loop that never returns"""
+
+
+class AllocProbe:
+    """
+    Bytes allocated between mark() and read().
+
+    On MicroPython the GC is disabled while measuring so gc.mem_alloc() deltas are exact.
+    On CPython objects are freed by refcount as they go, so this reports the peak heap
+    growth inside the interval via tracemalloc, a lower bound on what was allocated.
+    """
+
+    def __init__(self):
+        self.micropython = sys.implementation.name == "micropython"
+
+    def start(self):
+        if self.micropython:
+            gc.collect()
+            gc.disable()
+        else:
+            tracemalloc.start()
+
+    def stop(self):
+        if self.micropython:
+            gc.enable()
+        else:
+            tracemalloc.stop()
+
+    def mark(self):
+        if self.micropython:
+            if gc.mem_free() < 8192:
+                gc.collect()
+            self._base = gc.mem_alloc()
+        else:
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+
+    def read(self):
+        if self.micropython:
+            return gc.mem_alloc() - self._base
+        return max(0, tracemalloc.get_traced_memory()[1] - self._base)
+
+
+class TickMeter:
+    """
+    Counts calls of a hooked method as loop ticks and stops the loop after a duration
+    or a number of ticks.
+
+    Example:
+
+        meter = TickMeter(duration_s=2)
+        meter.hook(screen, "_update_readouts")
+        result = meter.run(screen.show, motor, rotary, enc_btn)
+    """
+
+    def __init__(self, duration_s=None, max_ticks=None, measure_allocs=False, warmup=10):
+        self.duration_s = duration_s
+        self.max_ticks = max_ticks
+        self.measure_allocs = measure_allocs
+        self.warmup = warmup
+        self.bus = sim.machine.I2C.bus
+        self._alloc = AllocProbe() if measure_allocs else None
+
+    def hook(self, obj, name):
+        orig = getattr(obj, name)
+
+        def hooked(*args, **kwargs):
+            result = orig(*args, **kwargs)
+            self.tick()
+            return result
+
+        setattr(obj, name, hooked)
+
+    def _reset(self):
+        self.ticks = -self.warmup
+        self.alloc_bytes = 0
+        self.alloc_max = 0
+
+    def tick(self):
+        self.ticks += 1
+        if self.ticks <= 0:
+            if self.ticks == 0:
+                self.bus.reset_stats()
+                self.t_start = time.perf_counter()
+                if self._alloc:
+                    self._alloc.mark()
+            return
+        if self._alloc:
+            n = self._alloc.read()
+            self.alloc_bytes += n
+            self.alloc_max = max(self.alloc_max, n)
+        if (self.max_ticks is not None and self.ticks >= self.max_ticks) or (
+            self.duration_s is not None
+            and time.perf_counter() - self.t_start >= self.duration_s
+        ):
+            raise StopBench
+        if self._alloc:
+            self._alloc.mark()
+
+    def run(self, fn, *args):
+        self._reset()
+        if self._alloc:
+            self._alloc.start()
+        try:
+            fn(*args)
+        except StopBench:
+            pass
+        finally:
+            if self._alloc:
+                self._alloc.stop()
+        elapsed = time.perf_counter() - self.t_start
+        n = max(1, self.ticks)
+        result = {
+            "ticks": self.ticks,
+            "ticks_per_s": self.ticks / elapsed if elapsed else 0,
+            "i2c_per_tick": self.bus.transactions / n,
+            "i2c_bus_us_per_tick": self.bus.bits * 1000000 / 400000 / n,
+        }
+        if self._alloc:
+            result["alloc_bytes_per_tick"] = self.alloc_bytes / n
+            result["alloc_bytes_max_tick"] = self.alloc_max
+        return result
+
+
+def print_result(name, result):
+    print(f"{name}:")
+    for key, value in result.items():
+        if isinstance(value, float):
+            print(f"    {key:<24}{value:12.2f}")
+        else:
+            print(f"    {key:<24}{value:12}")
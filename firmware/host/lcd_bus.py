@@ -0,0 +1,25 @@
+# Host stand-in for the lvgl_micropython lcd_bus module
+
+MEMORY_32BIT = 0x02
+MEMORY_8BIT = 0x04
+MEMORY_DMA = 0x08
+MEMORY_SPIRAM = 0x400
+MEMORY_INTERNAL = 0x800
+MEMORY_DEFAULT = 0x1000
+
+
+class SPIBus:
+    def __init__(self, *, spi_bus=None, freq=-1, dc=-1, cs=-1, **kwargs):
+        self.spi_bus = spi_bus
+        self.freq = freq
+        self.dc = dc
+        self.cs = cs
+
+    def allocate_framebuffer(self, size, caps):
+        return memoryview(bytearray(size))
+
+    def free_framebuffer(self, buf):
+        pass
+
+    def deinit(self):
+        pass
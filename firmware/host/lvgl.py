@@ -0,0 +1,489 @@
+# Headless stand-in for the lvgl_micropython lvgl module.
+#
+# Widgets keep their tree, geometry, text and styles but nothing is drawn. Anything that
+# would make LVGL redraw marks the object dirty, task_handler() "renders" dirty objects and
+# counts frames. Module level `stats` lets benchmarks see how much UI work a loop does.
+
+import mpy_time  # noqa: F401  (patches ticks_ms & co onto time)
+
+
+class _Stats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.objs_created = 0
+        self.objs_deleted = 0
+        self.style_calls = 0
+        self.text_calls = 0
+        self.invalidations = 0
+        self.frames = 0
+        self.ticks_ms = 0
+
+
+stats = _Stats()
+
+_dirty = set()
+
+
+# ─────────────────────────────── Enums ───────────────────────────────────
+
+
+class _Enum:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+PALETTE = _Enum(
+    RED=0,
+    PINK=1,
+    PURPLE=2,
+    DEEP_PURPLE=3,
+    INDIGO=4,
+    BLUE=5,
+    LIGHT_BLUE=6,
+    CYAN=7,
+    TEAL=8,
+    GREEN=9,
+    LIGHT_GREEN=10,
+    LIME=11,
+    YELLOW=12,
+    AMBER=13,
+    ORANGE=14,
+    DEEP_ORANGE=15,
+    BROWN=16,
+    BLUE_GREY=17,
+    GREY=18,
+)
+ALIGN = _Enum(
+    DEFAULT=0,
+    TOP_LEFT=1,
+    TOP_MID=2,
+    TOP_RIGHT=3,
+    BOTTOM_LEFT=4,
+    BOTTOM_MID=5,
+    BOTTOM_RIGHT=6,
+    LEFT_MID=7,
+    RIGHT_MID=8,
+    CENTER=9,
+)
+STATE = _Enum(
+    DEFAULT=0x0000,
+    CHECKED=0x0001,
+    FOCUSED=0x0002,
+    FOCUS_KEY=0x0004,
+    EDITED=0x0008,
+    HOVERED=0x0010,
+    PRESSED=0x0020,
+    SCROLLED=0x0040,
+    DISABLED=0x0080,
+    USER_1=0x1000,
+    USER_2=0x2000,
+    USER_3=0x4000,
+    USER_4=0x8000,
+    ANY=0xFFFF,
+)
+PART = _Enum(MAIN=0x000000, SCROLLBAR=0x010000, INDICATOR=0x020000, ANY=0x0F0000)
+OBJ_FLAG = _Enum(HIDDEN=0x0001, CLICKABLE=0x0002, SCROLLABLE=0x0010)
+COLOR_FORMAT = _Enum(RGB565=0x12, RGB888=0x0F, ARGB8888=0x10)
+DISPLAY_ROTATION = _Enum(_0=0, _90=1, _180=2, _270=3)
+DISPLAY_RENDER_MODE = _Enum(PARTIAL=0, DIRECT=1, FULL=2)
+EVENT = _Enum(ALL=0, INVALIDATE_AREA=49, REFR_REQUEST=51, RENDER_START=53, RENDER_READY=54)
+SCREEN_LOAD_ANIM = _Enum(NONE=0, OVER_LEFT=1, FADE_IN=9)
+SYMBOL = _Enum(
+    PLAY="",
+    PAUSE="",
+    STOP="",
+    REFRESH="",
+    CHARGE="",
+    LIST="",
+    SETTINGS="",
+    LEFT="",
+    RIGHT="",
+    OK="",
+    CLOSE="",
+    WARNING="",
+)
+
+
+# ─────────────────────────────── Colours ─────────────────────────────────
+
+
+class color_t:
+    def __init__(self, rgb=0):
+        self.rgb = rgb & 0xFFFFFF
+
+    def __eq__(self, other):
+        return isinstance(other, color_t) and other.rgb == self.rgb
+
+    def __hash__(self):
+        return self.rgb
+
+    def __repr__(self):
+        return f"color_t(0x{self.rgb:06x})"
+
+
+def color_hex(rgb):
+    return color_t(rgb)
+
+
+def color_white():
+    return color_t(0xFFFFFF)
+
+
+def color_black():
+    return color_t(0x000000)
+
+
+def palette_main(p):
+    return color_t(0x101010 * (p % 16))
+
+
+def palette_lighten(p, lvl):
+    return color_t((0x101010 * (p % 16) + 0x111111 * lvl) & 0xFFFFFF)
+
+
+def palette_darken(p, lvl):
+    return color_t(max(0, 0x101010 * (p % 16) - 0x030303 * lvl))
+
+
+class _Font:
+    def __init__(self, name, line_height):
+        self.name = name
+        self.line_height = line_height
+
+
+font_montserrat_12 = _Font("montserrat_12", 15)
+font_montserrat_14 = _Font("montserrat_14", 16)
+font_montserrat_16 = _Font("montserrat_16", 19)
+
+
+# ─────────────────────────────── Styles ──────────────────────────────────
+
+
+class style_t:
+    """Shared style object, set_* calls record properties like lv_style_set_*()"""
+
+    def __init__(self):
+        self.props = {}
+
+    def init(self):
+        self.props = {}
+
+    def reset(self):
+        self.props = {}
+
+    def __getattr__(self, name):
+        if name.startswith("set_"):
+            prop = name[4:]
+
+            def setter(value):
+                self.props[prop] = value
+
+            return setter
+        raise AttributeError(name)
+
+
+# ─────────────────────────────── Objects ─────────────────────────────────
+
+
+class obj:
+    """
+    Base widget. set_style_* calls are accepted for any property and recorded as local
+    styles keyed by (property, selector).
+    """
+
+    def __init__(self, parent=None):
+        self._parent = parent
+        self._children = []
+        self._local = {}
+        self._styles = []
+        self._state = STATE.DEFAULT
+        self._flags = 0
+        self._x = self._y = 0
+        self._w = self._h = 0
+        self._align = None
+        self._deleted = False
+        if parent is not None:
+            parent._children.append(self)
+        stats.objs_created += 1
+        self.invalidate()
+
+    def __getattr__(self, name):
+        if name.startswith("set_style_"):
+            prop = name[10:]
+
+            def setter(value, selector=0):
+                stats.style_calls += 1
+                self._local[(prop, selector)] = value
+                self.invalidate()
+
+            return setter
+        raise AttributeError(name)
+
+    def get_local_style(self, prop, selector=0):
+        """Host only: read back a local style property"""
+        return self._local.get((prop, selector))
+
+    def invalidate(self):
+        stats.invalidations += 1
+        _dirty.add(self)
+        _display.send_event(EVENT.INVALIDATE_AREA)
+
+    # Tree
+    def get_parent(self):
+        return self._parent
+
+    def get_screen(self):
+        o = self
+        while o._parent is not None:
+            o = o._parent
+        return o
+
+    def get_child(self, idx):
+        if not self._children:
+            return None
+        return self._children[idx]
+
+    def get_child_count(self):
+        return len(self._children)
+
+    def clean(self):
+        while self._children:
+            self._children[0].delete()
+
+    def delete(self):
+        if self._deleted:
+            return
+        self.clean()
+        if self._parent is not None:
+            self._parent._children.remove(self)
+            self._parent.invalidate()
+        self._deleted = True
+        _dirty.discard(self)
+        stats.objs_deleted += 1
+
+    # Geometry
+    def set_size(self, w, h):
+        self._w, self._h = w, h
+        self.invalidate()
+
+    def set_width(self, w):
+        self._w = w
+        self.invalidate()
+
+    def set_height(self, h):
+        self._h = h
+        self.invalidate()
+
+    def set_pos(self, x, y):
+        self._x, self._y = x, y
+        self.invalidate()
+
+    def set_x(self, x):
+        self._x = x
+        self.invalidate()
+
+    def set_y(self, y):
+        self._y = y
+        self.invalidate()
+
+    def align(self, align, x_ofs=0, y_ofs=0):
+        self._align = (align, x_ofs, y_ofs)
+        self.invalidate()
+
+    def get_width(self):
+        return self._w
+
+    def get_height(self):
+        return self._h
+
+    # Shared styles, states and flags
+    def add_style(self, style, selector=0):
+        self._styles.append((style, selector))
+        self.invalidate()
+
+    def remove_style(self, style=None, selector=0):
+        self._styles = [
+            (s, sel)
+            for s, sel in self._styles
+            if not ((style is None or s is style) and sel == selector)
+        ]
+        self.invalidate()
+
+    def remove_style_all(self):
+        self._styles = []
+        self._local = {}
+        self.invalidate()
+
+    def add_state(self, state):
+        if self._state | state != self._state:
+            self._state |= state
+            self.invalidate()
+
+    def remove_state(self, state):
+        if self._state & state:
+            self._state &= ~state
+            self.invalidate()
+
+    def has_state(self, state):
+        return bool(self._state & state)
+
+    def get_state(self):
+        return self._state
+
+    def add_flag(self, flag):
+        self._flags |= flag
+        self.invalidate()
+
+    def remove_flag(self, flag):
+        self._flags &= ~flag
+        self.invalidate()
+
+    def has_flag(self, flag):
+        return bool(self._flags & flag)
+
+
+class label(obj):
+    def __init__(self, parent=None):
+        self._text = "Text"
+        super().__init__(parent)
+
+    def set_text(self, text):
+        stats.text_calls += 1
+        if isinstance(text, (bytes, bytearray)):
+            # A char * in C, LVGL copies up to the NUL
+            text = bytes(text).split(b"\0", 1)[0].decode()
+        self._text = text
+        self.invalidate()
+
+    def get_text(self):
+        return self._text
+
+
+class bar(obj):
+    def __init__(self, parent=None):
+        self._value = 0
+        self._range = (0, 100)
+        super().__init__(parent)
+
+    def set_range(self, lo, hi):
+        self._range = (lo, hi)
+        self.invalidate()
+
+    def set_value(self, value, anim=0):
+        if value != self._value:
+            self._value = value
+            self.invalidate()
+
+    def get_value(self):
+        return self._value
+
+
+# ─────────────────────────────── Display ─────────────────────────────────
+
+
+class event_t:
+    def __init__(self, code, user_data=None):
+        self._code = code
+        self._user_data = user_data
+
+    def get_code(self):
+        return self._code
+
+    def get_user_data(self):
+        return self._user_data
+
+
+class display_t:
+    """The one display, only its event callbacks are modelled"""
+
+    def __init__(self):
+        self._event_cbs = []
+
+    def add_event_cb(self, cb, filter, user_data=None):
+        self._event_cbs.append((cb, filter, user_data))
+
+    def remove_event_cb(self, cb):
+        self._event_cbs = [e for e in self._event_cbs if e[0] is not cb]
+
+    def send_event(self, code):
+        for cb, filter, user_data in self._event_cbs:
+            if filter in (EVENT.ALL, code):
+                cb(event_t(code, user_data))
+
+
+_display = display_t()
+
+
+def display_get_default():
+    return _display
+
+
+# ─────────────────────────────── Screens ─────────────────────────────────
+
+_active_screen = None
+
+
+def screen_active():
+    global _active_screen
+    if _active_screen is None:
+        _active_screen = obj(None)
+    return _active_screen
+
+
+def screen_load(scr):
+    global _active_screen
+    _active_screen = scr
+    scr.invalidate()
+
+
+def screen_load_anim(scr, anim=0, time=0, delay=0, auto_del=False):
+    screen_load(scr)
+
+
+# ──────────────────────────────── Core ───────────────────────────────────
+
+
+def init():
+    pass
+
+
+def deinit():
+    pass
+
+
+def is_initialized():
+    return True
+
+
+def tick_inc(ms):
+    stats.ticks_ms += ms
+
+
+def tick_get():
+    return stats.ticks_ms
+
+
+def timer_handler():
+    """Render a frame if anything on the active screen has been invalidated"""
+    if _dirty:
+        _dirty.clear()
+        stats.frames += 1
+    return 1
+
+
+task_handler = timer_handler
+
+
+def refr_now(disp=None):
+    timer_handler()
+
+
+def reset():
+    """Host only: drop all widgets and counters, as if LVGL was freshly initialised"""
+    global _active_screen, _display
+    _active_screen = None
+    _display = display_t()
+    _dirty.clear()
+    stats.reset()
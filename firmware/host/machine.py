@@ -0,0 +1,445 @@
+# Host stand-in for the MicroPython machine module (ESP32 port flavour).
+#
+# Only the parts the firmware touches are modelled. I2C traffic is routed to the register
+# level device models in sim.py and every transaction is counted so benchmarks can report
+# bus load. Pin IRQ handlers and Timer callbacks are soft IRQs, queued on a scheduler with
+# the same depth as the ESP32 port and run one at a time while holding the IRQ lock, so
+# disable_irq() / enable_irq() behave like the real critical sections and a long callback
+# makes later IRQs drop. Counter edges are counted in "hardware" with no Python per edge.
+
+import collections
+import errno
+import sys
+import threading
+import time
+
+import mpy_time  # noqa: F401  (patches ticks_ms & co onto time)
+
+# Soft IRQs run between bytecodes on the device. CPython only hands the GIL to the IRQ
+# threads every 5ms by default, which would cap 1ms timers at ~200Hz next to a busy loop.
+sys.setswitchinterval(0.0001)
+
+_irq_lock = threading.RLock()
+
+
+class _Scheduler:
+    """
+    MicroPython's soft IRQ queue. Tasks that don't fit in DEPTH are dropped.
+
+    By default a dispatcher thread runs tasks as they arrive. With threaded = False nothing
+    runs until the owner calls run_one(), which lets benchmarks step the queue against
+    virtual time.
+    """
+
+    DEPTH = 8
+
+    def __init__(self):
+        self.threaded = True
+        self.dropped = 0
+        self.ran = 0
+        self._pending = collections.deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, fn, arg):
+        with self._cond:
+            if len(self._pending) >= self.DEPTH:
+                self.dropped += 1
+                return False
+            self._pending.append((fn, arg))
+            if self.threaded:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+        return True
+
+    def pending(self):
+        return len(self._pending)
+
+    def run_one(self):
+        with self._cond:
+            if not self._pending:
+                return False
+            fn, arg = self._pending.popleft()
+        with _irq_lock:
+            fn(arg)
+        self.ran += 1
+        return True
+
+    def reset(self):
+        with self._cond:
+            self._pending.clear()
+            self.dropped = 0
+            self.ran = 0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending or not self.threaded:
+                    self._cond.wait(0.01)
+            self.run_one()
+
+
+scheduler = _Scheduler()
+
+
+def disable_irq():
+    _irq_lock.acquire()
+    return 1
+
+
+def enable_irq(state=1):
+    _irq_lock.release()
+
+
+def freq(hz=None):
+    return 240000000
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+def soft_reset():
+    raise SystemExit("machine.soft_reset()")
+
+
+def reset_cause():
+    return PWRON_RESET
+
+
+def unique_id():
+    return b"\x00host\x00"
+
+
+def idle():
+    time.sleep(0)
+
+
+PWRON_RESET = 1
+HARD_RESET = 2
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+
+
+# ───────────────────────────────── Pin ──────────────────────────────────
+
+
+class Pin:
+    """
+    GPIO stand-in. Pins are singletons per id like the ESP32 port, so the simulator
+    can look up the pin a driver created and drive it or read it back.
+
+    Sim side:
+        Pin.get(2).drive(0)  # Pull pin 2 low, fires any falling edge IRQ
+    """
+
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    _pins = {}
+
+    def __new__(cls, id, *args, **kwargs):
+        pin = cls._pins.get(id)
+        if pin is None:
+            pin = super().__new__(cls)
+            pin._id = id
+            pin._mode = cls.IN
+            pin._pull = None
+            pin._level = 0
+            pin._handler = None
+            pin._trigger = 0
+            pin._edge_listeners = []
+            cls._pins[id] = pin
+        return pin
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.init(mode, pull, value)
+
+    def __repr__(self):
+        return f"Pin({self._id})"
+
+    @classmethod
+    def get(cls, id):
+        """Sim side: return the pin object for an id, creating it if needed"""
+        return cls(id)
+
+    @classmethod
+    def reset_all(cls):
+        cls._pins = {}
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self._mode = mode
+        if pull != -1:
+            self._pull = pull
+            if self._mode == self.IN and pull == self.PULL_UP:
+                self._level = 1
+        if value is not None:
+            self._level = 1 if value else 0
+
+    def value(self, x=None):
+        if x is None:
+            return self._level
+        self._level = 1 if x else 0
+
+    def on(self):
+        self._level = 1
+
+    def off(self):
+        self._level = 0
+
+    def __call__(self, x=None):
+        return self.value(x)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+        self._trigger = trigger if handler else 0
+
+    # Sim side ────────────────────────────────────────────────────────────
+
+    def drive(self, level):
+        """Set an input level from outside, firing IRQ handlers on edges"""
+        level = 1 if level else 0
+        if level == self._level:
+            return
+        self._level = level
+        edge = self.IRQ_RISING if level else self.IRQ_FALLING
+        for listener in self._edge_listeners:
+            listener(edge)
+        if self._handler is not None and self._trigger & edge:
+            scheduler.schedule(self._handler, self)
+
+    def pulse(self):
+        """One falling then rising edge, i.e. one count on an active low sensor"""
+        self.drive(0)
+        self.drive(1)
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_11DB = 3
+
+    def __init__(self, pin, *, atten=None):
+        self.pin = pin
+
+    def read_u16(self):
+        return 0xFFFF if self.pin.value() else 0
+
+    def read_uv(self):
+        return 3300000 if self.pin.value() else 0
+
+
+# ───────────────────────────────── I2C ──────────────────────────────────
+
+
+class _Bus:
+    """The single physical I2C bus shared by every I2C() object"""
+
+    def __init__(self):
+        self.devices = {}
+        self.stall = False  # Block for the time the transfer would take on the wire
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.bits = 0
+
+    def _count(self, n_addr, n_data, freq):
+        # Each byte is 8 data bits + ACK, plus a start and stop condition per transaction
+        bits = 9 * (n_addr + n_data) + 2
+        self.transactions += 1
+        self.bytes += n_data
+        self.bits += bits
+        if self.stall:
+            end = time.perf_counter() + bits / freq
+            while time.perf_counter() < end:
+                pass
+
+    def device(self, addr):
+        dev = self.devices.get(addr)
+        if dev is None:
+            raise OSError(errno.ENODEV, "ENODEV")
+        return dev
+
+
+class I2C:
+    """
+    I2C stand-in. Devices are the register models in sim.py, attached by address.
+
+    Sim side:
+        I2C.bus.devices[0x40] = sim.INA219Model()
+        I2C.bus.transactions  # Transactions since the last reset_stats()
+    """
+
+    bus = _Bus()
+
+    def __init__(self, id=0, *, scl=None, sda=None, freq=400000, timeout=50000):
+        self.scl = scl
+        self.sda = sda
+        self.freq = freq
+
+    def bus_time_us(self, bits=None):
+        """Time the bus has been busy, estimated from bits clocked at self.freq"""
+        if bits is None:
+            bits = self.bus.bits
+        return bits * 1000000 / self.freq
+
+    def scan(self):
+        return sorted(self.bus.devices)
+
+    def writeto(self, addr, buf, stop=True):
+        dev = self.bus.device(addr)
+        self.bus._count(1, len(buf), self.freq)
+        dev.i2c_write(bytes(buf))
+        return len(buf)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        dev = self.bus.device(addr)
+        self.bus._count(1, nbytes, self.freq)
+        return bytes(dev.i2c_read(nbytes))
+
+    def readfrom_into(self, addr, buf, stop=True):
+        buf[:] = self.readfrom(addr, len(buf), stop)
+
+    def writeto_mem(self, addr, memaddr, buf, *, addrsize=8):
+        dev = self.bus.device(addr)
+        self.bus._count(1, 1 + len(buf), self.freq)
+        dev.i2c_write(bytes((memaddr,)) + bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8):
+        dev = self.bus.device(addr)
+        # Pointer write, repeated start, then read
+        self.bus._count(2, 1 + nbytes, self.freq)
+        dev.i2c_write(bytes((memaddr,)))
+        return bytes(dev.i2c_read(nbytes))
+
+    def readfrom_mem_into(self, addr, memaddr, buf, *, addrsize=8):
+        buf[:] = self.readfrom_mem(addr, memaddr, len(buf), addrsize=addrsize)
+
+
+SoftI2C = I2C
+
+
+# ──────────────────────────────── Timer ─────────────────────────────────
+
+
+class Timer:
+    """Periodic / one-shot callbacks, scheduled as soft IRQs from a background thread"""
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self._id = id
+        self._thread = None
+        self._stop = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, *, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        self.deinit()
+        if freq > 0:
+            period_s = 1 / freq
+        else:
+            period_s = max(period, 1) / 1000
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(mode, period_s, callback, self._stop), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, mode, period_s, callback, stop):
+        deadline = time.perf_counter() + period_s
+        while not stop.wait(max(0, deadline - time.perf_counter())):
+            if callback is not None:
+                scheduler.schedule(callback, self)
+            if mode == self.ONE_SHOT:
+                return
+            deadline += period_s
+
+    def deinit(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+            self._thread = None
+
+
+# ─────────────────────────────── Counter ────────────────────────────────
+
+
+class Counter:
+    """
+    Hardware pulse counter (ESP32 PCNT) stand-in. Counts edges on src without running
+    any Python per edge. The count wraps like the 16-bit PCNT unit so window reads have to
+    be overflow safe.
+    """
+
+    RISING = 1
+    FALLING = 2
+    UP = 1
+    DOWN = -1
+
+    def __init__(self, id, src=None, **kwargs):
+        self._id = id
+        self._src = None
+        self._count = 0
+        self._edge = self.RISING
+        self._direction = self.UP
+        self.init(src, **kwargs)
+
+    def init(self, src=None, *, edge=None, direction=None, filter_ns=0):
+        if edge is not None:
+            self._edge = edge
+        if direction is not None:
+            self._direction = direction
+        if src is not None:
+            self.deinit()
+            self._src = src
+            src._edge_listeners.append(self._on_edge)
+
+    def _on_edge(self, edge):
+        if edge & self._edge:
+            self._count = ((self._count + self._direction + 0x8000) & 0xFFFF) - 0x8000
+
+    def value(self, value=None):
+        current = self._count
+        if value is not None:
+            self._count = value
+        return current
+
+    def deinit(self):
+        if self._src is not None and self._on_edge in self._src._edge_listeners:
+            self._src._edge_listeners.remove(self._on_edge)
+        self._src = None
+
+
+# ───────────────────────────────── SPI ──────────────────────────────────
+
+
+class SPI:
+    """Just enough of the lvgl_micropython machine.SPI.Bus API to build a display"""
+
+    class Bus:
+        def __init__(self, host=1, mosi=None, miso=-1, sck=None, **kwargs):
+            self.host = host
+            self.mosi = mosi
+            self.miso = miso
+            self.sck = sck
+
+        def deinit(self):
+            pass
+
+    class Device:
+        def __init__(self, spi_bus=None, freq=1000000, cs=-1, **kwargs):
+            self.spi_bus = spi_bus
+            self.freq = freq
+            self.cs = cs
@@ -0,0 +1,29 @@
+# Host stand-in for the MicroPython micropython module
+
+import mpy_time  # noqa: F401  (patches ticks_ms & co onto time)
+import machine
+
+
+def const(value):
+    return value
+
+
+def native(fn):
+    return fn
+
+
+def viper(fn):
+    return fn
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(fn, arg):
+    if not machine.scheduler.schedule(fn, arg):
+        raise RuntimeError("schedule queue full")
+
+
+def mem_info(verbose=False):
+    print("mem: host stand-in, no MicroPython heap")
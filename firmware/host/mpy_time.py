@@ -0,0 +1,54 @@
+# MicroPython flavoured time functions for running firmware on the host.
+#
+# MicroPython's time module has ticks_ms/ticks_us/ticks_diff/sleep_ms which CPython lacks.
+# Importing this module patches them onto the standard time module so the firmware
+# can use them unchanged. Ticks wrap at 2**30 like the ESP32 port, so wraparound bugs
+# still show up on the host.
+
+import time
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+_epoch = time.perf_counter()
+
+
+def ticks_us():
+    return int((time.perf_counter() - _epoch) * 1000000) & TICKS_MAX
+
+
+def ticks_ms():
+    return int((time.perf_counter() - _epoch) * 1000) & TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+
+def sleep_ms(ms):
+    if ms > 0:
+        time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    if us > 0:
+        time.sleep(us / 1000000)
+
+
+def install():
+    """Patch the MicroPython-only functions onto the time module (idempotent)"""
+    for fn in (ticks_us, ticks_ms, ticks_cpu, ticks_add, ticks_diff, sleep_ms, sleep_us):
+        if not hasattr(time, fn.__name__):
+            setattr(time, fn.__name__, fn)
+
+
+install()
@@ -0,0 +1,649 @@
+# Register level models of the tester's I2C devices plus a simple motor, used to run the
+# firmware on the host.
+#
+# The models sit behind the machine.I2C stand-in and only see raw bus traffic, the same as
+# the real parts. Bit layouts, pointer registers and the INA219 CNVR / volatile calibration
+# behaviour follow the datasheets closely enough for driver and bus load work, the motor
+# and thermal models are only there to give the sensors plausible numbers.
+
+import io
+import math
+import random
+import sys
+import tempfile
+import threading
+import time
+import os
+
+import mpy_time  # noqa: F401  (patches ticks_ms & co onto time)
+import machine
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(HOST_DIR), "src")
+
+
+def setup_path():
+    """Put the stand-in modules and then the firmware sources on sys.path"""
+    for path in (SRC_DIR, HOST_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def _now():
+    return time.perf_counter()
+
+
+class _RegisterDevice:
+    """
+    I2C device with an 8-bit pointer register and 16-bit big endian registers.
+    A one byte write sets the pointer, longer writes set the pointer then the register.
+    """
+
+    def __init__(self):
+        self.pointer = 0
+        self.reads = 0
+        self.writes = 0
+
+    def i2c_write(self, data):
+        self.pointer = data[0]
+        if len(data) >= 3:
+            self.writes += 1
+            self.write_register(self.pointer, (data[1] << 8) | data[2])
+
+    def i2c_read(self, n):
+        self.reads += 1
+        value = self.read_register(self.pointer) & 0xFFFF
+        out = bytes(((value >> 8) & 0xFF, value & 0xFF))
+        return (out * ((n + 1) // 2))[:n]
+
+    def read_register(self, reg):
+        raise NotImplementedError
+
+    def write_register(self, reg, value):
+        raise NotImplementedError
+
+
+def _to_u16(value):
+    return int(value) & 0xFFFF
+
+
+# ──────────────────────────────── INA219 ────────────────────────────────
+
+
+class INA219Model(_RegisterDevice):
+    """
+    TI INA219 with a 10mR shunt.
+
+    source() returns (bus_mv, current_ma) for the quantity being measured. Conversions run
+    on the datasheet timing for the configured ADC resolution / averaging, CNVR is set in
+    the bus register when a conversion completes and cleared by reading the power
+    register. The calibration register is volatile and power_on_reset() clears it.
+    """
+
+    REG_CONFIG = 0x00
+    REG_SHUNT = 0x01
+    REG_BUS = 0x02
+    REG_POWER = 0x03
+    REG_CURRENT = 0x04
+    REG_CAL = 0x05
+
+    CONFIG_DEFAULT = 0x399F
+
+    # ADC field -> (conversion time us, samples averaged)
+    _ADC_TIMING = {
+        0b0000: (84, 1),
+        0b0001: (148, 1),
+        0b0010: (276, 1),
+        0b0011: (532, 1),
+        0b1000: (532, 1),
+        0b1001: (1060, 2),
+        0b1010: (2130, 4),
+        0b1011: (4260, 8),
+        0b1100: (8510, 16),
+        0b1101: (17020, 32),
+        0b1110: (34050, 64),
+        0b1111: (68100, 128),
+    }
+
+    def __init__(self, source=None, rshunt_mohm=10, noise_ma=0.0, seed=1):
+        super().__init__()
+        self.source = source or (lambda: (0, 0))
+        self.rshunt_mohm = rshunt_mohm
+        self.noise_ma = noise_ma
+        self._rand = random.Random(seed)
+        self.power_on_reset()
+
+    def power_on_reset(self):
+        self.config = self.CONFIG_DEFAULT
+        self.cal = 0
+        self._shunt = 0
+        self._bus_mv = 0
+        self._start_conversions()
+
+    def _adc_timing(self, field):
+        if field & 0b1000 == 0:
+            field &= 0b0011
+        return self._ADC_TIMING[field]
+
+    def conversion_time_us(self):
+        mode = self.config & 0x7
+        t_bus, _ = self._adc_timing((self.config >> 7) & 0xF)
+        t_shunt, _ = self._adc_timing((self.config >> 3) & 0xF)
+        return (t_shunt if mode & 0x1 else 0) + (t_bus if mode & 0x2 else 0)
+
+    def _start_conversions(self):
+        self._t0 = _now()
+        self._latched = 0
+        self._cnvr_cleared = 0
+
+    def _completed(self):
+        """Number of conversions completed since the last config write"""
+        mode = self.config & 0x7
+        if mode in (0, 4):
+            return self._latched
+        period = self.conversion_time_us() / 1000000
+        done = int((_now() - self._t0) / period) if period else 0
+        if mode < 4:
+            done = min(done, 1)  # Triggered, single shot
+        return done
+
+    def _update(self):
+        done = self._completed()
+        if done > self._latched:
+            self._latched = done
+            bus_mv, current_ma = self.source()
+            _, n_avg = self._adc_timing((self.config >> 3) & 0xF)
+            if self.noise_ma:
+                current_ma += self._rand.gauss(0, self.noise_ma / math.sqrt(n_avg))
+            # 1 LSB = 10uV across the shunt
+            shunt = current_ma * self.rshunt_mohm / 10
+            pga = 1 << ((self.config >> 11) & 0x3)
+            limit = 4000 * pga
+            self._shunt = int(max(-limit, min(limit, round(shunt))))
+            self._bus_mv = max(0, bus_mv)
+
+    @property
+    def cnvr(self):
+        self._update()
+        return self._latched > self._cnvr_cleared
+
+    def _current_raw(self):
+        return int(self._shunt * self.cal / 4096)
+
+    def read_register(self, reg):
+        self._update()
+        if reg == self.REG_CONFIG:
+            return self.config
+        if reg == self.REG_SHUNT:
+            return _to_u16(self._shunt)
+        if reg == self.REG_BUS:
+            ovf = abs(self._shunt) >= 4000 * (1 << ((self.config >> 11) & 0x3))
+            cnvr = self._latched > self._cnvr_cleared
+            return (int(self._bus_mv / 4) << 3) | (cnvr << 1) | ovf
+        if reg == self.REG_POWER:
+            self._cnvr_cleared = self._latched
+            bus_raw = int(self._bus_mv / 4)
+            return _to_u16(abs(self._current_raw()) * bus_raw // 5000)
+        if reg == self.REG_CURRENT:
+            return _to_u16(self._current_raw())
+        if reg == self.REG_CAL:
+            return self.cal
+        return 0
+
+    def write_register(self, reg, value):
+        if reg == self.REG_CONFIG:
+            if value & 0x8000:
+                self.power_on_reset()
+                return
+            self.config = value
+            self._start_conversions()
+        elif reg == self.REG_CAL:
+            self.cal = value & 0xFFFE
+
+
+# ──────────────────────────────── MCP4725 ───────────────────────────────
+
+
+class MCP4725Model:
+    """Microchip MCP4725 12-bit DAC, fast mode and write DAC register commands"""
+
+    def __init__(self, vcc_mv=3300):
+        self.vcc_mv = vcc_mv
+        self.value = 0
+        self.eeprom = 0
+        self.power_down = 0
+        self.writes = 0
+        self.on_change = None
+
+    def _set(self, value, pd):
+        self.value = value & 0xFFF
+        self.power_down = pd
+        self.writes += 1
+        if self.on_change is not None:
+            self.on_change(self.value)
+
+    def i2c_write(self, data):
+        cmd = data[0] >> 5
+        if data[0] >> 6 == 0:
+            # Fast mode, 2 bytes per update and can be repeated
+            for i in range(0, len(data) - 1, 2):
+                self._set(((data[i] & 0x0F) << 8) | data[i + 1], (data[i] >> 4) & 0x3)
+        elif cmd in (0b010, 0b011) and len(data) >= 3:
+            self._set((data[1] << 4) | (data[2] >> 4), (data[0] >> 1) & 0x3)
+            if cmd == 0b011:
+                self.eeprom = self.value
+
+    def i2c_read(self, n):
+        status = 0x80 | (self.power_down << 1)
+        out = bytes(
+            (
+                status,
+                self.value >> 4,
+                (self.value & 0xF) << 4,
+                self.eeprom >> 8,
+                self.eeprom & 0xFF,
+            )
+        )
+        return (out * (n // 5 + 1))[:n]
+
+    def output_mv(self):
+        return self.value / 4095 * self.vcc_mv
+
+
+# ──────────────────────────────── TMP1075 ───────────────────────────────
+
+
+class TMP1075Model(_RegisterDevice):
+    """
+    TI TMP1075 temperature sensor.
+
+    source() returns the temperature in C. Continuous conversions at the configured rate,
+    or single conversions via the OS bit in shutdown mode. ALERT follows comparator or
+    interrupt mode against HLIM / LLIM and drives alert_pin (open drain, active low unless
+    POL is set).
+    """
+
+    REG_TEMP = 0x00
+    REG_CONFIG = 0x01
+    REG_LLIM = 0x02
+    REG_HLIM = 0x03
+    REG_DIEID = 0x0F
+
+    CONV_TIME_US = 5500
+    _RATE_MS = (27.5, 55, 110, 220)
+    _FAULTS = (1, 2, 4, 6)
+
+    def __init__(self, source=None, alert_pin=None):
+        super().__init__()
+        self.source = source or (lambda: 25.0)
+        self.alert_pin = alert_pin
+        self.conversions = 0
+        self.config = 0x00FF
+        self.llim = 0x4B00  # 75C
+        self.hlim = 0x5000  # 80C
+        self._temp = self._encode(self.source())
+        self._alert = False
+        self._fault_count = 0
+        self._t_next = _now()
+        self._oneshot_done = None
+        self._drive_alert()
+
+    @staticmethod
+    def _encode(temp_c):
+        return _to_u16(int(round(temp_c / 0.0625)) << 4)
+
+    @staticmethod
+    def _decode(raw):
+        if raw & 0x8000:
+            raw -= 0x10000
+        return (raw >> 4) * 0.0625
+
+    def _convert(self):
+        self.conversions += 1
+        self._temp = self._encode(self.source())
+        temp = self._decode(self._temp)
+        faults = self._FAULTS[(self.config >> 11) & 0x3]
+        interrupt_mode = self.config & 0x0200
+        if not self._alert:
+            if temp >= self._decode(self.hlim):
+                self._fault_count += 1
+                if self._fault_count >= faults:
+                    self._alert = True
+                    self._fault_count = 0
+            else:
+                self._fault_count = 0
+        elif not interrupt_mode and temp < self._decode(self.llim):
+            self._alert = False
+        self._drive_alert()
+
+    def _drive_alert(self):
+        if self.alert_pin is not None:
+            active_high = bool(self.config & 0x0400)
+            self.alert_pin.drive(self._alert == active_high)
+
+    def _update(self):
+        now = _now()
+        if self.config & 0x0100:
+            if self._oneshot_done is not None and now >= self._oneshot_done:
+                self._oneshot_done = None
+                self._convert()
+            return
+        period = self._RATE_MS[(self.config >> 13) & 0x3] / 1000
+        if now >= self._t_next:
+            self._convert()
+            self._t_next = now + period
+
+    def read_register(self, reg):
+        self._update()
+        if reg == self.REG_TEMP:
+            return self._temp
+        if reg == self.REG_CONFIG:
+            return self.config
+        if reg == self.REG_LLIM:
+            return self.llim
+        if reg == self.REG_HLIM:
+            return self.hlim
+        if reg == self.REG_DIEID:
+            return 0x7500
+        return 0
+
+    def write_register(self, reg, value):
+        self._update()
+        if reg == self.REG_CONFIG:
+            if value & 0x8000 and value & 0x0100:
+                self._oneshot_done = _now() + self.CONV_TIME_US / 1000000
+            self.config = (value & 0x7F00) | 0xFF
+        elif reg == self.REG_LLIM:
+            self.llim = value & 0xFFF0
+        elif reg == self.REG_HLIM:
+            self.hlim = value & 0xFFF0
+
+    def i2c_read(self, n):
+        data = super().i2c_read(n)
+        # Reading any register clears a latched ALERT in interrupt mode
+        if self._alert and self.config & 0x0200:
+            self._alert = False
+            self._drive_alert()
+        return data
+
+
+# ───────────────────────────────── Motor ────────────────────────────────
+
+
+class MotorModel:
+    """
+    Brushed DC motor behind the DRV8837, fed by the buck converter, with a lumped thermal
+    model of the can. Defaults are ballpark for a Mini 4WD motor at 3V.
+
+    Integrated lazily up to "now" whenever anything reads it.
+    """
+
+    def __init__(
+        self,
+        psu_en_pin=16,
+        drv_en_pin=15,
+        drv_in1_pin=6,
+        drv_in2_pin=5,
+        dac=None,
+        r_ohm=1.0,
+        ke=0.00115,
+        j=2e-7,
+        i0_ma=300,
+        t_amb_c=25.0,
+        r_th=40.0,
+        c_th=5.0,
+    ):
+        self.psu_en = machine.Pin.get(psu_en_pin)
+        self.drv_en = machine.Pin.get(drv_en_pin)
+        self.in1 = machine.Pin.get(drv_in1_pin)
+        self.in2 = machine.Pin.get(drv_in2_pin)
+        self.dac = dac
+        self.r_ohm = r_ohm
+        self.ke = ke
+        self.j = j
+        self.t_friction = ke * i0_ma / 1000
+        self.t_amb_c = t_amb_c
+        self.r_th = r_th
+        self.c_th = c_th
+
+        self.omega = 0.0
+        self.current_a = 0.0
+        self.temp_c = t_amb_c
+        self.load_nm = 0.0
+        self.locked = False  # Rotor held still, e.g. jammed gears
+        self._lock = threading.Lock()
+        self._t = _now()
+
+    def psu_mv(self):
+        """Buck output, inverse of the PSU.set_voltage_mv() transfer function"""
+        if not self.psu_en.value() or self.dac is None:
+            return 0.0
+        return max(0.0, 4060 - 1.01 * self.dac.output_mv())
+
+    def _step(self, dt):
+        v_psu = self.psu_mv() / 1000
+        if not self.drv_en.value():
+            drive = None  # Coast
+        elif self.in1.value() == self.in2.value():
+            drive = 0  # Brake, windings shorted
+        else:
+            drive = 1 if self.in1.value() else -1
+
+        if drive is None:
+            i = 0.0
+        else:
+            i = (drive * v_psu - self.ke * self.omega) / self.r_ohm
+        torque = self.ke * i - self.load_nm * (1 if self.omega >= 0 else -1)
+        friction = self.t_friction
+        if self.locked or (abs(self.omega) < 1 and abs(torque) <= friction):
+            self.omega = 0.0
+        else:
+            torque -= friction * (1 if self.omega > 0 else -1 if self.omega < 0 else 0)
+            self.omega += torque / self.j * dt
+
+        # Supply only sees current while driving, the buck can't sink
+        self.current_a = max(0.0, i * drive) if drive else 0.0
+        p_loss = i * i * self.r_ohm
+        self.temp_c += (p_loss - (self.temp_c - self.t_amb_c) / self.r_th) / self.c_th * dt
+
+    def advance(self):
+        with self._lock:
+            now = _now()
+            dt = now - self._t
+            self._t = now
+            while dt > 0:
+                step = min(dt, 0.0005)
+                self._step(step)
+                dt -= step
+
+    @property
+    def rpm(self):
+        self.advance()
+        return self.omega * 60 / (2 * math.pi)
+
+    def supply(self):
+        """(bus_mv, current_ma) as seen by the INA219"""
+        self.advance()
+        return self.psu_mv(), self.current_a * 1000
+
+    def temperature(self):
+        self.advance()
+        return self.temp_c
+
+
+class PulseSource:
+    """
+    Background thread producing active low pulses on an input pin at rate_hz() Hz,
+    standing in for the optical RPM / wheel sensors.
+    """
+
+    def __init__(self, pin_id, rate_hz):
+        self.pin = machine.Pin.get(pin_id)
+        self.rate_hz = rate_hz
+        self.pulses = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.pin.drive(1)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        # Integrates the rate in short waits, so a rotor speeding up from near standstill
+        # isn't held to the long period it had when the last pulse went out
+        phase = 0.0
+        last = _now()
+        while not self._stop.is_set():
+            hz = abs(self.rate_hz())
+            now = _now()
+            phase = min(phase + hz * (now - last), 2.0)
+            last = now
+            if phase < 1:
+                delay = (1 - phase) / hz if hz else 0.005
+                self._stop.wait(min(delay, 0.005))
+                continue
+            phase -= 1
+            self.pin.pulse()
+            self.pulses += 1
+
+
+# ───────────────────────────────── Board ────────────────────────────────
+
+
+class Board:
+    """
+    The whole tester on the host: device models on the I2C bus at the addresses used in
+    main.py, a motor on the DRV8837 / buck converter and pulse sources on the RPM pins.
+
+    Example:
+
+        sim.setup_path()
+        board = sim.Board()
+        board.start()
+        fw = board.build_firmware()   # Same objects main.py creates
+        fw.motor.set_state(fw.motor.MOTOR_FORWARD, 2000)
+        board.stop()
+    """
+
+    PIN_I2C_SDA = 8
+    PIN_I2C_SCL = 9
+    PIN_WHEEL = 1
+    PIN_RPM = 2
+    ADDR_DAC = 0x60
+    ADDR_IMON = 0x40
+    ADDR_TMP = 0x48
+
+    def __init__(self, wheel_hz=0.0, imon_noise_ma=20.0, log_dir=None):
+        # Stands in for /logs on the device's filesystem
+        self.log_dir = log_dir or os.path.join(tempfile.gettempdir(), "m4wd_logs")
+        machine.Pin.reset_all()
+        machine.scheduler.reset()
+        machine.I2C.bus.devices.clear()
+        machine.I2C.bus.reset_stats()
+
+        self.dac = MCP4725Model()
+        self.motor = MotorModel(dac=self.dac)
+        self.imon = INA219Model(source=self.motor.supply, noise_ma=imon_noise_ma)
+        self.tmp = TMP1075Model(source=self.motor.temperature)
+
+        devices = machine.I2C.bus.devices
+        devices[self.ADDR_DAC] = self.dac
+        devices[self.ADDR_IMON] = self.imon
+        devices[self.ADDR_TMP] = self.tmp
+
+        self.wheel_hz = wheel_hz
+        self.rpm_pulses = PulseSource(self.PIN_RPM, lambda: self.motor.rpm / 60)
+        self.wheel_pulses = PulseSource(self.PIN_WHEEL, lambda: self.wheel_hz)
+
+    @property
+    def i2c_stats(self):
+        return machine.I2C.bus
+
+    def start(self):
+        self.rpm_pulses.start()
+        self.wheel_pulses.start()
+
+    def stop(self):
+        self.rpm_pulses.stop()
+        self.wheel_pulses.stop()
+
+    def build_firmware(self, display=None):
+        """
+        Construct the firmware objects the same way main.py does, minus the UI launch. The
+        executive is built but not started, call fw.executive.start() or run_pending().
+        """
+        import lvgl as lv
+        from button import BUTTON
+        from drv8837 import DRV8837
+        from executive import Executive
+        from gc_manager import GCManager
+        from render_scheduler import RenderScheduler
+        from telemetry import TelemetryLogger
+        from telemetry_stream import TelemetryStream
+        from current_trip import CurrentTrip
+        from motor_control import MotorControl
+        from power_supply import PSU
+        from pulse_counter import PulseCounter
+        from rotary_irq_esp import RotaryIRQ
+        from tmp1075 import TMP1075
+        from ui_common import (
+            CURRENT_LIM_DEFAULT_MA,
+            CURRENT_LIM_MAX_MA,
+            CURRENT_LIM_MIN_MA,
+            TEMP_LIM_DEFAULT_C,
+        )
+
+        lv.reset()
+        PulseCounter._next_pcnt_unit = 0  # Fresh boot, all PCNT units free
+        fw = _Firmware()
+        fw.i2c = machine.I2C(sda=machine.Pin(self.PIN_I2C_SDA), scl=machine.Pin(self.PIN_I2C_SCL))
+        fw.display = display
+        fw.rotary_enc = RotaryIRQ(pin_num_clk=45, pin_num_dt=48)
+        fw.enc_btn = BUTTON(pin=47)
+        fw.wheel_sensor = PulseCounter(pin=self.PIN_WHEEL)
+        fw.psu = PSU(fw.i2c, en_pin=16, dac_addr=self.ADDR_DAC, imon_addr=self.ADDR_IMON)
+        fw.drv = DRV8837(motor_en=15, motor_in1=6, motor_in2=5)
+        fw.rpm = PulseCounter(pin=self.PIN_RPM)
+        fw.tmp = TMP1075(fw.i2c, addr=self.ADDR_TMP, oneshot=True)
+        fw.motor = MotorControl(fw.psu, fw.drv, fw.rpm, fw.tmp)
+        fw.motor.set_temp_limit(TEMP_LIM_DEFAULT_C)
+        fw.motor.set_ramp_current_limit(CURRENT_LIM_MAX_MA)
+        fw.trip = CurrentTrip(
+            fw.motor,
+            limit_ma=CURRENT_LIM_DEFAULT_MA,
+            inrush_ma=CURRENT_LIM_MAX_MA * 5 // 4,
+            stall_ma=CURRENT_LIM_MIN_MA,
+            period_ms=2,
+        )
+        fw.gc_manager = GCManager(busy=fw.motor.in_transition)
+        fw.telemetry = TelemetryLogger(fw.motor, directory=self.log_dir)
+        fw.usb = io.BytesIO()  # Stands in for the USB serial port
+        fw.stream = TelemetryStream(fw.motor, fw.wheel_sensor, out=fw.usb, period_ms=10)
+        fw.executive = Executive(
+            (
+                ("protect", 2, (fw.trip.check,)),
+                ("state", 1, (fw.motor.update_state, fw.gc_manager.update_phase)),
+                (
+                    "current",
+                    10,
+                    (fw.motor.sample_current, fw.telemetry.sample, fw.stream.sample),
+                ),
+                ("rpm", 100, (fw.motor.sample_rpm, fw.wheel_sensor.close_window)),
+                ("temp", 1000, (fw.motor.sample_temp,)),
+            )
+        )
+        fw.renderer = RenderScheduler(frame_ms=33, budget_us=15000)
+        fw.trip.set_holdoff_sources(fw.renderer, fw.telemetry, fw.gc_manager)
+        return fw
+
+
+class _Firmware:
+    pass
@@ -0,0 +1,41 @@
+# Host stand-in for the lvgl_micropython st7735 display driver
+
+STATE_HIGH = 1
+STATE_LOW = 0
+STATE_PWM = -1
+
+BYTE_ORDER_RGB = 0x00
+BYTE_ORDER_BGR = 0x08
+
+TYPE_B = 0
+TYPE_R_RED = 1
+TYPE_R_GREEN = 2
+TYPE_R_BLACK = 3
+
+
+class ST7735:
+    def __init__(
+        self,
+        data_bus=None,
+        display_width=128,
+        display_height=160,
+        frame_buffer1=None,
+        frame_buffer2=None,
+        **kwargs
+    ):
+        self.data_bus = data_bus
+        self.frame_buffer1 = frame_buffer1
+        self.frame_buffer2 = frame_buffer2
+        self.display_width = display_width
+        self.display_height = display_height
+        self.kwargs = kwargs
+        self.rotation = 0
+
+    def init(self, type=None):
+        self.type = type
+
+    def set_rotation(self, rotation):
+        self.rotation = rotation
+
+    def set_backlight(self, value):
+        pass
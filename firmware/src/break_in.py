@@ -0,0 +1,494 @@
+import array
+import os
+import struct
+import time
+
+# Step layout, as ui_common.BREAK_IN_STEPS: [dir, vol_x10, dur_30, cool_30]
+DIR_FWD = 1  # ui_common.Direction.FWD
+DIR_REV = 2  # ui_common.Direction.REV
+STEP_UNIT_MS = 30000  # dur_30 and cool_30 are in 30s units
+
+# Phases of a step
+PHASE_RUN = 0
+PHASE_COOL = 1
+PHASE_NAMES = ("RUN", "COOL")
+
+# Engine states
+IDLE = 0
+RUNNING = 1
+PAUSED = 2  # Stopped part way, can resume
+DONE = 3
+STATE_NAMES = ("IDLE", "RUN", "PAUSED", "DONE")
+
+# Checkpoint file: header then one result per step, all little endian
+CHECKPOINT_MAGIC = b"M4BI"
+CHECKPOINT_VERSION = 2
+# magic, version, program sum, steps, step, phase, phase ms, run ms, then the current
+# step's samples, current sum, RPM sum and peak current so far
+CHECKPOINT_HEADER = "<4sBHBBBIIIiIh"
+CHECKPOINT_RESULT = "<HHHh"  # mean mA, peak mA, mean rpm, end temp x10
+
+TEMP_NONE = -32768  # No end temperature yet
+
+
+def program_sum(steps):
+    """Checksum of a program, a checkpoint only resumes the program it was saved from"""
+    total = 0
+    for step in steps:
+        for value in step:
+            total = (total * 31 + value) & 0xFFFF
+    return total
+
+
+class BreakIn:
+    """
+    Non-blocking break-in program executor, runs the steps of ui_common.BREAK_IN_STEPS.
+
+    Each step runs the motor in a direction at a voltage for dur_30 x 30s, then brakes for
+    cool_30 x 30s. update() advances the program and returns straight away, call it from
+    the screen loop, the executive keeps the motor state machine and sensing at their
+    full rates meanwhile. Phase time only counts once the motor has reached the step's
+    voltage, so a run step is never cut short by ramping. A run step that goes over the
+    motor's temperature limit is held, braked in place with its clock stopped, until the
+    motor has cooled back through the limit's hysteresis.
+
+    Every 100ms of a run phase the current and RPM go into per step sums, giving each
+    step's mean and peak current, mean RPM and end temperature in the results arrays.
+
+    With a ThermalModel the cooldowns and run steps follow the motor rather than the
+    worst case. The model is fitted from the temperature and current as the program runs,
+    and once fitted a cooldown ends as soon as the next step's run is predicted to stay
+    under the model's limit, assuming the highest mean current of the steps so far. A run
+    step held at the motor's temperature limit carries on as soon as the rest of the run
+    is predicted to stay under the model's limit. report() gives the cooldown time saved,
+    less the time run steps were held, against the program.
+
+    Progress is saved to a small checkpoint file at every phase change and every
+    checkpoint_ms while running. save_checkpoint() does the flash write, call it from an
+    idle point. After a reset a new BreakIn loads it and resume() carries on from the
+    step and phase time it was saved at, rather than restarting the whole program. The
+    current step's sums are saved too, so its means still cover the whole step, less
+    the samples since the last checkpoint.
+
+    Example:
+
+        engine = BreakIn(
+            motor,
+            BREAK_IN_STEPS,
+            checkpoint_path="/breakin.bin",
+            thermal=ThermalModel(limit_c=TEMP_LIM_DEFAULT_C),  # Optional
+        )
+        engine.resume() if engine.resumable() else engine.start()
+        while not engine.done():
+            engine.update()
+            engine.save_checkpoint()  # Only writes when one is due
+        engine.report()  # Per step current and RPM, and the total time
+    """
+
+    def __init__(
+        self,
+        motor,
+        steps,
+        checkpoint_path: str = None,
+        checkpoint_ms: int = 30000,
+        sample_ms: int = 100,
+        thermal=None,
+    ):
+        if not steps:
+            raise ValueError("A break-in program needs at least one step")
+        self.motor = motor
+        self.steps = steps
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_ms = checkpoint_ms
+        self.sample_ms = sample_ms
+        self.thermal = thermal
+        self.program = program_sum(steps)
+
+        n = len(steps)
+        self.mean_ma = array.array("H", [0] * n)
+        self.peak_ma = array.array("H", [0] * n)
+        self.mean_rpm = array.array("H", [0] * n)
+        self.end_temp_x10 = array.array("h", [TEMP_NONE] * n)
+
+        self.state = IDLE
+        self.step = 0
+        self.phase = PHASE_RUN
+        self.phase_done_ms = 0  # Phase time counted so far
+        self.holding = False  # Braked part way through a run step to cool
+        self._hold_start_ms = 0
+        self.cool_saved_ms = 0  # Cooldown cut short by the thermal model
+        self.stretch_ms = 0  # Run steps held to cool
+        self._reset_sums()
+        self._last_ms = time.ticks_ms()
+        self._next_sample_ms = self._last_ms
+        self._next_thermal_ms = self._last_ms
+        self._next_checkpoint_ms = self._last_ms
+        self._checkpoint_due = False
+        self.run_ms = 0  # Wall time spent running, across resumes
+        self._load_checkpoint()
+
+    # ── Program ───────────────────────────────────────────────────────
+
+    def phase_ms(self, step=None, phase=None):
+        """Length of a phase in ms"""
+        s = self.steps[self.step if step is None else step]
+        phase = self.phase if phase is None else phase
+        return (s[2] if phase == PHASE_RUN else s[3]) * STEP_UNIT_MS
+
+    def remaining_ms(self):
+        """Time left in the current phase"""
+        return max(0, self.phase_ms() - self.phase_done_ms)
+
+    def total_remaining_ms(self):
+        """Programmed time left for the whole program, not counting ramps and pauses"""
+        if self.state == DONE:
+            return 0
+        total = self.remaining_ms()
+        if self.phase == PHASE_RUN:
+            total += self.phase_ms(phase=PHASE_COOL)
+        for i in range(self.step + 1, len(self.steps)):
+            total += self.phase_ms(i, PHASE_RUN) + self.phase_ms(i, PHASE_COOL)
+        return total
+
+    def _direction(self, step):
+        return (
+            self.motor.MOTOR_FORWARD
+            if self.steps[step][0] == DIR_FWD
+            else self.motor.MOTOR_REVERSE
+        )
+
+    def _voltage_mv(self, step):
+        return self.steps[step][1] * 100
+
+    # ── Run control ───────────────────────────────────────────────────
+
+    def start(self):
+        """Run the program from the first step, dropping any checkpoint"""
+        for i in range(len(self.steps)):
+            self.mean_ma[i] = self.peak_ma[i] = self.mean_rpm[i] = 0
+            self.end_temp_x10[i] = TEMP_NONE
+        self.run_ms = 0
+        self.cool_saved_ms = 0
+        self.stretch_ms = 0
+        if self.thermal is not None:
+            self.thermal.reset()  # Likely a different motor, refit from its own data
+        self._enter(0, PHASE_RUN, 0)
+
+    def resumable(self):
+        return self.state == PAUSED
+
+    def resume(self):
+        """Carry on from where a pause, or the checkpoint, left off"""
+        if self.state != PAUSED:
+            return
+        self._enter(self.step, self.phase, self.phase_done_ms)
+
+    def pause(self):
+        """Brake and hold the program where it is, saving a checkpoint"""
+        if self.state != RUNNING:
+            return
+        self._advance_clock()
+        self._end_hold()
+        self.state = PAUSED
+        self.motor.set_state(self.motor.MOTOR_BRAKE, self.motor.VOLTAGE_MIN_MV)
+        self._checkpoint_due = True
+
+    def running(self):
+        return self.state == RUNNING
+
+    def done(self):
+        return self.state == DONE
+
+    def _enter(self, step, phase, done_ms):
+        self.state = RUNNING
+        self.step = step
+        self.phase = phase
+        self.phase_done_ms = done_ms
+        self.holding = False
+        now = time.ticks_ms()
+        self._last_ms = now
+        self._next_sample_ms = now
+        self._next_checkpoint_ms = time.ticks_add(now, self.checkpoint_ms)
+        self._checkpoint_due = True
+        if phase == PHASE_RUN:
+            if not done_ms:
+                self._reset_sums()  # Else resuming, the step's sums carry on
+            self.motor.set_state(self._direction(step), self._voltage_mv(step))
+        else:
+            self.motor.set_state(self.motor.MOTOR_BRAKE, self.motor.VOLTAGE_MIN_MV)
+
+    def _finish(self):
+        self.state = DONE
+        self.motor.set_state(self.motor.MOTOR_BRAKE, self.motor.VOLTAGE_MIN_MV)
+        self._checkpoint_due = True
+
+    # ── Below is called from the screen loop ──────────────────────────
+
+    def update(self):
+        """
+        Advance the program, returns True when the step or phase changed so the caller
+        knows to redraw
+        """
+        if self.state != RUNNING:
+            return False
+        if self.motor.trip_reason:
+            self.pause()  # Tripped on over-current or stall, wait for the user
+            return True
+        self._advance_clock()
+        changed = False
+        if self.thermal is not None:
+            self._update_thermal()
+        if self.phase == PHASE_RUN:
+            changed = self._update_hold()
+            if not self.holding:
+                self._sample()
+        if time.ticks_diff(self._last_ms, self._next_checkpoint_ms) >= 0:
+            self._next_checkpoint_ms = time.ticks_add(self._last_ms, self.checkpoint_ms)
+            self._checkpoint_due = True
+        if self.phase_done_ms < self.phase_ms():
+            return changed
+
+        if self.phase == PHASE_RUN:
+            self._close_step()
+            if self.phase_ms(phase=PHASE_COOL):
+                self._enter(self.step, PHASE_COOL, 0)
+                return True
+        if self.step + 1 < len(self.steps):
+            self._enter(self.step + 1, PHASE_RUN, 0)
+        else:
+            self._finish()
+        return True
+
+    def _advance_clock(self):
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self._last_ms)
+        self._last_ms = now
+        self.run_ms += elapsed
+        motor = self.motor
+        # Run time only counts at the step's voltage, and not while held to cool
+        if self.phase == PHASE_RUN and (self.holding or motor.in_transition()):
+            return
+        self.phase_done_ms += elapsed
+
+    # ── Thermal ───────────────────────────────────────────────────────
+
+    def _update_thermal(self):
+        """Feed the model and end a cooldown once the next step is predicted to be safe"""
+        motor = self.motor
+        thermal = self.thermal
+        if not motor.has_temp():
+            return  # The first reading sets the model's ambient
+        if time.ticks_diff(self._last_ms, self._next_thermal_ms) >= 0:
+            self._next_thermal_ms = time.ticks_add(self._last_ms, thermal.sample_ms)
+            thermal.sample(motor.get_temp(), motor.get_current_100ms_ma())
+        if self.phase != PHASE_COOL or not thermal.fitted() or motor.in_transition():
+            return  # Braking still, or no fit yet so the programmed cooldown
+        temp = motor.get_temp()
+        step = self.step + 1
+        if step < len(self.steps):
+            run_ms = self.phase_ms(step, PHASE_RUN)
+            if not thermal.safe(temp, self._expected_ma(), run_ms):
+                return
+        elif temp > thermal.limit_c - thermal.margin_c:
+            return
+        self.cool_saved_ms += self.remaining_ms()
+        self.phase_done_ms = self.phase_ms()  # update() moves on to the next step
+
+    def _update_hold(self):
+        """
+        Hold a run step that's over temperature, and carry on once cooled. With a fitted
+        thermal model that's as soon as the rest of the step is predicted to stay under
+        its limit, rather than after the over temperature hysteresis. True on a change.
+        """
+        motor = self.motor
+        if self.holding:
+            if motor.is_over_temp() and not self._rest_safe():
+                return False
+            self._end_hold()
+            motor.set_state(self._direction(self.step), self._voltage_mv(self.step))
+            return True
+        if not motor.is_over_temp():
+            return False
+        self.holding = True
+        self._hold_start_ms = self._last_ms
+        motor.set_state(motor.MOTOR_BRAKE, motor.VOLTAGE_MIN_MV)
+        return True
+
+    def _rest_safe(self):
+        """True if the model predicts the rest of the run step stays under its limit"""
+        thermal = self.thermal
+        if thermal is None or not thermal.fitted():
+            return False
+        temp = self.motor.get_temp()
+        return thermal.safe(temp, self._expected_ma(), self.remaining_ms())
+
+    def _end_hold(self):
+        if self.holding:
+            self.holding = False
+            self.stretch_ms += time.ticks_diff(self._last_ms, self._hold_start_ms)
+
+    def _expected_ma(self):
+        """Current to plan on, the highest step mean so far as steps are alike"""
+        ma = self._sum_ma // self._samples if self._samples else 0
+        for i in range(len(self.steps)):
+            if self.mean_ma[i] > ma:
+                ma = self.mean_ma[i]
+        return ma or self.motor.get_current_1s_ma()
+
+    def _reset_sums(self):
+        self._samples = 0
+        self._sum_ma = 0
+        self._sum_rpm = 0
+        self._peak_ma = 0
+
+    def _sample(self):
+        if time.ticks_diff(self._last_ms, self._next_sample_ms) < 0:
+            return
+        self._next_sample_ms = time.ticks_add(self._last_ms, self.sample_ms)
+        if self.motor.in_transition():
+            return
+        ma = self.motor.get_current_100ms_ma()
+        self._samples += 1
+        self._sum_ma += ma
+        self._sum_rpm += self.motor.get_rpm_100ms()
+        if ma > self._peak_ma:
+            self._peak_ma = ma
+
+    def _close_step(self):
+        i = self.step
+        n = self._samples
+        if n:
+            self.mean_ma[i] = max(0, (self._sum_ma + n // 2) // n)
+            self.mean_rpm[i] = (self._sum_rpm + n // 2) // n
+            self.peak_ma[i] = max(0, self._peak_ma)
+        self.end_temp_x10[i] = self.motor.get_temp_10s_x10()
+
+    # ── Checkpoint ────────────────────────────────────────────────────
+
+    def save_checkpoint(self, force: bool = False):
+        """
+        Write the checkpoint if one is due, or now with force. Returns True if written.
+        Call from an idle point, it's a small flash write.
+        """
+        if self.checkpoint_path is None or not (self._checkpoint_due or force):
+            return False
+        self._checkpoint_due = False
+        if self.state == DONE or self.state == IDLE:
+            self.clear_checkpoint()
+            return True
+        data = struct.pack(
+            CHECKPOINT_HEADER,
+            CHECKPOINT_MAGIC,
+            CHECKPOINT_VERSION,
+            self.program,
+            len(self.steps),
+            self.step,
+            self.phase,
+            self.phase_done_ms,
+            self.run_ms,
+            self._samples,
+            self._sum_ma,
+            self._sum_rpm,
+            self._peak_ma,
+        )
+        for i in range(len(self.steps)):
+            data += struct.pack(
+                CHECKPOINT_RESULT,
+                self.mean_ma[i],
+                self.peak_ma[i],
+                self.mean_rpm[i],
+                self.end_temp_x10[i],
+            )
+        # Written aside and renamed over, so a reset mid write leaves the last good one
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.rename(tmp, self.checkpoint_path)
+        return True
+
+    def clear_checkpoint(self):
+        if self.checkpoint_path is None:
+            return
+        try:
+            os.remove(self.checkpoint_path)
+        except OSError:
+            pass  # Wasn't one
+
+    def _load_checkpoint(self):
+        if self.checkpoint_path is None:
+            return
+        try:
+            with open(self.checkpoint_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return  # No checkpoint
+        header_size = struct.calcsize(CHECKPOINT_HEADER)
+        result_size = struct.calcsize(CHECKPOINT_RESULT)
+        if len(data) < header_size:
+            print("Break-in checkpoint is truncated, ignoring it")
+            return
+        (
+            magic,
+            version,
+            program,
+            steps,
+            step,
+            phase,
+            phase_ms,
+            run_ms,
+            samples,
+            sum_ma,
+            sum_rpm,
+            peak_ma,
+        ) = struct.unpack_from(CHECKPOINT_HEADER, data)
+        if (
+            magic != CHECKPOINT_MAGIC
+            or version != CHECKPOINT_VERSION
+            or program != self.program
+            or steps != len(self.steps)
+            or step >= steps
+            or len(data) < header_size + steps * result_size
+        ):
+            print("Break-in checkpoint is for a different program, ignoring it")
+            return
+        for i in range(steps):
+            (
+                self.mean_ma[i],
+                self.peak_ma[i],
+                self.mean_rpm[i],
+                self.end_temp_x10[i],
+            ) = struct.unpack_from(
+                CHECKPOINT_RESULT, data, header_size + i * result_size
+            )
+        self.step = step
+        self.phase = phase
+        self.phase_done_ms = phase_ms
+        self.run_ms = run_ms
+        self._samples = samples
+        self._sum_ma = sum_ma
+        self._sum_rpm = sum_rpm
+        self._peak_ma = peak_ma
+        self.state = PAUSED
+
+    def report(self):
+        """Print each step's current, RPM and end temperature, and the time taken"""
+        print("step dir  volt  mean_mA peak_mA mean_rpm end_C")
+        for i, step in enumerate(self.steps):
+            temp = self.end_temp_x10[i]
+            temp = "-" if temp == TEMP_NONE else f"{temp / 10:.1f}"
+            print(
+                f"{i + 1:4} {'FWD' if step[0] == DIR_FWD else 'REV'} "
+                f"{step[1] / 10:4.1f}V {self.mean_ma[i]:8} {self.peak_ma[i]:7} "
+                f"{self.mean_rpm[i]:8} {temp:>5}"
+            )
+        print(f"{STATE_NAMES[self.state]}, {self.run_ms // 1000}s running")
+        if self.thermal is not None:
+            program_ms = 0
+            for i in range(len(self.steps)):
+                program_ms += self.phase_ms(i, PHASE_RUN) + self.phase_ms(i, PHASE_COOL)
+            saved_ms = self.cool_saved_ms - self.stretch_ms
+            print(
+                f"Cooldown {self.cool_saved_ms // 1000}s shorter, runs stretched "
+                f"{self.stretch_ms // 1000}s, saved {saved_ms // 1000}s of the "
+                f"{program_ms // 1000}s program"
+            )
@@ -0,0 +1,173 @@
+import time
+
+
+class CurrentTrip:
+    """
+    Fast over-current and stall trip, checked from its own executive group at a fixed
+    rate whatever the UI loop is doing.
+
+    check() reads the INA219's latest current result with one register read and trips the
+    motor through MotorControl.trip(), which brakes the DRV8837 straight away and ramps the
+    PSU down behind it:
+
+    - Over-current: the current is at or over limit_ma. For inrush_ms after the motor
+      starts driving, or starts a ramp, the limit is inrush_ma instead, so starting up and
+      the ramp's own current pacing don't trip it. The allowance runs from the start, a
+      ramp held back by the current pacing doesn't extend it.
+    - Stall: driving with at least stall_ma flowing and no RPM sensor edges for stall_ms,
+      counted from the last edge or the start of the drive or ramp, so a locked rotor
+      trips part way through a ramp too.
+
+    A step in current shows in the result of the conversion after the one it started in,
+    so the worst case from the current crossing the limit to the brake is two INA219
+    conversion times, plus a check period and a tick of release jitter, see worst_case_ms().
+    More on chip averaging is quieter but slower to trip.
+
+    check() runs from a soft timer callback, so anything that keeps the interpreter from
+    running it delays the trip for as long as it blocks: an LVGL refresh, a flash write,
+    a garbage collection. Give set_holdoff_sources() the renderer, telemetry logger and GC manager
+    and the bound includes the longest of those seen so far. It's only as good as the
+    renders, flushes and collections that have happened, the executive report's max late
+    column for the protect group is what the check really saw.
+
+    Nothing is checked while the motor is braked, and after a trip the motor stays braked
+    until MotorControl.clear_trip() acknowledges it, e.g. the user pressing the button
+    showing the reason.
+
+    Example:
+
+        trip = CurrentTrip(motor, limit_ma=CURRENT_LIM_DEFAULT_MA, period_ms=2)
+        executive = Executive((("protect", 2, (trip.check,)), ...))  # First in the table
+        trip.set_limit(800)
+        trip.set_holdoff_sources(renderer, telemetry, gc_manager)
+        trip.worst_case_ms()  # Time to brake after crossing the limit, hold-off included
+        trip.report()  # Trips so far, the last one's current and the cost of a check
+    """
+
+    def __init__(
+        self,
+        motor,
+        limit_ma: int = 500,
+        inrush_ma: int = 2000,
+        inrush_ms: int = 500,
+        stall_ma: int = 100,
+        stall_ms: int = 300,
+        period_ms: int = 2,
+    ):
+        self.motor = motor
+        self.inrush_ma = inrush_ma
+        self.inrush_ms = inrush_ms
+        self.stall_ma = stall_ma
+        self.stall_ms = stall_ms
+        self.period_ms = period_ms
+        self.set_limit(limit_ma)
+        self.renderer = None  # Hold off check() while they block, see holdoff_us()
+        self.telemetry = None
+        self.gc_manager = None
+
+        now = time.ticks_ms()
+        self._transition_ms = now  # Start of the drive or ramp in progress
+        self._in_transition = False
+        self._edge_count = motor.rpm.get_count()
+        self._edge_ms = now
+
+        self.trips = 0
+        self.last_reason = motor.TRIP_NONE
+        self.last_trip_ma = 0
+        self.last_trip_ms = now
+        self.check_us = 0  # Run time of the last check, and the longest
+        self.max_check_us = 0
+
+    def set_limit(self, limit_ma: int):
+        if not self.stall_ma <= limit_ma <= self.inrush_ma:
+            raise ValueError(
+                f"Current limit must be {self.stall_ma}-{self.inrush_ma}mA, "
+                f"got {limit_ma}mA"
+            )
+        self.limit_ma = limit_ma
+
+    def set_holdoff_sources(self, renderer=None, telemetry=None, gc_manager=None):
+        """What can block the executive's timer callback, see holdoff_us()"""
+        self.renderer = renderer
+        self.telemetry = telemetry
+        self.gc_manager = gc_manager
+
+    def holdoff_us(self):
+        """Longest render, telemetry flush or GC pause so far"""
+        holdoff = 0
+        if self.renderer is not None:
+            holdoff = max(holdoff, self.renderer.max_render_us)
+        if self.telemetry is not None:
+            holdoff = max(holdoff, self.telemetry.max_flush_us)
+        if self.gc_manager is not None:
+            holdoff = max(holdoff, self.gc_manager.max_pause_us)
+        return holdoff
+
+    def worst_case_ms(self):
+        """
+        Longest from the current crossing the limit to the brake being applied, given the
+        longest hold-off seen so far
+        """
+        conversion_ms = self.motor.psu.get_current_conversion_time_us() / 1000
+        return 2 * conversion_ms + self.period_ms + 1 + self.holdoff_us() / 1000
+
+    # Below is called from the executive
+    def check(self):
+        motor = self.motor
+        now = time.ticks_ms()
+        count = motor.rpm.get_count()
+        if count != self._edge_count:
+            self._edge_count = count
+            self._edge_ms = now
+        if motor.motor_direction == motor.MOTOR_BRAKE:
+            self._in_transition = False
+            self._transition_ms = now
+            self._edge_ms = now  # Stall time counts from the drive starting
+            return
+        start = time.ticks_us()
+        ma = motor.psu.read_current_ma()
+
+        # Latched once when a ramp starts, however long the current pacing holds it
+        in_transition = motor.in_transition()
+        if in_transition and not self._in_transition:
+            self._transition_ms = now
+            self._edge_ms = now
+        self._in_transition = in_transition
+        limit = self.limit_ma
+        if time.ticks_diff(now, self._transition_ms) < self.inrush_ms:
+            limit = self.inrush_ma
+
+        stalled = time.ticks_diff(now, self._edge_ms) >= self.stall_ms
+        if ma >= limit:
+            reason = motor.TRIP_OVER_CURRENT
+        elif stalled and ma >= self.stall_ma:
+            reason = motor.TRIP_STALL
+        else:
+            reason = motor.TRIP_NONE
+        if reason:
+            motor.trip(reason)
+            self.trips += 1
+            self.last_reason = reason
+            self.last_trip_ma = ma
+            self.last_trip_ms = now
+
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        self.check_us = elapsed
+        if elapsed > self.max_check_us:
+            self.max_check_us = elapsed
+
+    def report(self):
+        """Print the trips so far and what a check costs"""
+        if self.trips:
+            reason = (
+                "stall" if self.last_reason == self.motor.TRIP_STALL else "over-current"
+            )
+            print(f"{self.trips} trips, last {reason} at {self.last_trip_ma}mA")
+        else:
+            print("No trips")
+        print(
+            f"Limit {self.limit_ma}mA ({self.inrush_ma}mA inrush), check "
+            f"{self.check_us}us max {self.max_check_us}us every {self.period_ms}ms, "
+            f"worst case {self.worst_case_ms():.1f}ms to brake with "
+            f"{self.holdoff_us()}us hold-off"
+        )
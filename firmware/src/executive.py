@@ -0,0 +1,130 @@
+from machine import Timer
+import time
+
+
+class RateGroup:
+    """One row of the executive table: tasks run back to back every period_ms"""
+
+    def __init__(self, name: str, period_ms: int, tasks):
+        if period_ms < 1:
+            raise ValueError(f"Rate group {name} period must be at least 1ms")
+        self.name = name
+        self.period_ms = period_ms
+        self.tasks = tuple(tasks)
+        self.next_ms = time.ticks_ms()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.runs = 0
+        self.overruns = 0  # Runs that took longer than period_ms
+        self.missed = 0  # Releases skipped because the group started a whole period late
+        self.late_ms = 0  # From the release being due to running, and the longest
+        self.max_late_ms = 0
+        self.last_us = 0
+        self.max_us = 0
+
+
+class Executive:
+    """
+    Table driven cyclic executive for the sensing and control housekeeping.
+
+    Each row of the table is (name, period_ms, (task, ...)). A machine.Timer fires every
+    base_ms and runs every group that is due, in table order, so list the fastest and
+    most important group first. The groups keep running whatever screen the UI is on.
+
+    A group that takes longer than its period counts an overrun, and releases it misses
+    because something else held the interpreter (e.g. an LVGL refresh) count as missed.
+    After a miss the group re-phases to now rather than running back to back to catch up.
+    Each group also records how late it ran after its release was due, so the longest
+    hold-off it has really seen is in the report.
+
+    Example:
+
+        executive = Executive(
+            (
+                ("state", 1, (motor.update_state,)),
+                ("current", 10, (motor.sample_current,)),
+                ("rpm", 100, (motor.sample_rpm, wheel_sensor.close_window)),
+                ("temp", 1000, (motor.sample_temp,)),
+            )
+        )
+        executive.start(timer_id=1)
+        executive.report()  # Per group rate, timing and overruns, e.g. from the REPL
+    """
+
+    def __init__(self, table, base_ms: int = 1):
+        self.groups = [
+            RateGroup(name, period_ms, tasks) for name, period_ms, tasks in table
+        ]
+        self.base_ms = base_ms
+        self.timer = None
+        self.start_ms = time.ticks_ms()
+        self.stop_ms = None
+
+    def start(self, timer_id: int = 1):
+        """Run the groups from a periodic hardware timer"""
+        self.stop()
+        self.reset_stats()
+        self.timer = Timer(timer_id)
+        self.timer.init(
+            period=self.base_ms, mode=Timer.PERIODIC, callback=self._on_timer
+        )
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+            self.stop_ms = time.ticks_ms()
+
+    def _on_timer(self, timer):
+        self.run_pending()
+
+    def run_pending(self):
+        """Run every group that is due. Called by the timer, or polled if not started."""
+        now = time.ticks_ms()
+        for group in self.groups:
+            late = time.ticks_diff(now, group.next_ms)
+            if late < 0:
+                continue
+            group.late_ms = late
+            if late > group.max_late_ms:
+                group.max_late_ms = late
+            if late >= group.period_ms:
+                group.missed += late // group.period_ms
+                group.next_ms = now
+            group.next_ms = time.ticks_add(group.next_ms, group.period_ms)
+
+            start = time.ticks_us()
+            for task in group.tasks:
+                task()
+            elapsed = time.ticks_diff(time.ticks_us(), start)
+
+            group.runs += 1
+            group.last_us = elapsed
+            if elapsed > group.max_us:
+                group.max_us = elapsed
+            if elapsed > group.period_ms * 1000:
+                group.overruns += 1
+
+    def reset_stats(self):
+        now = time.ticks_ms()
+        self.start_ms = now
+        self.stop_ms = None
+        for group in self.groups:
+            group.reset_stats()
+            group.next_ms = now
+
+    def report(self):
+        """Print the achieved rate, run time and overruns of each group"""
+        end = time.ticks_ms() if self.stop_ms is None else self.stop_ms
+        elapsed_s = max(1, time.ticks_diff(end, self.start_ms)) / 1000
+        print(
+            "group      target Hz   actual Hz    runs  missed  overruns  last us   max us"
+            "  max late ms"
+        )
+        for g in self.groups:
+            print(
+                f"{g.name:<10} {1000 / g.period_ms:9.1f} {g.runs / elapsed_s:11.1f} "
+                f"{g.runs:7d} {g.missed:7d} {g.overruns:9d} {g.last_us:8d} {g.max_us:8d}"
+                f" {g.max_late_ms:12d}"
+            )
@@ -0,0 +1,189 @@
+import array
+import gc
+import time
+
+try:
+    from gc import mem_alloc, mem_free, threshold
+except ImportError:  # Not MicroPython, e.g. the host stand-ins
+    mem_alloc = mem_free = threshold = None
+
+
+class GCManager:
+    """
+    Moves garbage collection out of the latency critical phases and into known idle points.
+
+    Call idle() where a pause does no harm (the menu loop, straight after a readout
+    refresh). It collects once alloc_bytes have been allocated since the last collection,
+    or every max_interval_ms, so each pause only has a little garbage to get through.
+    Between those points the allocation threshold makes MicroPython collect early instead
+    of waiting for the heap to fill.
+
+    While busy() returns True (e.g. MotorControl.in_transition) or between begin_critical()
+    and end_critical(), the threshold is switched off and idle() doesn't collect, so a
+    ramp or brake is never paused by a collection that could have waited. Allocation can
+    still collect if the heap runs out, and any collection not made here is counted.
+
+    Every collection made here is timed into a histogram and the free heap after it is
+    kept, print them from the REPL with report().
+
+    Example:
+
+        gc_manager = GCManager(busy=motor.in_transition)
+        # In a fast rate group: gc_manager.update_phase()
+        while True:
+            ...
+            gc_manager.idle()
+        gc_manager.report()  # From the REPL
+    """
+
+    # Upper edges of the pause histogram buckets in us, the last bucket is everything above
+    PAUSE_BUCKETS_US = (250, 500, 1000, 2000, 5000, 10000)
+
+    def __init__(
+        self,
+        busy=None,
+        alloc_bytes: int = 16384,
+        threshold_bytes: int = 32768,
+        max_interval_ms: int = 5000,
+        trend_size: int = 16,
+    ):
+        self.busy = busy
+        self.alloc_bytes = alloc_bytes
+        self.threshold_bytes = threshold_bytes
+        self.max_interval_ms = max_interval_ms
+
+        self.critical = 0  # Nesting depth of begin_critical()
+        self.in_critical = False
+
+        self.pause_hist = array.array("H", [0] * (len(self.PAUSE_BUCKETS_US) + 1))
+        # Free heap after each collection, a ring of the last trend_size
+        self.free_trend = array.array("L", [0] * trend_size)
+        self.reset_stats()
+
+        gc.enable()
+        self._set_threshold(threshold_bytes)
+        self._last_collect_ms = time.ticks_ms()
+        self._alloc_after = mem_alloc() if mem_alloc else 0
+        self._last_free = self._free()
+
+    def _free(self):
+        return mem_free() if mem_free else 0
+
+    def _set_threshold(self, amount):
+        if threshold is not None:
+            threshold(amount)
+
+    # ── Critical phases ───────────────────────────────────────────────
+
+    def begin_critical(self):
+        """Hold off collections until the matching end_critical(), calls can nest"""
+        self.critical += 1
+        self.update_phase()
+
+    def end_critical(self):
+        if self.critical:
+            self.critical -= 1
+        self.update_phase()
+
+    def update_phase(self):
+        """
+        Switch the threshold off while critical, returns True if critical. Call it from the
+        executive's fastest group so a ramp or brake is covered from its first ms.
+        """
+        critical = self.critical > 0 or (self.busy is not None and self.busy())
+        if critical != self.in_critical:
+            self.in_critical = critical
+            self._set_threshold(-1 if critical else self.threshold_bytes)
+        return critical
+
+    # ── Idle collection ───────────────────────────────────────────────
+
+    def idle(self):
+        """
+        Call at a point where a pause is harmless, collects if enough has been allocated or
+        enough time has passed. Returns True if it collected.
+        """
+        free = self._free()
+        if free > self._last_free + 1024:
+            # The heap grew back without us, MicroPython collected on its own
+            self.auto_collections += 1
+        self._last_free = free
+
+        if self.update_phase():
+            if self._due():
+                self.skipped += 1
+            return False
+        if not self._due():
+            return False
+        self.collect()
+        return True
+
+    def _due(self):
+        if mem_alloc is not None and mem_alloc() - self._alloc_after >= self.alloc_bytes:
+            return True
+        elapsed = time.ticks_diff(time.ticks_ms(), self._last_collect_ms)
+        return elapsed >= self.max_interval_ms
+
+    def collect(self):
+        """Collect now and record the pause, returns its length in us"""
+        start = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), start)
+
+        self.collections += 1
+        self.last_pause_us = pause
+        if pause > self.max_pause_us:
+            self.max_pause_us = pause
+        self.total_pause_us += pause
+        i = 0
+        buckets = self.PAUSE_BUCKETS_US
+        while i < len(buckets) and pause > buckets[i]:
+            i += 1
+        self.pause_hist[i] += 1
+
+        self._last_collect_ms = time.ticks_ms()
+        self._alloc_after = mem_alloc() if mem_alloc else 0
+        self._last_free = self._free()
+        self.free_trend[self._trend_head] = self._last_free
+        self._trend_head = (self._trend_head + 1) % len(self.free_trend)
+        return pause
+
+    # ── Reporting ─────────────────────────────────────────────────────
+
+    def reset_stats(self):
+        for i in range(len(self.pause_hist)):
+            self.pause_hist[i] = 0
+        self._trend_head = 0
+        self.collections = 0
+        self.auto_collections = 0
+        self.skipped = 0
+        self.last_pause_us = 0
+        self.max_pause_us = 0
+        self.total_pause_us = 0
+
+    def report(self):
+        """Print the pause histogram and the free heap after recent collections"""
+        print(
+            f"collections {self.collections}, automatic {self.auto_collections}, "
+            f"held off {self.skipped}, critical now {self.in_critical}"
+        )
+        mean = self.total_pause_us // self.collections if self.collections else 0
+        print(
+            f"pause us: last {self.last_pause_us}, mean {mean}, max {self.max_pause_us}"
+        )
+        lower = 0
+        for i, count in enumerate(self.pause_hist):
+            if i < len(self.PAUSE_BUCKETS_US):
+                upper = self.PAUSE_BUCKETS_US[i]
+                print(f"  {lower:>6}-{upper:<6}us {count:6d}")
+                lower = upper
+            else:
+                print(f"  {lower:>6}+      us {count:6d}")
+
+        if mem_free is None:
+            return
+        size = len(self.free_trend)
+        n = min(self.collections, size)
+        free = [self.free_trend[(self._trend_head - n + k) % size] for k in range(n)]
+        print(f"free heap after collections, oldest first: {free}")
+        print(f"free heap now {self._free()}")
@@ -6,6 +6,7 @@
 
 from machine import I2C
 from micropython import const
+import array
 
 
 class INA219:
@@ -19,6 +20,14 @@ class INA219:
         imon.get_voltage_mv()
         imon.get_current_ma()
 
+        imon.set_averaging(16)  # Average 16 shunt conversions on chip, ~9ms per result
+        imon.read_averaged_current_ma()  # None until a new averaged result is ready
+        imon.read_current_ma()  # Latest result again, an int for hot paths
+
+        snap = imon.read_snapshot()  # Shunt, bus, power and current from one conversion
+        if snap is not None:
+            snap[INA219.SNAPSHOT_BUS_MV], snap[INA219.SNAPSHOT_CURRENT_MA]
+
     See datasheet: https://ww1.microchip.com/downloads/en/DeviceDoc/22039d.pdf
 
     """
@@ -69,11 +78,34 @@ class INA219:
     CONFIG_MODE_BVOLT_CONTINUOUS = const(0x0006)
     CONFIG_MODE_SANDBVOLT_CONTINUOUS = const(0x0007)
 
-    def __init__(self, i2c=I2C, addr: int = None):
+    CONFIG_CNVR = const(0x0002)  # Conversion ready flag in the bus voltage register
+
+    # Shunt samples averaged on chip -> (config bits, conversion time in us)
+    SADC_AVERAGING = {
+        1: (CONFIG_SADCRES_12BIT_1S_532US, 532),
+        2: (CONFIG_SADCRES_12BIT_2S_1060US, 1060),
+        4: (CONFIG_SADCRES_12BIT_4S_2130US, 2130),
+        8: (CONFIG_SADCRES_12BIT_8S_4260US, 4260),
+        16: (CONFIG_SADCRES_12BIT_16S_8510US, 8510),
+        32: (CONFIG_SADCRES_12BIT_32S_17MS, 17020),
+        64: (CONFIG_SADCRES_12BIT_64S_34MS, 34050),
+        128: (CONFIG_SADCRES_12BIT_128S_69MS, 68100),
+    }
+    BUS_CONVERSION_US = 532  # 12-bit bus voltage conversion, runs after the shunt in each cycle
+
+    # Indexes into the array returned by read_snapshot()
+    SNAPSHOT_SHUNT_UV = const(0)
+    SNAPSHOT_BUS_MV = const(1)
+    SNAPSHOT_POWER_MW = const(2)
+    SNAPSHOT_CURRENT_MA = const(3)
+
+    def __init__(self, i2c=I2C, addr: int = None, averaging: int = 1):
         self.i2c = i2c
         self.addr = addr
 
         self.buf = bytearray(2)
+        self.snapshot = array.array("i", (0, 0, 0, 0))
+        self.cal_restores = 0  # Times the calibration was found lost and rewritten
 
         # Due to fixed PCB design, hard coding in calibration value and config
         # VBUS_MAX = 16V
@@ -83,15 +115,9 @@ class INA219:
         self._current_lsb = 0.001  # (IMAX / 4096) = 1mA per bit
         self._cal_value = 4096  # (0.04096 / (current_lsb * RSHUNT))
         self._power_lsb = 0.02  # 20 * current_lsb
+        self._config = 0
 
-        self.set_calibration(
-            self._cal_value,
-            self.CONFIG_BVOLTAGERANGE_16V
-            | self.CONFIG_GAIN_1_40MV
-            | self.CONFIG_BADCRES_12BIT
-            | self.CONFIG_SADCRES_12BIT_1S_532US
-            | self.CONFIG_MODE_SANDBVOLT_CONTINUOUS,
-        )
+        self.set_averaging(averaging)
 
     def _write_register(self, reg, value):
         self.buf[0] = (value >> 8) & 0xFF
@@ -124,15 +150,108 @@ class INA219:
         return voltage_mv
 
     def get_current_ma(self):
-        """The current through the shunt resistor in milliamps."""
-        # Write cal register as it is volatile and will break current and power readings if missing
-        self._write_register(self.REG_CAL, self._cal_value)
+        """
+        The current through the shunt resistor in milliamps. Scaled from the shunt register
+        with the same calibration math the chip uses for the current register, so it doesn't
+        depend on the volatile calibration register and needs no write before the read.
+        """
+        raw_shunt = self._to_signed(self._read_register(self.REG_SHUNT))
+        return raw_shunt * self._cal_value // 4096 * self._current_lsb * 1000
+
+    def read_current_ma(self):
+        """
+        Latest completed current result in mA as an int, one register read with no float
+        maths and without touching CNVR, so it can be polled between read_snapshot() calls
+        """
+        raw_shunt = self._to_signed(self._read_register(self.REG_SHUNT))
+        return raw_shunt * self._cal_value // 4096
+
+    def set_averaging(self, n_samples: int):
+        """
+        Configure on-chip averaging of n_samples shunt conversions (1, 2, 4 ... 128).
+        Results then update every conversion_time_us, see read_averaged_current_ma().
+        """
+        if n_samples not in self.SADC_AVERAGING:
+            raise ValueError(
+                f"Unsupported averaging {n_samples}, must be one of {sorted(self.SADC_AVERAGING)}"
+            )
+        sadc, shunt_us = self.SADC_AVERAGING[n_samples]
+        self.averaging = n_samples
+        self.conversion_time_us = shunt_us + self.BUS_CONVERSION_US
+        self.set_calibration(
+            self._cal_value,
+            self.CONFIG_BVOLTAGERANGE_16V
+            | self.CONFIG_GAIN_1_40MV
+            | self.CONFIG_BADCRES_12BIT
+            | sadc
+            | self.CONFIG_MODE_SANDBVOLT_CONTINUOUS,
+        )
+
+    def conversion_ready(self):
+        """True once a new conversion (including averaging) has completed"""
+        return bool(self._read_register(self.REG_BUS) & self.CONFIG_CNVR)
+
+    def read_snapshot(self):
+        """
+        Shunt voltage, bus voltage, power and current from the same conversion, or None if
+        no new result has completed since the last call. Values are ints in the
+        self.snapshot array (uV, mV, mW, mA, see the SNAPSHOT_ indexes) which is reused by
+        every call, copy anything that needs to outlive the next one.
+
+        The INA219 doesn't auto increment its register pointer, so this is one read each of
+        bus (polls CNVR), shunt and power (clears CNVR). Current is the shunt scaled with
+        the calibration math rather than a fourth read. The power register is computed on
+        chip from the calibrated current, so it reading 0 while the shunt and bus say
+        otherwise means a brown out wiped the calibration, which is then rewritten.
+        """
+        raw_bus = self._read_register(self.REG_BUS)
+        if not raw_bus & self.CONFIG_CNVR:
+            return None
+        raw_shunt = self._to_signed(self._read_register(self.REG_SHUNT))
+        raw_power = self._read_register(self.REG_POWER)  # Clears CNVR
+
+        bus_lsb = raw_bus >> 3  # Drop CNVR and OVF, 4mV per bit
+        raw_current = raw_shunt * self._cal_value // 4096
+        if raw_power == 0 and abs(raw_current) * bus_lsb // 5000 > 1:
+            self._restore_calibration()
+
+        snap = self.snapshot
+        snap[self.SNAPSHOT_SHUNT_UV] = raw_shunt * 10
+        snap[self.SNAPSHOT_BUS_MV] = bus_lsb * 4
+        snap[self.SNAPSHOT_POWER_MW] = raw_power * 20
+        snap[self.SNAPSHOT_CURRENT_MA] = raw_current
+        return snap
+
+    def read_averaged_current_ma(self):
+        """
+        The hardware averaged current in milliamps, or None if no new result has completed
+        since the last call. See read_snapshot(), 3 transactions per result regardless of
+        averaging.
+        """
+        snap = self.read_snapshot()
+        if snap is None:
+            return None
+        return snap[self.SNAPSHOT_CURRENT_MA]
+
+    def check_calibration(self):
+        """
+        Read back the calibration and config registers and rewrite them if they've been
+        reset, e.g. after a brown out on the sensor supply. Returns True if they were intact.
+        """
+        if (
+            self._read_register(self.REG_CAL) == self._cal_value
+            and self._read_register(self.REG_CONFIG) == self._config
+        ):
+            return True
+        self._restore_calibration()
+        return False
 
-        # Now we can safely read the CURRENT register!
-        raw_current = self._to_signed(self._read_register(self.REG_CURRENT))
-        return raw_current * self._current_lsb * 1000
+    def _restore_calibration(self):
+        self.cal_restores += 1
+        self.set_calibration(self._cal_value, self._config)
 
     def set_calibration(self, cal_value, config):
         """Set calibration value and config register values"""
+        self._config = config
         self._write_register(self.REG_CAL, cal_value)
         self._write_register(self.REG_CONFIG, config)
@@ -1,15 +1,26 @@
-from machine import Pin, I2C, Timer
+from machine import Pin, I2C
 import time
 from power_supply import PSU
 from drv8837 import DRV8837
 from motor_control import MotorControl
+from current_trip import CurrentTrip
 from tmp1075 import TMP1075
 from pulse_counter import PulseCounter
+from executive import Executive
+from gc_manager import GCManager
+from render_scheduler import RenderScheduler
+from telemetry import TelemetryLogger
+from telemetry_stream import TelemetryStream
 from rotary_irq_esp import RotaryIRQ
 from st7735_display import ST7735_display
 from button import BUTTON
-import lvgl as lv
 from ui import UI
+from ui_common import (
+    CURRENT_LIM_DEFAULT_MA,
+    CURRENT_LIM_MAX_MA,
+    CURRENT_LIM_MIN_MA,
+    TEMP_LIM_DEFAULT_C,
+)
 
 # time.sleep(3)  # Allow time to connect to REPL after a reset for debugging
 
@@ -31,20 +42,50 @@ wheel_sensor = PulseCounter(pin=1)
 psu = PSU(i2c, en_pin=16, dac_addr=0x60, imon_addr=0x40)
 drv = DRV8837(motor_en=15, motor_in1=6, motor_in2=5)
 rpm = PulseCounter(pin=2)
-tmp = TMP1075(i2c, addr=0x48)
+# One-shot conversions, ALERT isn't routed to a GPIO on this board revision
+tmp = TMP1075(i2c, addr=0x48, oneshot=True)
 motor = MotorControl(psu, drv, rpm, tmp)
+motor.set_temp_limit(TEMP_LIM_DEFAULT_C)
+motor.set_ramp_current_limit(CURRENT_LIM_MAX_MA)  # Ramp as fast as the current allows
 
+# Over-current and stall trip. The ramp paces to CURRENT_LIM_MAX_MA from 10ms samples
+# and can overshoot it by ~15%, so the allowance while starting up has headroom over that
+trip = CurrentTrip(
+    motor,
+    limit_ma=CURRENT_LIM_DEFAULT_MA,
+    inrush_ma=CURRENT_LIM_MAX_MA * 5 // 4,
+    stall_ma=CURRENT_LIM_MIN_MA,
+    period_ms=2,
+)
 
-# Configure an ISR for LVGL to update the display
-def lvgl_callback(timer):
-    lv.tick_inc(50)
-    lv.task_handler()
-    pass
+# Garbage collection held off while the motor ramps or brakes, and run from UI idle points
+gc_manager = GCManager(busy=motor.in_transition)
 
+# Binary log of each motor run, sampled with the current and written out at UI idle points
+telemetry = TelemetryLogger(motor)
 
-lvgl_timer = Timer(0)  # Timer ID 0 (ESP32 has timers 0–3)
-lvgl_timer.init(period=50, mode=Timer.PERIODIC, callback=lvgl_callback)
+# Framed telemetry over USB serial for a host, off until stream.start() from the REPL
+stream = TelemetryStream(motor, wheel_sensor, period_ms=10)
+# stream.start()  # Stream from boot, decode with tools/telemetry_decode.py on the host
+
+# Motor state machine and sensing at fixed rates, whatever screen is showing
+executive = Executive(
+    (
+        ("protect", 2, (trip.check,)),  # First, so it's released ahead of the rest
+        ("state", 1, (motor.update_state, gc_manager.update_phase)),
+        ("current", 10, (motor.sample_current, telemetry.sample, stream.sample)),
+        ("rpm", 100, (motor.sample_rpm, wheel_sensor.close_window)),
+        ("temp", 1000, (motor.sample_temp,)),
+    )
+)
+executive.start(timer_id=1)
+
+# LVGL renders from the UI loop at up to 30fps, with the real elapsed ticks
+renderer = RenderScheduler(frame_ms=33, budget_us=15000)
+
+# Renders, log flushes and collections hold off the trip check, its bound includes them
+trip.set_holdoff_sources(renderer, telemetry, gc_manager)
 
 # Launch UI
-app = UI(display)
+app = UI(display, gc_manager, renderer, telemetry, stream)
 app.show_menu(motor, rotary_enc, enc_btn, wheel_sensor)
@@ -22,6 +22,8 @@ class MCP4725:
         self.i2c = i2c
         self.addr = addr
         self.vcc_mv = vcc_mv
+        self.buf = bytearray(3)
+        self.buf[0] = 0x40  # Fast mode command
 
     def set_value(self, value: int) -> None:
         """
@@ -29,8 +31,7 @@ class MCP4725:
         Fast mode, does not write EEPROM.
         """
         value = max(0, min(4095, int(value)))
-        buf = bytearray(3)
-        buf[0] = 0x40  # Fast mode command
+        buf = self.buf
         buf[1] = value >> 4
         buf[2] = (value & 0xF) << 4
         self.i2c.writeto(self.addr, buf)
@@ -56,6 +57,10 @@ class MCP4725:
         value = self.get_value()
         return self._value_to_voltage(value)
 
+    def voltage_to_value(self, voltage_mv: int) -> int:
+        """Raw DAC value (0-4095) for an output voltage, to precompute set_value() arguments"""
+        return max(0, min(4095, self._voltage_to_value(voltage_mv)))
+
     def _value_to_voltage(self, value: int) -> int:
         """Internal: Convert raw DAC value to voltage"""
         return (value / 4095) * self.vcc_mv
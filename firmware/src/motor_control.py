@@ -1,7 +1,9 @@
 import drv8837
 import power_supply
+from ina219 import INA219
+from stats import Cascade, Window
+from voltage_ramp import VoltageRamp
 import time
-import collections
 
 
 class MotorControl:
@@ -14,7 +16,12 @@ class MotorControl:
     Key requirements in addtion to the above functionality are:
     - PSU can only be enabled when set to 1V and motor is in brake mode.
     - PSU can only change voltage in 50mv steps at a rate of 50mV / ms to prevent the supply rail from crashing.
+      With set_ramp_current_limit() the rate follows the measured current instead, faster
+      while there's headroom under the limit and holding when the motor draws it.
     - Motor can only transistion between forward and reverse by braking for a minmum amount of time first.
+      The brake ends once the RPM sensor has seen no edges for standstill_time, after at
+      least brake_min_time, or after brake_time at the most. With one pulse per rev that
+      reads anything under 60 / standstill_time RPM as stopped.
     - Motor can only be enabled or disabled when the PSU is set to 1V and in brake mode.
 
     Example:
@@ -31,7 +38,17 @@ class MotorControl:
         motor.get_current_1s()
         motor.get_rpm_1s()
         motor.get_temp_10s()
+        motor.set_temp_limit(40)
+        motor.is_over_temp()
         motor.set_state(REVERSE, 3000)
+        motor.get_time_to_target_ms()  # Ramp time left at the slew rate
+        motor.get_last_ramp_ms()  # Measured time of the last completed ramp
+        motor.set_ramp_current_limit(1000)  # Current aware ramp, None for the fixed rate
+        motor.get_last_brake_ms()  # Time the last direction change waited on the brake
+        motor.brake_report()  # Brake times of the recent direction changes
+        motor.trip(motor.TRIP_STALL)  # Protection path, brake now and ramp down
+        motor.TRIP_NAMES[motor.trip_reason]  # Latched, e.g. "STALL", for the screens
+        motor.clear_trip()  # The user has seen it, set_state() can drive again
     """
 
     # States for the user to command
@@ -42,7 +59,27 @@ class MotorControl:
     VOLTAGE_MIN_MV = 500
     VOLTAGE_MAX_MV = 3000
 
-    def __init__(self, psu, drv, rpm, temp, brake_time: float = 1, ramp_rate: int = 50):
+    # Why the protection path last stopped the motor
+    TRIP_NONE = 0
+    TRIP_OVER_CURRENT = 1
+    TRIP_STALL = 2
+    TRIP_NAMES = ("", "OVER CURRENT", "STALL")
+
+    def __init__(
+        self,
+        psu,
+        drv,
+        rpm,
+        temp,
+        brake_time: float = 1,
+        brake_min_time: float = 0.1,
+        standstill_time: float = 0.1,
+        ramp_rate: float = 50,
+        ramp_timer_id: int = 2,
+        current_sample_ms: int = 10,
+        current_averaging: int = 16,
+        temp_sample_ms: int = 1000,
+    ):
         self.psu = psu
         self.drv = drv
         self.rpm = rpm
@@ -50,38 +87,74 @@ class MotorControl:
 
         # Soft start
         self.brake_time_ms = int(brake_time * 1000)
-        self.ramp_rate = ramp_rate
-        self.previous_ramp_time = time.ticks_ms()
-        self.brake_start_time = None
+        self.brake_min_ms = int(brake_min_time * 1000)
+        self.standstill_ms = int(standstill_time * 1000)
+        self.ramp = VoltageRamp(
+            psu,
+            self.VOLTAGE_MIN_MV,
+            self.VOLTAGE_MAX_MV,
+            step_mv=50,
+            slew_mv_per_ms=ramp_rate,
+            timer_id=ramp_timer_id,
+        )
+        self.brake_start_time = time.ticks_ms()  # Motor starts out braked
+        # Standstill, the RPM sensor's count and when it last moved while braking
+        self.brake_edge_count = self.rpm.get_count()
+        self.brake_edge_time = self.brake_start_time
+        # Time each direction change waited on the brake, and those that waited the full
+        # brake_time without the sensor seeing the rotor stop
+        self.brake_wait_start = None
+        self.brake_stats = Window(16)
+        self.brake_timeouts = 0
         # Motor State
         self.motor_enabled = False
         self.motor_direction = self.MOTOR_BRAKE
         self.target_motor_direction = self.MOTOR_BRAKE
+        self.trip_reason = self.TRIP_NONE
         # PSU State
         self.psu_enabled = False
-        self.voltage_mv = self.VOLTAGE_MIN_MV
         self.target_voltage_mv = self.VOLTAGE_MIN_MV
-        # Current Averaging
-        self.current_samples_100ms = collections.deque((), 10)
-        self.current_samples_1s = collections.deque((), 10)
+        # Current aware ramp, off until set_ramp_current_limit()
+        self.ramp_limit_ma = None
+        self.ramp_max_rate = 200
+        self.winding_mohm = 1000
+        # Voltage and drive the last current sample was measured at, see _ramp_current_ma()
+        self.current_sample_mv = self.VOLTAGE_MIN_MV
+        self.current_sample_driven = False
+        # Current Averaging, 10 x 10ms samples per 100ms and 10 x 100ms means per 1s
+        self.current_stats = Cascade(10, 10)
         self.current_last_sample_time = time.ticks_ms()
-        self.current_last_avg = (0.0, 0.0)
-        # Temp Averaging
-        self.temp_samples_10s = collections.deque((), 10)
-        self.temp_last_sample_time = time.ticks_ms()
-        self.temp_last_avg = 0.0
+        # Measured output voltage, from the same INA219 conversions as the current
+        self.voltage_stats = Window(10)
+        self.set_current_sampling(current_sample_ms, current_averaging)
+        # Temp Averaging in hundredths of a degree, 10 samples is 10s at the default rate
+        self.temp_stats = Window(10)
+        self.temp_sample_ms = temp_sample_ms
+        self.temp_last_sample_time = time.ticks_add(time.ticks_ms(), -temp_sample_ms)
+        self.temp_conversion_started = False  # A one-shot conversion is ready to read
+        # Over temperature
+        self.temp_limit_c = None
+        self.temp_hysteresis_c = 0
+        self.temp_over_limit = False
 
         # Set default states
         self.psu.disable()
-        self.psu.set_voltage_mv(self.voltage_mv)
+        self.ramp.reset(self.VOLTAGE_MIN_MV)
         self.drv.brake()
         self.drv.enable()  # We don't want to enable / disable the DRV during use, instead use brake to disable motion
         self.psu.enable()  # Likewise, we'll leave the PSU on at all times and just use brake to disable motion
 
     def set_state(self, direction: int, voltage: int):
         """
-        Sets motor direction and voltage following the rules in the docstring
+        Sets motor direction and voltage following the rules in the docstring. After a
+        trip only braking is accepted until clear_trip().
         """
+        if self.trip_reason and direction != self.MOTOR_BRAKE:
+            print(
+                f"Motor tripped on {self.TRIP_NAMES[self.trip_reason]}, "
+                "clear_trip() before driving it"
+            )
+            return
 
         # Bounds check voltage and set target
         if voltage < self.VOLTAGE_MIN_MV:
@@ -95,7 +168,7 @@ class MotorControl:
                 f"Set Voltage {voltage}mV is above maximum of {self.VOLTAGE_MAX_MV}mV, setting to {self.VOLTAGE_MAX_MV}mV"
             )
         else:
-            self.target_voltage_mv = int(voltage)
+            self.target_voltage_mv = self.ramp.snap_mv(voltage)
 
         # Sets target direction, this does not handle the logic of when we change, just the desired end state
         if direction not in [self.MOTOR_BRAKE, self.MOTOR_FORWARD, self.MOTOR_REVERSE]:
@@ -105,22 +178,84 @@ class MotorControl:
         else:
             self.target_motor_direction = direction
 
+    @property
+    def voltage_mv(self):
+        """Voltage the PSU is set to right now, part way through a ramp or at the target"""
+        return self.ramp.voltage_mv
+
     def ramp_voltage(self, target_voltage_mv: float = None):
+        """Ramp the PSU towards the target in the background at the configured slew rate"""
         if target_voltage_mv is None:
             target_voltage_mv = self.target_voltage_mv
+        previous = self.ramp.target_index
+        self.ramp.set_target(target_voltage_mv)
+        if self.ramp_limit_ma is not None and self.ramp.target_index != previous:
+            self._pace_ramp()  # Don't go up at a falling pace
 
-        now = time.ticks_ms()
+    def set_ramp_rate(self, slew_mv_per_ms: float):
+        self.ramp.set_slew_rate(slew_mv_per_ms)
+
+    def set_ramp_current_limit(
+        self, limit_ma: int, max_rate: float = 200, winding_ohm: float = 1.0
+    ):
+        """
+        Pace the ramp from the current instead of the fixed ramp rate, None to go back.
+
+        Raising the voltage by dV raises the current by at most dV / winding_ohm, the back
+        EMF only takes it down from there. So after each current sample the ramp is paced
+        to add no more than (limit_ma - current) x winding_ohm before the next sample lands,
+        up to max_rate mV/ms with lots of headroom and holding at the limit until the motor
+        speeds up and the current falls. When the rest of the ramp fits in the headroom it
+        goes at max_rate, as it does ramping down. Give the lowest winding resistance of
+        the motors to be tested, a lower one errs on the safe side.
+
+        This is quicker than the fixed rate wherever the fixed rate stays under the limit,
+        e.g. steps up and starts to 2V at 2000mA. Starting at higher voltages the fixed
+        rate only gets there sooner by overshooting the limit (2.5A starting at 3V), here
+        the motor has to speed up first and it takes longer (~120ms vs ~50ms at 2000mA).
+        """
+        if limit_ma is not None and limit_ma <= 0:
+            raise ValueError(f"Ramp current limit must be positive, got {limit_ma}mA")
+        self.ramp_limit_ma = limit_ma
+        self.ramp_max_rate = max_rate
+        self.winding_mohm = int(winding_ohm * 1000)
+        if limit_ma is None:
+            self.ramp.set_pace(None)
+        else:
+            self._pace_ramp()
 
-        # If it's been more than 1ms since the last voltage change, it's valid to do it again
-        if time.ticks_diff(now, self.previous_ramp_time) > 1:
-            # If we are more than 50mV away from the target voltage, adjust in 50mV steps
-            if abs(target_voltage_mv - self.voltage_mv):
-                if target_voltage_mv > self.voltage_mv:
-                    self.voltage_mv = self.voltage_mv + 50
-                elif target_voltage_mv < self.voltage_mv:
-                    self.voltage_mv = self.voltage_mv - 50
-                self.psu.set_voltage_mv(self.voltage_mv)
-                self._last_ramp_time = now
+    def _ramp_current_ma(self):
+        """
+        Most the current can be at the voltage set now, from the last sample. The ramp
+        has moved on since the conversion, measured alongside it by the bus voltage, and
+        every mV added since adds at most 1 / winding_ohm mA. If the motor wasn't driven
+        for it, e.g. a start from braked, the rotor can be stopped and draw the whole
+        voltage over the winding resistance.
+        """
+        if not self.current_sample_driven:
+            return self.voltage_mv * 1000 // self.winding_mohm
+        added_mv = max(0, self.voltage_mv - self.current_sample_mv)
+        return self.current_stats.last() + added_mv * 1000 // self.winding_mohm
+
+    def _pace_ramp(self):
+        ramp = self.ramp
+        if ramp.target_index < ramp.index:
+            ramp.set_pace(self.ramp_max_rate)
+            return
+        current_ma = self._ramp_current_ma()
+        headroom_mv = (self.ramp_limit_ma - current_ma) * self.winding_mohm // 1000
+        if headroom_mv >= (ramp.target_index - ramp.index) * ramp.step_mv:
+            ramp.set_pace(self.ramp_max_rate)  # The rest of the ramp fits under the limit
+            return
+        ramp.set_pace(min(self.ramp_max_rate, headroom_mv / self.ramp_window_ms))
+
+    def get_time_to_target_ms(self):
+        """Expected time for the PSU to finish ramping to the target voltage"""
+        return self.ramp.get_time_to_target_ms(self.target_voltage_mv)
+
+    def get_last_ramp_ms(self):
+        """Measured time the last completed voltage ramp took"""
+        return self.ramp.last_ramp_us / 1000
 
     def update_state(self):
         now = time.ticks_ms()
@@ -134,10 +269,12 @@ class MotorControl:
                 # We are currently moving and want to change direction, so brake and start timer
                 self.drv.brake()
                 self.brake_start_time = now
+                self.brake_edge_count = self.rpm.get_count()
+                self.brake_edge_time = now
                 self.motor_direction = self.MOTOR_BRAKE
             else:
                 # If we are current braking and want to change direction, check if we've been braking long enough to change direction
-                if time.ticks_diff(now, self.brake_start_time) > self.brake_time_ms:
+                if self._brake_done(now):
                     # We've been braking long enough, change direction
                     if self.target_motor_direction == self.MOTOR_FORWARD:
                         self.drv.forward()
@@ -148,41 +285,161 @@ class MotorControl:
         elif self.voltage_mv != self.target_voltage_mv:
             self.ramp_voltage()
 
+    def trip(self, reason: int):
+        """
+        Stop from the protection path: brake the DRV8837 now, skipping the ramp down that
+        a change of direction waits for, and ramp the PSU down to VOLTAGE_MIN_MV behind it.
+        The reason stays latched, and the motor braked, until clear_trip().
+        """
+        self.drv.brake()
+        now = time.ticks_ms()
+        self.trip_reason = reason
+        self.motor_direction = self.MOTOR_BRAKE
+        self.target_motor_direction = self.MOTOR_BRAKE
+        self.target_voltage_mv = self.VOLTAGE_MIN_MV
+        self.brake_start_time = now
+        self.brake_edge_count = self.rpm.get_count()
+        self.brake_edge_time = now
+        self.ramp_voltage(self.VOLTAGE_MIN_MV)
+
+    def clear_trip(self):
+        """Acknowledge a trip, set_state() drives the motor again after this"""
+        self.trip_reason = self.TRIP_NONE
+
+    def _brake_done(self, now):
+        """
+        True once the rotor has stopped, no RPM edges for standstill_ms after at least
+        brake_min_ms of braking, or brake_time_ms has passed whatever the sensor says
+        """
+        if self.brake_wait_start is None:
+            self.brake_wait_start = now
+        braked = time.ticks_diff(now, self.brake_start_time)
+        count = self.rpm.get_count()
+        if count != self.brake_edge_count:
+            self.brake_edge_count = count
+            self.brake_edge_time = now
+        stopped = time.ticks_diff(now, self.brake_edge_time) >= self.standstill_ms
+        if braked <= self.brake_time_ms and (braked < self.brake_min_ms or not stopped):
+            return False
+        if not stopped:
+            self.brake_timeouts += 1
+        # From braking for a reversal, or from the request after a stop, to moving off
+        self.brake_stats.add(time.ticks_diff(now, self.brake_wait_start))
+        self.brake_wait_start = None
+        return True
+
+    def get_last_brake_ms(self):
+        """Time the last direction change waited on the brake"""
+        return self.brake_stats.last()
+
+    def brake_report(self):
+        """Print the brake times of the recent direction changes"""
+        stats = self.brake_stats
+        if not len(stats):
+            print("No direction changes yet")
+            return
+        print(
+            f"Brake wait over the last {len(stats)} direction changes: "
+            f"mean {stats.mean_int()}ms min {stats.min()}ms max {stats.max()}ms "
+            f"last {stats.last()}ms, {self.brake_timeouts} still turning at "
+            f"{self.brake_time_ms}ms"
+        )
+
+    def in_transition(self):
+        """True while ramping, braking or waiting to change direction"""
+        return (
+            self.motor_direction != self.target_motor_direction
+            or self.voltage_mv != self.target_voltage_mv
+            or not self.ramp.at_target()
+        )
+
     def get_voltage_mv(self):
-        """Get voltage from current sensor"""
-        return self.psu.get_voltage_mv()
+        """
+        Latest measured output voltage. Comes from the current sampling in update_current_ma(),
+        so reading it costs no extra I2C traffic.
+        """
+        return self.voltage_stats.last()
+
+    def get_voltage_100ms(self):
+        return self.voltage_stats.mean()
+
+    def get_voltage_100ms_mv(self):
+        """get_voltage_100ms() rounded to an int"""
+        return self.voltage_stats.mean_int()
+
+    def set_current_sampling(self, sample_ms: int, averaging: int):
+        """
+        Take a current sample every sample_ms, each one averaged over `averaging` conversions
+        in the INA219. The averaging gets rid of the high frequency commutation noise, keep
+        the conversion time within sample_ms so every sample is a fresh result.
+        """
+        self.psu.set_current_averaging(averaging)
+        self.current_sample_ms = sample_ms
+        conversion_ms = self.psu.get_current_conversion_time_us() / 1000
+        # A sample is the mean over the conversion, so it lags by half of it on top of the
+        # time to the next sample, the current aware ramp allows for both
+        self.ramp_window_ms = sample_ms + conversion_ms / 2
+        if conversion_ms > sample_ms:
+            print(
+                f"Current averaging of {averaging} takes {conversion_ms:.1f}ms, longer than the {sample_ms}ms sample period"
+            )
 
     def update_current_ma(self):
         """
-        This function will sample the current every 10ms and create rolling averages
+        This function will sample the current and output voltage every current_sample_ms
+        and create rolling averages
         """
         now = time.ticks_ms()
-        if time.ticks_diff(now, self.current_last_sample_time) >= 10:
-            current = self.psu.get_current_ma(
-                5
-            )  # This gets rid of the high frequency commutation noise
-            self.current_last_sample_time = now
-
-            # The 100ms average is directly averaging 10 x 10ms samples
-            self.current_samples_100ms.append(current)
-            avg_100ms = sum(self.current_samples_100ms) / len(
-                self.current_samples_100ms
-            )
+        if time.ticks_diff(now, self.current_last_sample_time) >= self.current_sample_ms:
+            if self.sample_current():
+                self.current_last_sample_time = now
+            # Else averaging still in progress, try again next call
 
-            # The 1s average is using the 100ms averages to keep the array size down
-            self.current_samples_1s.append(self.current_samples_100ms[-1])
-            avg_1s = sum(self.current_samples_1s) / len(self.current_samples_1s)
-            self.current_last_avg = (avg_100ms, avg_1s)
+    def sample_current(self):
+        """
+        Take a current and voltage sample now, for callers that run at a fixed rate. Returns
+        False if the INA219 has no new result yet.
+        """
+        snap = self.psu.read_snapshot()
+        if snap is None:
+            return False
+        self.current_stats.add(snap[INA219.SNAPSHOT_CURRENT_MA])
+        self.voltage_stats.add(snap[INA219.SNAPSHOT_BUS_MV])
+        self.current_sample_mv = snap[INA219.SNAPSHOT_BUS_MV]
+        self.current_sample_driven = self.motor_direction != self.MOTOR_BRAKE
+        if self.ramp_limit_ma is not None:
+            self._pace_ramp()
+        return True
+
+    def get_current_ma(self):
+        """Latest current sample"""
+        return self.current_stats.last()
 
     def get_current_100ms(self):
-        return self.current_last_avg[0]
+        return self.current_stats.mean(0)
+
+    def get_current_100ms_ma(self):
+        """get_current_100ms() rounded to an int"""
+        return self.current_stats.mean_int(0)
 
     def get_current_1s(self):
-        return self.current_last_avg[1]
+        return self.current_stats.mean(1)
+
+    def get_current_1s_ma(self):
+        """get_current_1s() rounded to an int"""
+        return self.current_stats.mean_int(1)
 
     def update_rpm(self):
         self.rpm.update_pulse_count()
 
+    def sample_rpm(self):
+        """Close the RPM counting window now, for callers that run at a fixed rate"""
+        self.rpm.close_window()
+
+    def get_rpm(self):
+        """Latest RPM, period based if the sensor is in PulseCounter.MODE_PERIOD"""
+        return self.rpm.get_rpm()
+
     def get_rpm_100ms(self):
         return self.rpm.get_rpm_100ms()
 
@@ -190,13 +447,63 @@ class MotorControl:
         return self.rpm.get_rpm_1s()
 
     def update_temp(self):
+        """Sample the temperature every temp_sample_ms"""
         now = time.ticks_ms()
-        if time.ticks_diff(now, self.temp_last_sample_time) >= 1000:
+        if time.ticks_diff(now, self.temp_last_sample_time) >= self.temp_sample_ms:
             self.temp_last_sample_time = now
+            self.sample_temp()
 
-        # The 10s average is directly averaging 10 x 1s samples
-        self.temp_samples_10s.append(self.temp.get_temperature())
-        self.temp_last_avg = sum(self.temp_samples_10s) / len(self.temp_samples_10s)
+    def sample_temp(self):
+        """
+        Take a temperature sample now, for callers that run at a fixed rate. With a one-shot
+        sensor this reads the conversion started by the previous call and starts the next,
+        so nothing waits on the conversion and each reading is one sample period old.
+        """
+        if self.temp.oneshot and not self.temp_conversion_started:
+            self.temp.start_conversion()
+            self.temp_conversion_started = True
+            return
+
+        temp = self.temp.get_temperature()
+        self.temp.start_conversion()  # Next one-shot, does nothing in continuous mode
+        self.temp_stats.add(int(temp * 100))
+
+        if self.temp_limit_c is not None:
+            if temp >= self.temp_limit_c:
+                self.temp_over_limit = True
+            elif temp < self.temp_limit_c - self.temp_hysteresis_c:
+                self.temp_over_limit = False
+
+    def set_temp_limit(self, limit_c: float, hysteresis_c: float = 5):
+        """
+        Over temperature from limit_c until the motor cools hysteresis_c below it. Programmed
+        into the TMP1075 so its ALERT pin signals it by interrupt.
+        """
+        self.temp_limit_c = limit_c
+        self.temp_hysteresis_c = hysteresis_c
+        self.temp.set_limits(limit_c - hysteresis_c, limit_c)
+
+    def is_over_temp(self):
+        """Over temperature state, from the ALERT interrupt if wired, else the last sample"""
+        if self.temp.alert_pin is not None:
+            return self.temp.alert
+        return self.temp_over_limit
+
+    def get_temp(self):
+        """Latest temperature sample"""
+        return self.temp_stats.last() / 100
+
+    def has_temp(self):
+        """True once there's a temperature sample, get_temp() reads 0 before that"""
+        return self.temp_stats.count > 0
+
+    def get_temp_x100(self):
+        """get_temp() in hundredths of a degree as an int, for the telemetry log"""
+        return self.temp_stats.last()
 
     def get_temp_10s(self):
-        return self.temp_last_avg
+        return self.temp_stats.mean() / 100
+
+    def get_temp_10s_x10(self):
+        """get_temp_10s() in tenths of a degree as an int, for the live readouts"""
+        return (self.temp_stats.mean_int() + 5) // 10
@@ -15,8 +15,13 @@ class PSU:
         psu.enable()
         psu.disable()
         psu.set_voltage_mv(1650)  # Set regulator output voltage to 1650mV
+        psu.set_dac_code(psu.dac_code_for_mv(1650))  # Same, conversion done up front
         psu.get_voltage_mv()  # Use current sensor to measure output voltage
         psu.get_current_ma()  # Use current sensor to measure output current
+        psu.set_current_averaging(16)  # Average in the current sensor instead
+        psu.get_current_ma_averaged()  # None until a new averaged result is ready
+        psu.read_snapshot()  # Voltage, current and power from one conversion, or None
+        psu.read_current_ma()  # Latest current result as an int, for the protection path
 
     """
 
@@ -43,6 +48,10 @@ class PSU:
 
     def set_voltage_mv(self, voltage_mv: int):
         """Given desired output voltage, calculate DAC voltage and set accordingly"""
+        self.dac.set_value(self.dac_code_for_mv(voltage_mv))
+
+    def dac_code_for_mv(self, voltage_mv: int):
+        """Raw DAC code that sets the regulator output to voltage_mv"""
 
         # Output voltage configured per ADI / Maxim appnote
         # A 3-Step Approach for Designing a Variable Output Buck Regulator
@@ -52,11 +61,15 @@ class PSU:
         # Constants were determined emperically on one unit, don't ask me about per unit calibration
 
         dac_voltage_mv = (4060 - voltage_mv) / 1.01
-        self.dac.set_voltage_mv(dac_voltage_mv)
+        return self.dac.voltage_to_value(dac_voltage_mv)
+
+    def set_dac_code(self, code: int):
+        """Set a raw DAC code from dac_code_for_mv(), skips the conversion for hot paths"""
+        self.dac.set_value(code)
 
     def get_voltage_mv(self):
         """Measure output voltage using current sensor"""
-        return self.imon.get_bus_voltage()
+        return self.imon.get_bus_voltage_mv()
 
     def get_current_ma(self, n_samples: int = 1):
         """
@@ -68,3 +81,26 @@ class PSU:
             cumsum += self.imon.get_current_ma()
 
         return cumsum / n_samples
+
+    def set_current_averaging(self, n_samples: int):
+        """Number of samples the current sensor averages on chip (1, 2, 4 ... 128)"""
+        self.imon.set_averaging(n_samples)
+
+    def get_current_conversion_time_us(self):
+        """How often the current sensor produces a new (averaged) result"""
+        return self.imon.conversion_time_us
+
+    def get_current_ma_averaged(self):
+        """Hardware averaged output current, or None if no new result is ready yet"""
+        return self.imon.read_averaged_current_ma()
+
+    def read_current_ma(self):
+        """Latest current sensor result in mA as an int, see INA219.read_current_ma()"""
+        return self.imon.read_current_ma()
+
+    def read_snapshot(self):
+        """
+        Output voltage, current and power from the same current sensor conversion, or None if
+        no new result is ready yet. See INA219.read_snapshot() for the layout.
+        """
+        return self.imon.read_snapshot()
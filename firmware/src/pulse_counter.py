@@ -1,62 +1,256 @@
-from machine import Pin, Counter
+from machine import Pin
 import machine
 import time
-import collections
+import array
+from stats import Window
+
+try:
+    from machine import Counter
+except ImportError:
+    Counter = None  # Firmware without the PCNT driver, only IRQ counting is available
 
 
 class PulseCounter:
-    def __init__(self, pin: int = None):
+    """
+    Counts falling edges from the optical RPM / wheel sensors and averages them over
+    100ms and 1s windows. Hz values are revolutions per second, i.e. the pulse rate divided
+    by pulses_per_rev.
+
+    Counting backends:
+    - MODE_PCNT: ESP32 hardware pulse counter (machine.Counter), no CPU time per edge.
+    - MODE_IRQ: Python IRQ on every edge. Used as a fallback if PCNT is unavailable.
+    - MODE_PERIOD: Python IRQ on every edge that also records a ticks_us timestamp into a
+      ring buffer. get_rpm() then measures the period over the last period_avg_revs
+      revolutions, giving 1us resolution (0.05% at 30k RPM) within a revolution or two
+      instead of 600 RPM steps after 100ms. Intervals shorter than min_interval_us are
+      treated as glitches and ignored. Timestamps are taken in the soft IRQ, so they
+      carry the scheduler latency as jitter.
+
+    Example:
+
+        rpm = PulseCounter(pin=2)
+        rpm.update_pulse_count()  # Call regularly, averages update every 100ms
+        rpm.close_window()  # Or call this at exactly 10Hz, e.g. from the executive
+        rpm.get_rpm_1s()
+        rpm.get_hz_100ms()
+
+        rpm = PulseCounter(pin=2, mode=PulseCounter.MODE_PERIOD, min_interval_us=200)
+        rpm.get_rpm()  # Latest period based measurement
+    """
+
+    MODE_IRQ = 1
+    MODE_PCNT = 2
+    MODE_PERIOD = 3
+
+    # Edge timestamp ring buffer for MODE_PERIOD, power of 2
+    EDGE_RING_SIZE = 32
+    _COUNT_MASK = 0x3FFFFFFF  # Keep the IRQ edge count a small int so the ISR never allocates
+
+    # ESP32-S3 has 4 PCNT units, handed out in order of construction
+    PCNT_UNITS = 4
+    _next_pcnt_unit = 0
+
+    def __init__(
+        self,
+        pin: int = None,
+        mode: int = MODE_PCNT,
+        counter_id: int = None,
+        filter_ns: int = 0,
+        pulses_per_rev: int = 1,
+        period_avg_revs: int = 1,
+        min_interval_us: int = 0,
+        timeout_ms: int = 500,
+    ):
         self.pin = Pin(pin, Pin.IN, None)
+        self.pulses_per_rev = pulses_per_rev
 
         self.pulse_count = 0
+        self.total_count = 0
         self.window_start_ms = time.ticks_ms()
-        self.pin.irq(trigger=Pin.IRQ_FALLING, handler=self._on_pulse)
 
-        self.hz_samples_100ms = collections.deque((), 10)
-        self.hz_samples_1s = collections.deque((), 10)
-        self.hz_last_avg = (0.0, 0.0, 0.0)
-        self.rpm_last_avg = (0.0, 0.0, 0.0)
+        self.counter = None
+        if mode == self.MODE_PCNT:
+            self.counter = self._init_counter(counter_id, filter_ns)
+
+        if mode == self.MODE_PERIOD:
+            self.mode = self.MODE_PERIOD
+            self._init_period(period_avg_revs, min_interval_us, timeout_ms)
+            self.pin.irq(trigger=Pin.IRQ_FALLING, handler=self._on_pulse_period)
+        elif self.counter is None:
+            self.mode = self.MODE_IRQ
+            self.pin.irq(trigger=Pin.IRQ_FALLING, handler=self._on_pulse)
+        else:
+            self.mode = self.MODE_PCNT
+            self._last_raw = self.counter.value()
+
+        # Pulses and length in ms of the last 10 windows, the 1s rate is their ratio
+        self.window_counts = Window(10)
+        self.window_lengths = Window(10)
+
+    def _init_counter(self, counter_id, filter_ns):
+        """Claim a PCNT unit counting falling edges, None if there isn't one available"""
+        if Counter is None:
+            return None
+        if counter_id is None:
+            if PulseCounter._next_pcnt_unit >= self.PCNT_UNITS:
+                return None
+            counter_id = PulseCounter._next_pcnt_unit
+            PulseCounter._next_pcnt_unit += 1
+        try:
+            return Counter(
+                counter_id, src=self.pin, edge=Counter.FALLING, filter_ns=filter_ns
+            )
+        except (ValueError, OSError) as e:
+            print(f"PCNT unit {counter_id} unavailable ({e}), using IRQ counting")
+            return None
+
+    def _init_period(self, avg_revs, min_interval_us, timeout_ms):
+        size = self.EDGE_RING_SIZE
+        self._edge_times = array.array("l", [0] * size)
+        self._edge_mask = size - 1
+        self._edge_head = 0
+        self._edge_count = 0
+        self._last_edge_us = time.ticks_us()
+        # Intervals to average, limited by what the ring holds
+        self._period_span = max(1, min(avg_revs * self.pulses_per_rev, size - 1))
+        self.min_interval_us = min_interval_us
+        self.timeout_us = timeout_ms * 1000
+        self._last_count = 0
 
     # Below is called every ISR
     def _on_pulse(self, pin):
         self.pulse_count += 1
 
+    def _on_pulse_period(self, pin):
+        now = time.ticks_us()
+        if time.ticks_diff(now, self._last_edge_us) < self.min_interval_us:
+            return  # Glitch, too soon after the last edge
+        self._last_edge_us = now
+        head = self._edge_head
+        self._edge_times[head] = now
+        self._edge_head = (head + 1) & self._edge_mask
+        self._edge_count = (self._edge_count + 1) & self._COUNT_MASK
+
+    def _read_window(self):
+        """
+        Return the number of pulses since the last call.
+
+        The PCNT count is never reset, the difference between reads is taken modulo 16 bits
+        so the hardware counter wrapping around between reads doesn't lose or invent
+        pulses, and no edges can arrive between a read and a reset. Good for up to 65535
+        pulses per window.
+        """
+        if self.counter is not None:
+            raw = self.counter.value()
+            count = (raw - self._last_raw) & 0xFFFF
+            self._last_raw = raw
+            return count
+
+        if self.mode == self.MODE_PERIOD:
+            edges = self._edge_count
+            count = (edges - self._last_count) & self._COUNT_MASK
+            self._last_count = edges
+            return count
+
+        state = machine.disable_irq()
+        count = self.pulse_count
+        self.pulse_count = 0
+        machine.enable_irq(state)
+        return count
+
     def update_pulse_count(self):
         """
-        This function counts the IRQ triggered pulse count variable and updates the average variables
+        This function closes the counting window once it is 100ms long, call regularly
+        """
+        if time.ticks_diff(time.ticks_ms(), self.window_start_ms) >= 100:
+            self.close_window()
+
+    def close_window(self):
+        """
+        Read the pulse count over the window since the last call and update the averages.
+        Call at a fixed 10Hz rate instead of update_pulse_count() when driven by a timer.
         """
         now = time.ticks_ms()
         elapsed = time.ticks_diff(now, self.window_start_ms)
-        if elapsed >= 100:
+        if elapsed <= 0:
+            return
+
+        # Get the count over the last window
+        count = self._read_window()
+        self.window_start_ms = now
+        self.total_count += count
+
+        # Windows can be longer or shorter than 100ms depending on the caller, so the rates
+        # divide by the actual window lengths
+        self.window_counts.add(count)
+        self.window_lengths.add(elapsed)
+
+    def _rate(self, pulses, elapsed_ms, per_s):
+        """Revolutions per second (per_s=1000) or minute (per_s=60000), floored to an int"""
+        if not elapsed_ms:
+            return 0
+        return pulses * per_s // (elapsed_ms * self.pulses_per_rev)
 
-            # Get the count over the last 100ms, reset the counter
-            state = machine.disable_irq()
-            count = self.pulse_count
-            self.pulse_count = 0
-            self.window_start_ms = now
-            machine.enable_irq(state)
+    def get_count(self):
+        """Total pulses counted since init, including the current partial window"""
+        if self.counter is not None:
+            return self.total_count + ((self.counter.value() - self._last_raw) & 0xFFFF)
+        if self.mode == self.MODE_PERIOD:
+            return self.total_count + (
+                (self._edge_count - self._last_count) & self._COUNT_MASK
+            )
+        return self.total_count + self.pulse_count
+
+    def get_period_us(self):
+        """
+        Mean pulse period over the last period_avg_revs revolutions in us, 0 if stopped.
+        Only available in MODE_PERIOD.
+        """
+        state = machine.disable_irq()
+        edges = min(self._edge_count, self._period_span + 1)
+        head = self._edge_head
+        last = self._edge_times[(head - 1) & self._edge_mask]
+        first = self._edge_times[(head - edges) & self._edge_mask]
+        machine.enable_irq(state)
 
-            # The 100ms average is the raw count over the last 100ms
-            hz_avg_100ms = count * 10
+        if edges < 2:
+            return 0
+        since_last = time.ticks_diff(time.ticks_us(), last)
+        if since_last > self.timeout_us:
+            return 0
+        period = time.ticks_diff(last, first) / (edges - 1)
+        # No edge for over two periods means the motor has slowed down since, so the time
+        # since the last edge is the better estimate. Within that, IRQ jitter on when the
+        # next edge lands would only make the reading dip.
+        if since_last > 2 * period:
+            return since_last
+        return period
 
-            # The 1s average is using the 100ms average to keep the array size down
-            self.hz_samples_1s.append(hz_avg_100ms)
-            hz_avg_1s = sum(self.hz_samples_1s) / len(self.hz_samples_1s)
+    def get_hz(self):
+        """Latest revolutions per second, period based in MODE_PERIOD, else the 100ms gate"""
+        if self.mode != self.MODE_PERIOD:
+            return self.get_hz_100ms()
+        period = self.get_period_us()
+        if not period:
+            return 0.0
+        return 1000000 / (period * self.pulses_per_rev)
 
-            self.hz_last_avg = (int(hz_avg_100ms), int(hz_avg_1s))
-            self.rpm_last_avg = (hz_avg_100ms * 60, hz_avg_1s * 60)
+    def get_rpm(self):
+        if self.mode != self.MODE_PERIOD:
+            return self.get_rpm_100ms()
+        return int(self.get_hz() * 60)
 
     def get_hz_100ms(self):
-        return int(self.hz_last_avg[0])
+        return self._rate(self.window_counts.last(), self.window_lengths.last(), 1000)
 
     def get_hz_1s(self):
-        return int(self.hz_last_avg[1])
+        return self._rate(self.window_counts.sum(), self.window_lengths.sum(), 1000)
 
     def get_rpm_100ms(self):
-        return int(self.rpm_last_avg[0])
+        return self._rate(self.window_counts.last(), self.window_lengths.last(), 60000)
 
     def get_rpm_1s(self):
-        return int(self.rpm_last_avg[1])
+        return self._rate(self.window_counts.sum(), self.window_lengths.sum(), 60000)
 
     def get_state(self):
         return self.pin.value()
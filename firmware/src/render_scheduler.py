@@ -0,0 +1,117 @@
+import time
+import lvgl as lv
+
+
+class RenderScheduler:
+    """
+    Frame paced LVGL rendering from the UI loop, instead of from a hardware timer.
+
+    Call poll() every UI loop tick. Once frame_ms has passed it advances the LVGL tick by
+    the time that really passed and, only if something was invalidated since the last
+    frame, renders it with lv.refr_now(). Widgets are only changed from the UI loop, so a
+    frame never renders a screen half way through an update, and rendering never
+    interrupts the loop at an unknown point.
+
+    A frame that renders for longer than budget_us counts as over budget and the next one
+    is pushed back by the overshoot, so the loop gets its time back. Frames that come due
+    while the loop is busy elsewhere are dropped, not rendered back to back.
+
+    The UI uses no LVGL animations, timers or input devices, so lv.task_handler() isn't
+    needed. Set run_timers=True if that changes and it'll run once per frame.
+
+    Example:
+
+        renderer = RenderScheduler(frame_ms=33, budget_us=15000)
+        while True:
+            ...  # Update labels
+            renderer.poll()
+        renderer.report()  # Render time, fps and dropped frames, e.g. from the REPL
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = 33,
+        budget_us: int = 15000,
+        display=None,
+        run_timers: bool = False,
+    ):
+        if frame_ms < 1:
+            raise ValueError(f"Frame period must be at least 1ms, got {frame_ms}")
+        self.frame_ms = frame_ms
+        self.budget_us = budget_us
+        self.run_timers = run_timers
+
+        self.display = lv.display_get_default() if display is None else display
+        self.display.add_event_cb(self._on_invalidate, lv.EVENT.INVALIDATE_AREA, None)
+        self.dirty = True
+
+        self._last_tick_ms = time.ticks_ms()
+        self.next_frame_ms = self._last_tick_ms
+        self.reset_stats()
+
+    def _on_invalidate(self, event):
+        self.dirty = True
+
+    def reset_stats(self):
+        self.start_ms = time.ticks_ms()
+        self.frames = 0  # Frames rendered
+        self.idle_frames = 0  # Frames skipped because nothing was invalidated
+        self.dropped = 0  # Frames that came due while the loop was busy
+        self.over_budget = 0
+        self.last_render_us = 0
+        self.max_render_us = 0
+        self.total_render_us = 0
+
+    def poll(self):
+        """Render a frame if one is due and anything changed. Returns True if it rendered."""
+        now = time.ticks_ms()
+        late = time.ticks_diff(now, self.next_frame_ms)
+        if late < 0:
+            return False
+        if late >= self.frame_ms:
+            self.dropped += late // self.frame_ms
+        self.next_frame_ms = time.ticks_add(now, self.frame_ms)
+
+        lv.tick_inc(time.ticks_diff(now, self._last_tick_ms))
+        self._last_tick_ms = now
+        if self.run_timers:
+            lv.task_handler()
+
+        if not self.dirty:
+            self.idle_frames += 1
+            return False
+        # Cleared first so anything invalidated while rendering gets the next frame
+        self.dirty = False
+
+        start = time.ticks_us()
+        lv.refr_now(None)
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+
+        self.frames += 1
+        self.last_render_us = elapsed
+        self.total_render_us += elapsed
+        if elapsed > self.max_render_us:
+            self.max_render_us = elapsed
+        if elapsed > self.budget_us:
+            self.over_budget += 1
+            self.next_frame_ms = time.ticks_add(
+                self.next_frame_ms, (elapsed - self.budget_us) // 1000
+            )
+        return True
+
+    def get_fps(self):
+        """Frames rendered per second since reset_stats()"""
+        elapsed_ms = max(1, time.ticks_diff(time.ticks_ms(), self.start_ms))
+        return self.frames * 1000 / elapsed_ms
+
+    def report(self):
+        """Print the frame rate, render time and dropped frames"""
+        mean = self.total_render_us // self.frames if self.frames else 0
+        print(
+            f"frames {self.frames} ({self.get_fps():.1f} fps), idle {self.idle_frames}, "
+            f"dropped {self.dropped}, over budget {self.over_budget}"
+        )
+        print(
+            f"render us: last {self.last_render_us}, mean {mean}, max {self.max_render_us}, "
+            f"budget {self.budget_us}"
+        )
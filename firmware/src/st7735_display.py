@@ -6,6 +6,13 @@ import st7735
 import lvgl as lv
 
 
+# ST7735 serial write clock cycle is 66ns minimum (datasheet tSCYCW), ~15MHz
+MAX_SPI_FREQ = const(15000000)
+
+MEMORY_INTERNAL = "internal"
+MEMORY_PSRAM = "psram"
+
+
 class ST7735_display:
     """
     MicroPython Driver for the ST7735 TFT LCD Display.
@@ -13,13 +20,18 @@ class ST7735_display:
 
     Assumes the display is on it's own SPI bus, and not shared with other devices.
 
+    LVGL renders into two partial buffers of buffer_lines display lines each, allocated DMA
+    capable in internal RAM (or PSRAM with memory=MEMORY_PSRAM). While one buffer is being
+    sent to the panel by DMA, LVGL renders the next area into the other. The SPI clock is
+    limited to MAX_SPI_FREQ, the fastest the ST7735 datasheet allows for writes.
+
     NOTE: if running init after the display is already initialized, it will not re-initialize the display.
     You'll have to power cycle the unit, or run import machine; machine.reset() to hard reset the micro.
 
     Example:
 
-    display = st7735.ST7735_display()
-    display.demo()
+    display = st7735_display.ST7735_display(buffer_lines=20)
+    display.benchmark()  # Frame times and flush throughput, returns after a few seconds
 
     """
 
@@ -33,9 +45,21 @@ class ST7735_display:
         mosi_pin: int = 11,
         sck_pin: int = 12,
         cs_pin: int = 14,
-        freq: int = 2000000,
+        freq: int = MAX_SPI_FREQ,
+        buffer_lines: int = 16,
+        memory: str = MEMORY_INTERNAL,
     ):
 
+        if freq > MAX_SPI_FREQ:
+            print(
+                f"SPI clock {freq}Hz is above the ST7735 maximum of {MAX_SPI_FREQ}Hz, setting to {MAX_SPI_FREQ}Hz"
+            )
+            freq = MAX_SPI_FREQ
+        if memory not in (MEMORY_INTERNAL, MEMORY_PSRAM):
+            raise ValueError(f"Unknown buffer memory {memory}")
+        if not 1 <= buffer_lines <= max(width, height):
+            raise ValueError(f"Buffer of {buffer_lines} lines doesn't fit the display")
+
         self.width = width
         self.height = height
         self.rst_pin = rst_pin
@@ -45,6 +69,8 @@ class ST7735_display:
         self.sck_pin = sck_pin
         self.cs_pin = cs_pin
         self.freq = freq
+        self.buffer_lines = buffer_lines
+        self.memory = memory
 
         self.offset_x = 1
         self.offset_y = 2
@@ -57,12 +83,24 @@ class ST7735_display:
             spi_bus=self.spi_bus, freq=self.freq, dc=self.dc_pin, cs=self.cs_pin
         )
 
+        # Two partial buffers, RGB565 so 2 bytes a pixel. Lines are along the long side
+        # once rotated, so size them for that.
+        self.buffer_size = max(width, height) * buffer_lines * 2
+        if memory == MEMORY_PSRAM:
+            caps = lcd_bus.MEMORY_SPIRAM | lcd_bus.MEMORY_DMA
+        else:
+            caps = lcd_bus.MEMORY_INTERNAL | lcd_bus.MEMORY_DMA
+        self.frame_buffer1 = self.display_bus.allocate_framebuffer(self.buffer_size, caps)
+        self.frame_buffer2 = self.display_bus.allocate_framebuffer(self.buffer_size, caps)
+
         lv.init()
 
         self.display = st7735.ST7735(
             data_bus=self.display_bus,
             display_width=self.width,
             display_height=self.height,
+            frame_buffer1=self.frame_buffer1,
+            frame_buffer2=self.frame_buffer2,
             reset_pin=self.rst_pin,
             reset_state=st7735.STATE_LOW,
             color_space=lv.COLOR_FORMAT.RGB565,
@@ -75,86 +113,51 @@ class ST7735_display:
         self.display.init(st7735.TYPE_R_GREEN)
         self.display.set_rotation(lv.DISPLAY_ROTATION._90)
 
-    def demo(self):
+    def benchmark(self, frames: int = 20, partial_frames: int = 100):
         """
-        A simple demo to show the display works and can be updated.
-        NOTE: this is a blocking function, and will brick your micro if you don't CTRL + C out of the loop!
-        """
-
-        print(
-            "WARNING: Running demo will block the microcontroller. Press CTRL + C to exit the demo loop."
-        )
-        print("If run a second time without power cycling, text will overlap.")
-        print(
-            "Furthermore, for some reson it'll brick the micro if you don't CTRL + C prior to killing power."
-        )
-
-        scrn = lv.screen_active()
-        scrn.set_style_bg_color(lv.color_hex(0xFF0000), 0)
+        Time full screen and partial redraws on a scratch screen, then put the previous
+        screen back. Runs a fixed number of frames and returns, it doesn't take over the
+        micro like the old demo did. Returns a dict of the results and prints them.
 
+        Run it before the UI starts or from the REPL, LVGL has to be idle while it runs.
+        """
+        previous = lv.screen_active()
+        scrn = lv.obj()
+        scrn.set_style_bg_color(lv.color_hex(0x000000), 0)
         label = lv.label(scrn)
-        label.set_text("HELLO WORLD!")
+        label.set_text("0000")
         label.set_style_text_color(lv.color_hex(0xFFFFFF), 0)
-        label.align(lv.ALIGN.CENTER, 0, 30)
-
-        # Draw a rectangle
-        rect1 = lv.obj(scrn)
-        rect1.set_size(10, 10)
-        rect1.set_style_bg_color(lv.color_hex(0x00AA00), 0)
-        rect1.set_style_border_color(lv.color_hex(0xFFFFFF), 0)
-        rect1.set_style_border_width(1, 0)
-        rect1.set_style_radius(0, 0)
-        rect1.align(lv.ALIGN.TOP_LEFT, 0, 0)
-
-        rect2 = lv.obj(scrn)
-        rect2.set_size(10, 10)
-        rect2.set_style_bg_color(lv.color_hex(0xAA0000), 0)
-        rect2.set_style_border_color(lv.color_hex(0xFFFFFF), 0)
-        rect2.set_style_border_width(1, 0)
-        rect2.set_style_radius(0, 0)
-        rect2.align(lv.ALIGN.TOP_RIGHT, 0, 0)
-
-        rect3 = lv.obj(scrn)
-        rect3.set_size(10, 10)
-        rect3.set_style_bg_color(lv.color_hex(0xAA00AA), 0)
-        rect3.set_style_border_color(lv.color_hex(0xFFFFFF), 0)
-        rect3.set_style_border_width(1, 0)
-        rect3.set_style_radius(0, 0)
-        rect3.align(lv.ALIGN.BOTTOM_RIGHT, 0, 0)
-
-        rect4 = lv.obj(scrn)
-        rect4.set_size(10, 10)
-        rect4.set_style_bg_color(lv.color_hex(0x0000AA), 0)
-        rect4.set_style_border_color(lv.color_hex(0xFFFFFF), 0)
-        rect4.set_style_border_width(1, 0)
-        rect4.set_style_radius(0, 0)
-        rect4.align(lv.ALIGN.BOTTOM_LEFT, 0, 0)
-
-        # Draw a circle
-        circle = lv.obj(scrn)
-        circle.set_size(50, 50)
-        circle.set_style_bg_color(lv.color_hex(0x0000FF), 0)
-        circle.set_style_border_color(lv.color_hex(0xFF00FF), 0)
-        circle.set_style_border_width(3, lv.STATE.DEFAULT)
-        circle.set_style_radius(
-            25, 0
-        )  # Make it circular (radius = half of width/height)
-        circle.align(lv.ALIGN.CENTER, 0, -10)
-
-        lv.task_handler()
-        # Show init text for a few seconds before starting the counter display
-        time.sleep_ms(10000)
-
-        time_passed = 1000
-        counter = 0
-
-        while True:
-            start_time = time.ticks_ms()
-            time.sleep_ms(1)  # sleep for 1 ms
-            lv.tick_inc(time_passed)
-            lv.task_handler()
-
-            end_time = time.ticks_ms()
-            time_passed = time.ticks_diff(end_time, start_time)
-            counter = counter + 1
-            label.set_text(str(counter / 1000))
+        label.align(lv.ALIGN.CENTER, 0, 0)
+        lv.screen_load(scrn)
+        lv.refr_now(None)
+
+        # Full screen, alternate the background so every pixel really changes
+        start = time.ticks_us()
+        for i in range(frames):
+            scrn.set_style_bg_color(lv.color_hex(0xFF0000 if i & 1 else 0x0000FF), 0)
+            lv.refr_now(None)
+        full_us = time.ticks_diff(time.ticks_us(), start) / frames
+
+        # Partial, a label like the live readouts
+        start = time.ticks_us()
+        for i in range(partial_frames):
+            label.set_text(str(i % 10000))
+            lv.refr_now(None)
+        partial_us = time.ticks_diff(time.ticks_us(), start) / partial_frames
+
+        lv.screen_load(previous)
+        scrn.delete()
+        lv.refr_now(None)
+
+        full_bytes = self.width * self.height * 2
+        result = {
+            "full_frame_us": full_us,
+            "full_fps": 1000000 / full_us if full_us else 0,
+            "partial_frame_us": partial_us,
+            "partial_fps": 1000000 / partial_us if partial_us else 0,
+            "flush_bytes_per_s": full_bytes * 1000000 / full_us if full_us else 0,
+            "spi_bytes_per_s": self.freq / 8,
+        }
+        for key, value in result.items():
+            print(f"{key:<20}{value:12.1f}")
+        return result
@@ -0,0 +1,217 @@
+import array
+
+
+class Window:
+    """
+    Sliding window statistics over the last `size` samples.
+
+    Samples live in an array ring buffer with a running sum and sum of squares, and min / max
+    are tracked with monotonic queues of ring positions, so add() and every query are O(1)
+    (min / max amortised) and nothing is allocated per sample with integer samples.
+
+    Integer windows ("l", "i", "h") keep exact sums, keep samples within 2**15 / sqrt(size)
+    so the sum of squares stays a small int on MicroPython. Float windows ("f") recompute
+    their sums from the buffer each time the ring wraps so rounding error can't build up.
+
+    Example:
+
+        current = Window(10)  # Last 10 samples, ints
+        current.add(512)
+        current.mean()
+        current.min(), current.max()
+        current.variance()
+    """
+
+    def __init__(self, size: int, typecode: str = "l"):
+        if size < 1:
+            raise ValueError(f"Window size must be at least 1, got {size}")
+        self.size = size
+        self.typecode = typecode
+        self.is_float = typecode in ("f", "d")
+        self.buf = array.array(typecode, [0] * size)
+        # Ring positions of the min / max candidates, oldest first
+        self._min_q = array.array("H", [0] * size)
+        self._max_q = array.array("H", [0] * size)
+        self.reset()
+
+    def reset(self):
+        self.head = 0  # Next position to write
+        self.count = 0
+        self.total = 0.0 if self.is_float else 0
+        self.total_sq = 0.0 if self.is_float else 0
+        self._min_start = 0
+        self._min_len = 0
+        self._max_start = 0
+        self._max_len = 0
+
+    def __len__(self):
+        return self.count
+
+    def full(self):
+        return self.count == self.size
+
+    def add(self, x):
+        buf = self.buf
+        head = self.head
+        size = self.size
+
+        if self.count == size:
+            old = buf[head]
+            self.total -= old
+            self.total_sq -= old * old
+            # The sample being overwritten drops out of the min / max queues
+            if self._min_len and self._min_q[self._min_start] == head:
+                self._min_start = (self._min_start + 1) % size
+                self._min_len -= 1
+            if self._max_len and self._max_q[self._max_start] == head:
+                self._max_start = (self._max_start + 1) % size
+                self._max_len -= 1
+        else:
+            self.count += 1
+
+        buf[head] = x
+        x = buf[head]  # Whatever the array stored, e.g. float32 rounding
+        self.total += x
+        self.total_sq += x * x
+
+        # Drop candidates the new sample beats, they can never be the min / max again
+        q = self._min_q
+        n = self._min_len
+        while n and buf[q[(self._min_start + n - 1) % size]] >= x:
+            n -= 1
+        q[(self._min_start + n) % size] = head
+        self._min_len = n + 1
+
+        q = self._max_q
+        n = self._max_len
+        while n and buf[q[(self._max_start + n - 1) % size]] <= x:
+            n -= 1
+        q[(self._max_start + n) % size] = head
+        self._max_len = n + 1
+
+        head += 1
+        if head == size:
+            head = 0
+            if self.is_float:
+                self._resync()
+        self.head = head
+
+    def _resync(self):
+        total = 0.0
+        total_sq = 0.0
+        for v in self.buf:
+            total += v
+            total_sq += v * v
+        self.total = total
+        self.total_sq = total_sq
+
+    def last(self):
+        """Most recent sample, 0 if empty"""
+        if not self.count:
+            return 0
+        return self.buf[(self.head - 1) % self.size]
+
+    def sum(self):
+        return self.total
+
+    def mean(self):
+        """Mean of the samples in the window, 0 if empty"""
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def mean_int(self):
+        """Mean rounded to an int, 0 if empty. No float is made on integer windows."""
+        if not self.count:
+            return 0
+        if self.is_float:
+            return round(self.total / self.count)
+        return (self.total + self.count // 2) // self.count
+
+    def min(self):
+        if not self._min_len:
+            return 0
+        return self.buf[self._min_q[self._min_start]]
+
+    def max(self):
+        if not self._max_len:
+            return 0
+        return self.buf[self._max_q[self._max_start]]
+
+    def variance(self):
+        """Population variance of the samples in the window, 0 if fewer than 2"""
+        n = self.count
+        if n < 2:
+            return 0.0
+        mean = self.total / n
+        return max(0.0, self.total_sq / n - mean * mean)
+
+    def std(self):
+        return self.variance() ** 0.5
+
+
+class Cascade:
+    """
+    Multi-resolution windows. Level 0 slides over the raw samples, and every time level i has
+    taken in a fresh block of sizes[i] samples, the mean of that block is added to level i+1.
+    So Cascade(10, 10) fed every 10ms holds the last 100ms of samples and the means of the
+    last ten complete 100ms blocks, i.e. a 1s window, without keeping 100 samples. Integer
+    cascades pass block means down rounded to ints.
+
+    Example:
+
+        current = Cascade(10, 10)  # 10ms samples -> 100ms and 1s windows
+        current.add(512)
+        current.mean(0)  # Last 100ms
+        current.mean(1)  # Last 1s, the 100ms mean until the first block completes
+        current.levels[1].max()  # Highest 100ms mean in the last 1s
+    """
+
+    def __init__(self, *sizes, typecode: str = "l"):
+        if not sizes:
+            raise ValueError("Cascade needs at least one window size")
+        self.levels = [Window(n, typecode) for n in sizes]
+        self._fill = array.array("H", [0] * len(sizes))
+
+    def reset(self):
+        for i, level in enumerate(self.levels):
+            level.reset()
+            self._fill[i] = 0
+
+    def add(self, x):
+        levels = self.levels
+        fill = self._fill
+        last = len(levels) - 1
+        i = 0
+        while True:
+            level = levels[i]
+            level.add(x)
+            if i == last:
+                return
+            fill[i] += 1
+            if fill[i] < level.size:
+                return
+            fill[i] = 0
+            if level.is_float:
+                x = level.total / level.size
+            else:
+                x = (level.total + level.size // 2) // level.size
+            i += 1
+
+    def mean(self, level: int = 0):
+        """
+        Mean of the given level, or of the finest level that has data yet so a coarse average
+        is available from the first sample
+        """
+        while level and not self.levels[level].count:
+            level -= 1
+        return self.levels[level].mean()
+
+    def mean_int(self, level: int = 0):
+        """mean() rounded to an int"""
+        while level and not self.levels[level].count:
+            level -= 1
+        return self.levels[level].mean_int()
+
+    def last(self):
+        return self.levels[0].last()
@@ -0,0 +1,221 @@
+import os
+import struct
+import time
+
+# File layout, all little endian:
+#   header  HEADER_FORMAT: magic, version, header_size, record_size, period_ms
+#           u8 length + struct format of a record
+#           u16 length + comma separated field names
+#   records record_size bytes each, until the end of the file
+MAGIC = b"M4TL"
+VERSION = 1
+HEADER_FORMAT = "<4sHHHH"
+
+# Record fields, scaled to ints. Flags bit 0 is over temperature, bit 1 in transition,
+# bit 2 tripped on over-current and bit 3 on a stall, latched until acknowledged.
+# rpm is the 100ms gated rate, edges the RPM sensor's running edge count mod 2^16, so
+# a reader can take the speed over any span of records, centred and without the gate's
+# lag. 18 byte records, so the default block is 128 of them.
+RECORD_FORMAT = "<IHHhHhBBH"
+RECORD_FIELDS = (
+    "t_ms",
+    "set_mv",
+    "bus_mv",
+    "current_ma",
+    "rpm",
+    "temp_c_x100",
+    "direction",
+    "flags",
+    "edges",
+)
+FLAG_OVER_TEMP = 0x01
+FLAG_TRANSITION = 0x02
+FLAG_OVER_CURRENT = 0x04
+FLAG_STALL = 0x08
+
+
+class TelemetryLogger:
+    """
+    Binary motor telemetry log, fixed size records in a RAM ring flushed to flash in blocks.
+
+    sample() packs one record of the motor's latest readings into a preallocated ring with
+    struct.pack_into, it allocates nothing and is cheap enough for the executive's 10ms
+    group. flush() writes whole blocks of block_size bytes from the ring to the log file
+    and runs from the UI's idle points, so flash writes never hold up the executive.
+
+    If flush() falls behind and the ring fills, new records are dropped and counted. On a
+    power cut at most the records still in the ring are lost, every block written is
+    flushed to the filesystem straight away.
+
+    Each run goes to a new file in directory, run_0001.bin and up, starting with a header
+    describing the record format and field names. See RECORD_FORMAT / RECORD_FIELDS.
+
+    Example:
+
+        telemetry = TelemetryLogger(motor)
+        # In the 10ms rate group: telemetry.sample()
+        telemetry.start()  # Motor run starts
+        telemetry.flush()  # From an idle point
+        telemetry.stop()  # Writes what's left and closes the file
+    """
+
+    def __init__(
+        self,
+        motor,
+        directory: str = "/logs",
+        period_ms: int = 10,
+        block_size: int = 2304,  # 128 records
+        blocks: int = 4,
+    ):
+        self.motor = motor
+        self.directory = directory
+        self.period_ms = period_ms
+        self.record_size = struct.calcsize(RECORD_FORMAT)
+        if block_size % self.record_size:
+            raise ValueError(
+                f"Block size {block_size} isn't a whole number of {self.record_size} byte records"
+            )
+        if blocks < 2:
+            raise ValueError("Need at least 2 blocks, one filling while one is written")
+        self.block_records = block_size // self.record_size
+        self.capacity = self.block_records * blocks
+        self.ring = bytearray(self.capacity * self.record_size)
+        self.ring_mv = memoryview(self.ring)
+
+        self.running = False
+        self.file = None
+        self.path = None
+        self.start_ms = time.ticks_ms()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.written = 0  # Records put in the ring since start()
+        self.flushed = 0  # Records written to the file since start()
+        self.dropped = 0  # Records lost to a full ring
+        self.bytes_written = 0
+        self.last_flush_us = 0
+        self.max_flush_us = 0
+
+    # ── Run control ───────────────────────────────────────────────────
+
+    def _next_path(self):
+        try:
+            os.mkdir(self.directory)
+        except OSError:
+            pass  # Already there
+        last = 0
+        for name in os.listdir(self.directory):
+            if name.startswith("run_") and name.endswith(".bin"):
+                try:
+                    last = max(last, int(name[4:-4]))
+                except ValueError:
+                    pass
+        return f"{self.directory}/run_{last + 1:04d}.bin"
+
+    def _header(self):
+        fmt = RECORD_FORMAT.encode()
+        names = ",".join(RECORD_FIELDS).encode()
+        size = struct.calcsize(HEADER_FORMAT) + 1 + len(fmt) + 2 + len(names)
+        return (
+            struct.pack(
+                HEADER_FORMAT, MAGIC, VERSION, size, self.record_size, self.period_ms
+            )
+            + struct.pack("<B", len(fmt))
+            + fmt
+            + struct.pack("<H", len(names))
+            + names
+        )
+
+    def start(self, path: str = None):
+        """Open a new log file and start recording, returns its path"""
+        if self.running:
+            self.stop()
+        self.path = self._next_path() if path is None else path
+        self.file = open(self.path, "wb")
+        header = self._header()
+        self.file.write(header)
+        self.file.flush()
+        self.reset_stats()
+        self.bytes_written = len(header)
+        self.start_ms = time.ticks_ms()
+        self.running = True
+        return self.path
+
+    def stop(self):
+        """Stop recording, write out everything left in the ring and close the file"""
+        self.running = False
+        if self.file is None:
+            return
+        while self.flush(force=True):
+            pass
+        self.file.close()
+        self.file = None
+
+    # ── Below is called from the executive ─────────────────────────────
+
+    def sample(self):
+        """Put a record of the latest readings in the ring, dropped if the ring is full"""
+        if not self.running:
+            return
+        if self.written - self.flushed >= self.capacity:
+            self.dropped += 1
+            return
+        motor = self.motor
+        flags = 0
+        if motor.is_over_temp():
+            flags |= FLAG_OVER_TEMP
+        if motor.in_transition():
+            flags |= FLAG_TRANSITION
+        flags |= motor.trip_reason << 2  # TRIP_* to FLAG_OVER_CURRENT / FLAG_STALL
+        struct.pack_into(
+            RECORD_FORMAT,
+            self.ring,
+            (self.written % self.capacity) * self.record_size,
+            time.ticks_diff(time.ticks_ms(), self.start_ms),
+            motor.voltage_mv,
+            motor.get_voltage_mv(),
+            motor.get_current_ma(),
+            motor.get_rpm_100ms(),
+            motor.get_temp_x100(),
+            motor.motor_direction,
+            flags,
+            motor.rpm.get_count() & 0xFFFF,
+        )
+        self.written += 1
+
+    # ── Below is called from idle points ──────────────────────────────
+
+    def flush(self, force: bool = False):
+        """
+        Write one block from the ring to the file if a whole block is waiting, or whatever
+        is waiting with force. Returns the number of records written.
+        """
+        if self.file is None:
+            return 0
+        pending = self.written - self.flushed
+        if not pending or (pending < self.block_records and not force):
+            return 0
+        first = self.flushed % self.capacity
+        # Blocks are aligned to the ring so one never wraps, only a forced tail can
+        n = min(pending, self.block_records, self.capacity - first)
+
+        start = time.ticks_us()
+        size = self.record_size
+        self.file.write(self.ring_mv[first * size : (first + n) * size])
+        self.file.flush()
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+
+        self.flushed += n
+        self.bytes_written += n * size
+        self.last_flush_us = elapsed
+        if elapsed > self.max_flush_us:
+            self.max_flush_us = elapsed
+        return n
+
+    def report(self):
+        """Print the records logged, dropped and the flash write times"""
+        print(
+            f"{self.path}: {self.written} records, {self.flushed} written, "
+            f"{self.dropped} dropped, {self.bytes_written} bytes"
+        )
+        print(f"flush us: last {self.last_flush_us}, max {self.max_flush_us}")
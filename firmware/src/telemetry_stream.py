@@ -0,0 +1,194 @@
+import array
+import struct
+import sys
+import time
+
+# Frame: SYNC, u8 payload length, payload, u16 CRC-16/CCITT-FALSE of length + payload.
+# All little endian. tools/telemetry_decode.py reads these on the host.
+SYNC = b"\xa5\x5a"
+PAYLOAD_FORMAT = "<IHHhHHhB"
+PAYLOAD_FIELDS = (
+    "ticks_us",
+    "target_mv",
+    "measured_mv",
+    "current_ma",
+    "motor_rpm",
+    "wheel_rpm",
+    "temp_c_x100",
+    "state",
+)
+PAYLOAD_SIZE = struct.calcsize(PAYLOAD_FORMAT)
+FRAME_SIZE = len(SYNC) + 1 + PAYLOAD_SIZE + 2
+
+# state byte: bits 0-1 motor direction (MotorControl.MOTOR_*), bits 2-3 the latched
+# MotorControl.TRIP_* reason, as in the flash log's flags, then flags
+STATE_DIRECTION_MASK = 0x03
+STATE_TRIP_SHIFT = 2
+STATE_TRIP_MASK = 0x0C
+STATE_OVER_CURRENT = 0x04
+STATE_STALL = 0x08
+STATE_OVER_TEMP = 0x10
+STATE_TRANSITION = 0x20
+
+
+def _crc_table():
+    table = array.array("H", [0] * 256)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table[i] = crc & 0xFFFF
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data, start: int = 0, end: int = None, crc: int = 0xFFFF):
+    """CRC-16/CCITT-FALSE of data[start:end], the same as binascii.crc_hqx(data, 0xFFFF)"""
+    table = _CRC_TABLE
+    if end is None:
+        end = len(data)
+    for i in range(start, end):
+        crc = ((crc << 8) & 0xFF00) ^ table[(crc >> 8) ^ data[i]]
+    return crc
+
+
+class TelemetryStream:
+    """
+    Framed binary telemetry over the USB serial port, for logging on a host at full rate.
+
+    sample() runs from the executive and, every period_ms while started, packs a frame of
+    the latest readings into a preallocated ring. pump() writes the waiting frames to the
+    port from the UI's idle points, so a slow or absent host never blocks the executive.
+    Frames only leave the ring once the port has taken them, a short write keeps the rest
+    of the frame for the next pump(). If the ring fills, new frames are dropped and
+    counted.
+
+    Each frame is length prefixed and CRC checked, so the host decoder can resynchronise
+    past anything else on the port, e.g. print output from the firmware.
+
+    Example:
+
+        stream = TelemetryStream(motor, wheel_sensor, period_ms=10)
+        # In the 10ms rate group: stream.sample(), at idle points: stream.pump()
+        stream.start()  # From the REPL, then on the host:
+        # python firmware/tools/telemetry_decode.py /dev/ttyACM0 --csv run.csv
+    """
+
+    def __init__(
+        self, motor, wheel_sensor, out=None, period_ms: int = 10, frames: int = 64
+    ):
+        self.motor = motor
+        self.wheel_sensor = wheel_sensor
+        self.out = sys.stdout.buffer if out is None else out
+        self.set_rate(period_ms)
+
+        self.capacity = frames
+        self.ring = bytearray(FRAME_SIZE * frames)
+        self.ring_mv = memoryview(self.ring)
+        for i in range(frames):
+            # The sync and length never change
+            offset = i * FRAME_SIZE
+            self.ring[offset : offset + 2] = SYNC
+            self.ring[offset + 2] = PAYLOAD_SIZE
+
+        self.running = False
+        self.next_sample_ms = time.ticks_ms()
+        self.reset_stats()
+
+    def set_rate(self, period_ms: int):
+        """One frame every period_ms, no faster than sample() is called"""
+        if period_ms < 1:
+            raise ValueError(f"Stream period must be at least 1ms, got {period_ms}")
+        self.period_ms = period_ms
+
+    def reset_stats(self):
+        self.written = 0  # Frames put in the ring
+        self.sent = 0  # Frames written to the port
+        self.dropped = 0  # Frames not put in the ring, it was full
+        self._partial = 0  # Bytes of frame `sent` already written
+
+    def start(self):
+        self.reset_stats()
+        self.next_sample_ms = time.ticks_ms()
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    # ── Below is called from the executive ─────────────────────────────
+
+    def sample(self):
+        if not self.running:
+            return
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.next_sample_ms) < 0:
+            return
+        self.next_sample_ms = time.ticks_add(self.next_sample_ms, self.period_ms)
+        if time.ticks_diff(now, self.next_sample_ms) >= 0:
+            self.next_sample_ms = time.ticks_add(now, self.period_ms)  # Fell behind
+        if self.written - self.sent >= self.capacity:
+            self.dropped += 1
+            return
+
+        motor = self.motor
+        state = motor.motor_direction & STATE_DIRECTION_MASK
+        state |= motor.trip_reason << STATE_TRIP_SHIFT  # STATE_OVER_CURRENT / STALL
+        if motor.is_over_temp():
+            state |= STATE_OVER_TEMP
+        if motor.in_transition():
+            state |= STATE_TRANSITION
+        offset = (self.written % self.capacity) * FRAME_SIZE
+        struct.pack_into(
+            PAYLOAD_FORMAT,
+            self.ring,
+            offset + 3,
+            time.ticks_us() & 0xFFFFFFFF,
+            motor.target_voltage_mv,
+            motor.get_voltage_mv(),
+            motor.get_current_ma(),
+            motor.get_rpm_100ms(),
+            self.wheel_sensor.get_rpm_100ms(),
+            motor.get_temp_x100(),
+            state,
+        )
+        end = offset + 3 + PAYLOAD_SIZE
+        crc = crc16(self.ring, offset + 2, end)
+        self.ring[end] = crc & 0xFF
+        self.ring[end + 1] = crc >> 8
+        self.written += 1
+
+    # ── Below is called from idle points ──────────────────────────────
+
+    def pump(self):
+        """
+        Write the waiting frames the port will take, returns the number of whole frames
+        written. Stops at a short write, e.g. a full USB buffer or no host, None counts as
+        nothing written.
+        """
+        total = 0
+        while True:
+            pending = self.written - self.sent
+            if not pending:
+                return total
+            first = self.sent % self.capacity
+            n = min(pending, self.capacity - first)
+            start = first * FRAME_SIZE + self._partial
+            end = (first + n) * FRAME_SIZE
+            done = self.out.write(self.ring_mv[start:end]) or 0
+            done += self._partial
+            frames = done // FRAME_SIZE
+            self._partial = done - frames * FRAME_SIZE
+            self.sent += frames
+            total += frames
+            if frames < n:
+                return total
+
+    def report(self):
+        """Print the frames sampled, sent, still waiting and dropped"""
+        print(
+            f"stream: {self.written} frames, {self.sent} sent, "
+            f"{self.written - self.sent} waiting, {self.dropped} dropped, "
+            f"{FRAME_SIZE} bytes each every {self.period_ms}ms"
+        )
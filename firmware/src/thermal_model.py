@@ -0,0 +1,144 @@
+import math
+
+
+class ThermalModel:
+    """
+    First order thermal model of the motor can, fitted online from the temperature and
+    current readings.
+
+    The can heats with the winding loss and cools towards ambient:
+
+        dT/dt = a * I^2 - b * (T - T_ambient)
+
+    sample() is fed the latest temperature and current every 100ms or so. The current
+    squared is averaged over each interval_ms and the temperature change across the
+    interval is fitted to the two terms by least squares, with older intervals fading by
+    `forget` each time so the fit follows the motor as it beds in. Long intervals keep the
+    sensor's 0.0625C steps small against the change being fitted. The fit is only used
+    once it has min_intervals and both kinds of interval, heating and cooling, so a and b
+    aren't confused with each other.
+
+    Ambient is the first temperature seen, unless given. After a reset part way through a
+    program that's the warm motor, so the model expects it to cool less than it does and
+    errs on the safe side.
+
+    Example:
+
+        model = ThermalModel(limit_c=TEMP_LIM_DEFAULT_C)
+        model.sample(motor.get_temp(), motor.get_current_100ms_ma())  # Every 100ms
+        if model.fitted():
+            model.peak_c(motor.get_temp(), 450, 60000)  # Hottest over a 60s run at 450mA
+            model.time_constant_s()
+    """
+
+    def __init__(
+        self,
+        limit_c: float = 40,
+        margin_c: float = 1,
+        interval_ms: int = 5000,
+        sample_ms: int = 100,
+        forget: float = 0.99,
+        min_intervals: int = 12,
+        ambient_c: float = None,
+    ):
+        if interval_ms < sample_ms:
+            raise ValueError(
+                f"Thermal model interval {interval_ms}ms is shorter than a sample"
+            )
+        self.limit_c = limit_c
+        self.margin_c = margin_c
+        self.interval_ms = interval_ms
+        self.sample_ms = sample_ms
+        self.forget = forget
+        self.min_intervals = min_intervals
+        self.fixed_ambient_c = ambient_c
+        self.reset()
+
+    def reset(self):
+        """Forget the fit, e.g. for a different motor"""
+        self.ambient_c = self.fixed_ambient_c
+        self.a = 0.0  # C/s per A^2
+        self.b = 0.0  # 1/s, the inverse of the time constant
+        self.intervals = 0
+        self._heating = 0  # Intervals with current, and without
+        self._cooling = 0
+        self._start_c = None
+        self._sum_i2 = 0.0
+        self._samples = 0
+        # Least squares sums, x1 = mean I^2, x2 = T - ambient, y = dT/dt
+        self._s11 = self._s12 = self._s22 = self._s1y = self._s2y = 0.0
+
+    def fitted(self):
+        return (
+            self.intervals >= self.min_intervals
+            and self._heating
+            and self._cooling
+            and self.a > 0
+            and self.b > 0
+        )
+
+    def time_constant_s(self):
+        return 1 / self.b if self.b > 0 else 0
+
+    # ── Fitting ───────────────────────────────────────────────────────
+
+    def sample(self, temp_c: float, current_ma: int):
+        """Add a reading, every sample_ms. Returns True when an interval was fitted."""
+        if self.ambient_c is None:
+            self.ambient_c = temp_c
+        if self._start_c is None:
+            self._start_c = temp_c
+            return False
+        amps = max(0, current_ma) / 1000
+        self._sum_i2 += amps * amps
+        self._samples += 1
+        if self._samples * self.sample_ms < self.interval_ms:
+            return False
+
+        x1 = self._sum_i2 / self._samples
+        x2 = self._start_c - self.ambient_c
+        y = (temp_c - self._start_c) * 1000 / self.interval_ms
+        self._start_c = temp_c
+        self._sum_i2 = 0.0
+        self._samples = 0
+
+        k = self.forget
+        self._s11 = self._s11 * k + x1 * x1
+        self._s12 = self._s12 * k + x1 * x2
+        self._s22 = self._s22 * k + x2 * x2
+        self._s1y = self._s1y * k + x1 * y
+        self._s2y = self._s2y * k + x2 * y
+        self.intervals += 1
+        if x1 > 0.001:  # Above ~30mA
+            self._heating += 1
+        elif x2 > 0.5:
+            self._cooling += 1
+        self._solve()
+        return True
+
+    def _solve(self):
+        det = self._s11 * self._s22 - self._s12 * self._s12
+        # Heating and cooling intervals that look alike can't separate a from b
+        if det <= 0.01 * self._s11 * self._s22:
+            return
+        self.a = (self._s22 * self._s1y - self._s12 * self._s2y) / det
+        self.b = -(self._s11 * self._s2y - self._s12 * self._s1y) / det
+
+    # ── Prediction ────────────────────────────────────────────────────
+
+    def predict_c(self, start_c: float, current_ma: int, duration_ms: int):
+        """Temperature after duration_ms at a steady current, starting from start_c"""
+        amps = max(0, current_ma) / 1000
+        settle_c = self.ambient_c + self.a * amps * amps / self.b
+        return settle_c + (start_c - settle_c) * math.exp(-self.b * duration_ms / 1000)
+
+    def peak_c(self, start_c: float, current_ma: int, duration_ms: int):
+        """Hottest the motor gets over duration_ms, a first order curve peaks at an end"""
+        return max(start_c, self.predict_c(start_c, current_ma, duration_ms))
+
+    def safe(self, start_c: float, current_ma: int, duration_ms: int):
+        """True if the motor stays margin_c under the limit running from start_c"""
+        return (
+            self.peak_c(start_c, current_ma, duration_ms)
+            <= self.limit_c - self.margin_c
+        )
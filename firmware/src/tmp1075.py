@@ -1,6 +1,6 @@
 # Thanks to Matt Trentini: https://github.com/mattytrentini/micropython-tmp1075
 
-from machine import I2C
+from machine import I2C, Pin
 from micropython import const
 
 
@@ -14,6 +14,13 @@ class TMP1075:
         tmp1075 = TMP1075(i2c, addr=0x48)
         tmp1075.get_temperature()
 
+        tmp1075 = TMP1075(i2c, addr=0x48, oneshot=True, alert_pin=3)
+        tmp1075.set_limits(35, 40)  # ALERT asserts above 40C, releases below 35C
+        tmp1075.start_conversion()  # Shut down between one-shot conversions
+        time.sleep_us(tmp1075.CONVERSION_TIME_US)
+        tmp1075.get_temperature()
+        tmp1075.alert  # Updated by the ALERT pin interrupt, no I2C needed
+
     See datasheet: http://www.ti.com/lit/ds/symlink/tmp1075.pdf
 
     """
@@ -24,11 +31,53 @@ class TMP1075:
     REG_HLIM = const(0x03)
     REG_DIEID = const(0x0F)
 
-    def __init__(self, i2c=I2C, addr: int = None):
+    # Config lives in the upper byte, the lower byte is reserved and reads 0xFF
+    CONFIG_OS = const(0x8000)  # One-shot conversion start in shutdown mode
+    CONFIG_RATE_27_5MS = const(0x0000)
+    CONFIG_RATE_55MS = const(0x2000)
+    CONFIG_RATE_110MS = const(0x4000)
+    CONFIG_RATE_220MS = const(0x6000)
+    CONFIG_FAULTS_1 = const(0x0000)  # Consecutive faults before ALERT asserts
+    CONFIG_FAULTS_2 = const(0x0800)
+    CONFIG_FAULTS_4 = const(0x1000)
+    CONFIG_FAULTS_6 = const(0x1800)
+    CONFIG_POL = const(0x0400)  # ALERT active high
+    CONFIG_TM = const(0x0200)  # Interrupt mode, comparator mode if clear
+    CONFIG_SD = const(0x0100)  # Shutdown, conversions only on CONFIG_OS
+
+    CONVERSION_TIME_US = 5500  # One-shot conversion, before the result can be read
+
+    def __init__(
+        self,
+        i2c=I2C,
+        addr: int = None,
+        oneshot: bool = False,
+        alert_pin: int = None,
+        faults: int = CONFIG_FAULTS_1,
+    ):
         self.i2c = i2c
         self.addr = addr
+        self.buf = bytearray(2)
         self._check_device()
 
+        # ALERT in comparator mode: asserts once the temperature reaches HLIM and releases
+        # when it drops below LLIM, so the pin level is the over-temperature state
+        self.oneshot = oneshot
+        self.config = faults | self.CONFIG_RATE_220MS
+        if oneshot:
+            self.config |= self.CONFIG_SD
+        self._write_register(self.REG_CONFIG, self.config)
+
+        self.alert = False
+        self.alert_pin = None
+        if alert_pin is not None:
+            # Open drain, active low
+            self.alert_pin = Pin(alert_pin, Pin.IN, Pin.PULL_UP)
+            self.alert_pin.irq(
+                trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._on_alert
+            )
+            self.alert = self.alert_pin.value() == 0
+
     def _check_device(self):
         """Check comms, DIE ID should always be 0x7500"""
         id = self.i2c.readfrom_mem(self.addr, self.REG_DIEID, 2)
@@ -37,11 +86,43 @@ class TMP1075:
                 f"Incorrect DIE ID (got {hex((id[0] << 8) + id[1])}, expected 0x7500) or bad I2C comms"
             )
 
+    def _write_register(self, reg, value):
+        self.buf[0] = (value >> 8) & 0xFF
+        self.buf[1] = value & 0xFF
+        self.i2c.writeto_mem(self.addr, reg, self.buf)
+
+    @staticmethod
+    def _to_raw(temp_c):
+        """Degrees Celsius to the 12-bit left-justified register format"""
+        return (int(temp_c / 0.0625) << 4) & 0xFFF0
+
+    # Below is called every ISR
+    def _on_alert(self, pin):
+        self.alert = pin.value() == 0
+
+    def set_limits(self, low_c: float, high_c: float):
+        """
+        Program the ALERT thresholds. ALERT asserts once a conversion reads high_c or more
+        and releases when one reads below low_c.
+        """
+        if low_c >= high_c:
+            raise ValueError(f"Low limit {low_c}C must be below high limit {high_c}C")
+        self._write_register(self.REG_LLIM, self._to_raw(low_c))
+        self._write_register(self.REG_HLIM, self._to_raw(high_c))
+
+    def start_conversion(self):
+        """
+        Start a one-shot conversion in shutdown mode, the result is ready to read after
+        CONVERSION_TIME_US. Does nothing in continuous mode.
+        """
+        if self.oneshot:
+            self._write_register(self.REG_CONFIG, self.config | self.CONFIG_OS)
+
     def get_temperature(self):
         """Get current temperature in degrees Celsius"""
-        data = self.i2c.readfrom_mem(self.addr, self.REG_TEMP, 2)
+        self.i2c.readfrom_mem_into(self.addr, self.REG_TEMP, self.buf)
         # 12-bit resolution, left-justified in 16 bits
-        raw = (data[0] << 8) | data[1]
+        raw = (self.buf[0] << 8) | self.buf[1]
         raw = raw >> 4
         # Handle negative temperatures
         if raw & 0x800:
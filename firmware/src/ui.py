@@ -5,18 +5,13 @@ from ui_common import (
     DISP_WIDTH,
     DISP_HEIGHT,
     MARGIN,
-    COL_BCKGND,
-    COL_TILE,
-    COL_BORDER,
-    COL_TEXT,
-    COL_SEL_TEXT,
-    COL_MANUAL,
-    COL_BREAK_IN,
-    COL_SPEED_TEST,
-    COL_SETTINGS,
+    TILE_NORMAL,
+    TILE_SELECTED,
 )
+from ui_breakin import BreakInScreen
 from ui_manual import ManualScreen
 from ui_speed import SpeedScreen
+from ui_sweep import SweepScreen
 
 
 class UI(UIBase):
@@ -28,68 +23,47 @@ class UI(UIBase):
     Example:
         import st7735_display, ui
         display = st7735_display.ST7735()
-        app = ui.UI(display)
+        app = ui.UI(display, gc_manager, renderer, telemetry, stream)  # All optional
         app.show_menu(motor, rotary, enc_btn, wheel_sensor)
     """
 
-    def __init__(self, display):
-        super().__init__(display)
-        self._manual = ManualScreen(display)
-        self._speed = SpeedScreen(display)
+    def __init__(
+        self, display, gc_manager=None, renderer=None, telemetry=None, stream=None
+    ):
+        super().__init__(display, gc_manager, renderer, telemetry, stream)
+        self._manual = ManualScreen(display, gc_manager, renderer, telemetry, stream)
+        self._breakin = BreakInScreen(display, gc_manager, renderer, telemetry, stream)
+        self._speed = SpeedScreen(display, gc_manager, renderer, telemetry, stream)
+        self._sweep = SweepScreen(display, gc_manager, renderer, telemetry, stream)
         self._cursor_index = 0
+        self._menu_scrn = None
+        self._menu_tiles = None
+
+    # Selected colours are in Styles.page_selected, keyed by name
+    MENU_ITEMS = [
+        ("Manual", lv.SYMBOL.PLAY),
+        ("Break-in", lv.SYMBOL.REFRESH),
+        ("Speed Test", lv.SYMBOL.CHARGE),
+        ("Sweep", lv.SYMBOL.LIST),
+        ("Settings", lv.SYMBOL.SETTINGS),
+    ]
 
     def show_menu(self, motor, rotary, enc_btn, wheel_sensor):
         """
-        Main menu — 2×2 grid
+        Main menu — 2 column grid
         [Manual]     [Break-in]
-        [Speed Test] [Settings]
+        [Speed Test] [Sweep]
+        [Settings]
         """
 
-        MENU_ITEMS = [
-            ("Manual", lv.SYMBOL.PLAY, COL_MANUAL),
-            ("Break-in", lv.SYMBOL.REFRESH, COL_BREAK_IN),
-            ("Speed Test", lv.SYMBOL.CHARGE, COL_SPEED_TEST),
-            ("Settings", lv.SYMBOL.SETTINGS, COL_SETTINGS),
-        ]
-
-        TILE_W = int((DISP_WIDTH - 2 * MARGIN - MARGIN) // 2)
-        TILE_H = int((DISP_HEIGHT - 2 * MARGIN - MARGIN) // 2)
+        MENU_ITEMS = self.MENU_ITEMS
 
         while True:
-            self._clear_screen()
-            scrn = lv.screen_active()
-            scrn.set_style_bg_color(COL_BCKGND, 0)
-
-            tiles, tile_syms, tile_lbls = [], [], []
-
-            for idx, (name, symbol, _) in enumerate(MENU_ITEMS):
-                col = idx % 2
-                row = idx // 2
-                tx = MARGIN + col * (TILE_W + MARGIN)
-                ty = MARGIN + row * (TILE_H + MARGIN)
-
-                tile = lv.obj(scrn)
-                tile.set_size(TILE_W, TILE_H)
-                tile.set_pos(tx, ty)
-                tile.set_style_bg_color(COL_TILE, 0)
-                tile.set_style_border_color(COL_BORDER, 0)
-                tile.set_style_border_width(1, 0)
-                tile.set_style_radius(3, 0)
-                tile.set_style_pad_all(0, 0)
-                tiles.append(tile)
-
-                sym = lv.label(tile)
-                sym.set_text(symbol)
-                sym.set_style_text_color(COL_TEXT, 0)
-                sym.align(lv.ALIGN.CENTER, 0, -10)
-                tile_syms.append(sym)
-
-                lbl = lv.label(tile)
-                lbl.set_text(name)
-                lbl.set_style_text_color(COL_TEXT, 0)
-                lbl.set_style_text_font(lv.font_montserrat_12, 0)
-                lbl.align(lv.ALIGN.CENTER, 0, 10)
-                tile_lbls.append(lbl)
+            self._begin_transition()
+            if self._menu_scrn is None:
+                self._build_menu()
+            tiles = self._menu_tiles
+            self._load_screen(self._menu_scrn, "Menu")
 
             rotary.set(
                 min_val=0,
@@ -104,36 +78,62 @@ class UI(UIBase):
                 if new_val != prev_selected:
                     self._cursor_index = new_val
                     prev_selected = self._cursor_index
-                    for i, (_, _, sel_col) in enumerate(MENU_ITEMS):
-                        if i == self._cursor_index:
-                            tiles[i].set_style_bg_color(sel_col, 0)
-                            tiles[i].set_style_border_width(0, 0)
-                            tile_syms[i].set_style_text_color(COL_SEL_TEXT, 0)
-                            tile_lbls[i].set_style_text_color(COL_SEL_TEXT, 0)
-                        else:
-                            tiles[i].set_style_bg_color(COL_TILE, 0)
-                            tiles[i].set_style_border_width(1, 0)
-                            tile_syms[i].set_style_text_color(COL_TEXT, 0)
-                            tile_lbls[i].set_style_text_color(COL_TEXT, 0)
+                    for i in range(len(MENU_ITEMS)):
+                        self._set_tile_state(
+                            tiles[i],
+                            TILE_SELECTED if i == self._cursor_index else TILE_NORMAL,
+                        )
 
                 enc_btn.read()
                 if enc_btn.get_state() == enc_btn.PRESSING:
                     self._wait_btn_release(enc_btn)
                     break
-
-                motor.update_state()
+                self._render()
+                self._idle()
 
             if self._cursor_index == 0:
                 self._manual.show(motor, rotary, enc_btn)
             elif self._cursor_index == 1:
-                self._show_breakin(motor, rotary, enc_btn)
+                self._breakin.show(motor, rotary, enc_btn)
             elif self._cursor_index == 2:
                 self._speed.show(wheel_sensor, enc_btn)
             elif self._cursor_index == 3:
+                self._sweep.show(motor, rotary, enc_btn)
+            elif self._cursor_index == 4:
                 self._show_settings(rotary, enc_btn)
 
-    def _show_breakin(self, motor, rotary, enc_btn):
-        self._show_placeholder("Break In", enc_btn)
+    def _build_menu(self):
+        rows = (len(self.MENU_ITEMS) + 1) // 2
+        TILE_W = int((DISP_WIDTH - 2 * MARGIN - MARGIN) // 2)
+        TILE_H = int((DISP_HEIGHT - 2 * MARGIN - (rows - 1) * MARGIN) // rows)
+
+        scrn = self._new_screen()
+        tiles = []
+
+        for idx, (name, symbol) in enumerate(self.MENU_ITEMS):
+            col = idx % 2
+            row = idx // 2
+            tx = MARGIN + col * (TILE_W + MARGIN)
+            ty = MARGIN + row * (TILE_H + MARGIN)
+
+            tile = lv.obj(scrn)
+            tile.set_size(TILE_W, TILE_H)
+            tile.set_pos(tx, ty)
+            tile.add_style(self.styles.menu_tile, 0)
+            tile.add_style(self.styles.page_selected[name], TILE_SELECTED)
+            tiles.append(tile)
+
+            sym = lv.label(tile)
+            sym.set_text(symbol)
+            sym.align(lv.ALIGN.CENTER, 0, -10)
+
+            lbl = lv.label(tile)
+            lbl.set_text(name)
+            lbl.set_style_text_font(lv.font_montserrat_12, 0)
+            lbl.align(lv.ALIGN.CENTER, 0, 10)
+
+        self._menu_scrn = scrn
+        self._menu_tiles = tiles
 
     def _show_settings(self, rotary, enc_btn):
         self._show_placeholder("Settings", enc_btn)
@@ -0,0 +1,316 @@
+import time
+import lvgl as lv
+
+from ui_common import (
+    UIBase,
+    Readout,
+    ClockReadout,
+    BREAK_IN_STEPS,
+    BREAK_IN_CHECKPOINT,
+    TEMP_LIM_DEFAULT_C,
+    DISP_WIDTH,
+    DISP_HEIGHT,
+    MARGIN,
+    TILE_H,
+    TILE_SELECTED,
+    VALUE_UPDATE_MS,
+)
+from break_in import BreakIn, DIR_FWD, PHASE_NAMES, STEP_UNIT_MS
+from thermal_model import ThermalModel
+
+
+class BreakInScreen(UIBase):
+    """
+    Break-in program screen, runs BREAK_IN_STEPS with a BreakIn engine. Cooldowns end
+    and hot run steps hold by a ThermalModel fitted as it runs, HOLD shows a held step.
+
+    Row 0: [STEP n/N] | [DIR VOLT] : read-only, changes with the step
+    Row 1: [PHASE left] | [TOTAL]  : read-only live value
+    Row 2: [RPM] | [I]             : read-only live value
+    Row 3: [progress bar]          : whole program
+    Row 4: [START/PAUSE/RESUME]    : the only control
+
+    While paused, or with a checkpoint from before a reset, turning the encoder switches
+    the button between RESUME and RESTART. RESTART drops the checkpoint and runs the
+    program from the first step, e.g. for the next motor. A current trip pauses the
+    program and shows its reason on the button until a press acknowledges it, the next
+    press resumes.
+    """
+
+    def __init__(
+        self,
+        display,
+        gc_manager=None,
+        renderer=None,
+        telemetry=None,
+        stream=None,
+        steps=BREAK_IN_STEPS,
+        checkpoint_path=BREAK_IN_CHECKPOINT,
+    ):
+        super().__init__(display, gc_manager, renderer, telemetry, stream)
+        self.steps = steps
+        self.checkpoint_path = checkpoint_path
+        self.engine = None  # Made on the first show(), it needs the motor
+        self.trip_name = ""  # MotorControl.TRIP_NAMES entry on show, until acknowledged
+        self.restart = False  # Paused with RESTART picked on the encoder
+        self.program_ms = sum((s[2] + s[3]) * STEP_UNIT_MS for s in steps) or 1
+        self.previous_disp_update_time = time.ticks_ms()
+
+        # Widget tree, built on the first show()
+        self.scrn = None
+        self._back_fill = None
+        self._labels = None
+        self._readouts = None
+        self._bar = None
+        self._button = None
+
+    # ── Private helpers ───────────────────────────────────────────────
+
+    def _half_tile_x(self, col):
+        """Left edge x for a half-width tile in the given column (0 or 1)."""
+        half_w = int((DISP_WIDTH - 3 * MARGIN) / 2)
+        return MARGIN + col * (half_w + MARGIN)
+
+    def _half_tile_w(self):
+        return int((DISP_WIDTH - 3 * MARGIN) / 2)
+
+    def _row_y(self, row):
+        return 2 * MARGIN + row * (MARGIN + TILE_H)
+
+    # ── Public entry point ────────────────────────────────────────────
+
+    def show(self, motor, rotary, enc_btn):
+        self._begin_transition()
+        if self.engine is None:
+            self.engine = BreakIn(
+                motor,
+                self.steps,
+                self.checkpoint_path,
+                thermal=ThermalModel(limit_c=TEMP_LIM_DEFAULT_C),
+            )
+        if self.scrn is None:
+            self._build_gui()
+        self.trip_name = motor.TRIP_NAMES[motor.trip_reason]
+        self.restart = False
+        self._reset_values()
+        self._load_screen(self.scrn, "Break-in")
+        self._run_loop(motor, rotary, enc_btn, self._back_fill, self._readouts)
+
+    def _reset_values(self):
+        """Put the live values back to their starting state"""
+        self._back_fill.set_width(1)
+        for readout in self._readouts:
+            readout.reset()
+        self._redraw_step()
+        self._redraw_button()
+
+    def _build_gui(self):
+        scrn = self._new_screen()
+        back_fill = self._make_back_bar(scrn)
+
+        # Row 0: STEP | DIR VOLT
+        t_step = self._make_tile(
+            scrn, self._half_tile_x(0), self._row_y(0), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_step, "STEP")
+        v_step = self._tile_val(t_step, "0/0")
+
+        t_set = self._make_tile(
+            scrn, self._half_tile_x(1), self._row_y(0), self._half_tile_w(), TILE_H
+        )
+        v_dir = self._tile_key(t_set, "FWD")
+        v_volt = self._tile_val(t_set, "0.0V")
+
+        # Row 1: phase time left | program time left
+        t_phase = self._make_tile(
+            scrn, self._half_tile_x(0), self._row_y(1), self._half_tile_w(), TILE_H
+        )
+        k_phase = self._tile_key(t_phase, "RUN")
+        v_phase = self._tile_val(t_phase, "00:00")
+
+        t_total = self._make_tile(
+            scrn, self._half_tile_x(1), self._row_y(1), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_total, "LEFT")
+        v_total = self._tile_val(t_total, "00:00")
+
+        # Row 2: RPM | current
+        t_rpm = self._make_tile(
+            scrn, self._half_tile_x(0), self._row_y(2), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_rpm, "RPM")
+        v_rpm = self._tile_val(t_rpm, "0")
+
+        t_amps = self._make_tile(
+            scrn, self._half_tile_x(1), self._row_y(2), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_amps, "I")
+        v_amps = self._tile_val(t_amps, "0mA")
+
+        # Row 3: program progress
+        t_bar = self._make_tile(
+            scrn, MARGIN, self._row_y(3), DISP_WIDTH - 2 * MARGIN, TILE_H
+        )
+        bar = lv.bar(t_bar)
+        bar.set_size(DISP_WIDTH - 2 * MARGIN - 8, TILE_H - 12)
+        bar.align(lv.ALIGN.CENTER, 0, 0)
+        bar.set_range(0, 1000)
+
+        # Row 4: START / PAUSE / RESUME, the only control so always selected
+        start_h = DISP_HEIGHT - (3 * MARGIN + 4 * (MARGIN + TILE_H))
+        t_button = self._make_tile(
+            scrn,
+            MARGIN,
+            self._row_y(4),
+            DISP_WIDTH - 2 * MARGIN,
+            start_h,
+            selectable=True,
+        )
+        self._set_tile_state(t_button, TILE_SELECTED)
+        v_button = lv.label(t_button)
+        v_button.set_text(lv.SYMBOL.PLAY + " START")
+        v_button.set_style_text_font(lv.font_montserrat_14, 0)
+        v_button.align(lv.ALIGN.CENTER, 0, 0)
+
+        self.scrn = scrn
+        self._back_fill = back_fill
+        self._labels = (v_step, v_dir, v_volt, k_phase)
+        self._readouts = (
+            ClockReadout(v_phase),
+            ClockReadout(v_total),
+            Readout(v_rpm),
+            Readout(v_amps, suffix="mA"),
+        )
+        self._bar = bar
+        self._button = v_button
+
+    def _redraw_step(self):
+        """Step, direction, voltage and phase texts, only when the step or phase changes"""
+        engine = self.engine
+        v_step, v_dir, v_volt, k_phase = self._labels
+        step = self.steps[engine.step]
+        v_step.set_text(f"{engine.step + 1}/{len(self.steps)}")
+        v_dir.set_text("FWD" if step[0] == DIR_FWD else "REV")
+        v_volt.set_text(f"{step[1] / 10:.1f}V")
+        if engine.done():
+            k_phase.set_text("DONE")
+        elif engine.holding:
+            k_phase.set_text("HOLD")
+        else:
+            k_phase.set_text(PHASE_NAMES[engine.phase])
+
+    def _redraw_button(self):
+        engine = self.engine
+        if engine.running():
+            text = lv.SYMBOL.PAUSE + " PAUSE"
+        elif self.trip_name:
+            text = lv.SYMBOL.WARNING + " " + self.trip_name
+        elif self.restart:
+            text = lv.SYMBOL.REFRESH + " RESTART"
+        elif engine.resumable():
+            text = lv.SYMBOL.PLAY + " RESUME"
+        else:
+            text = lv.SYMBOL.PLAY + " START"
+        self._button.set_text(text)
+
+    def _run_loop(self, motor, rotary, enc_btn, back_fill, readouts):
+        engine = self.engine
+        self._reset_rotary(rotary)
+        press_ms = 0
+
+        while True:
+            self._handle_rotary(rotary)
+            press_ms = self._update_back_bar(back_fill, enc_btn, press_ms)
+            if press_ms == -1:
+                self._on_long_press()
+                self._wait_btn_release(enc_btn)
+                return
+            elif press_ms == -2:
+                press_ms = 0
+                self._on_short_press()
+                self._reset_rotary(rotary)
+
+            if engine.update():
+                self._redraw_step()
+                if engine.done():
+                    self._redraw_button()
+                    engine.report()
+            trip_name = motor.TRIP_NAMES[motor.trip_reason]
+            if trip_name != self.trip_name:  # Tripped, or acknowledged
+                self.trip_name = trip_name
+                self._redraw_button()
+            if self.telemetry is not None:
+                self._update_telemetry(motor)
+
+            refreshed = self._update_readouts(motor, readouts, VALUE_UPDATE_MS)
+            self._render()
+            if refreshed:
+                self._idle()  # Until the next refresh is the longest idle gap
+                engine.save_checkpoint()
+
+    def _on_long_press(self):
+        """Leaving pauses the program, it can be resumed from here or after a reset"""
+        self.engine.pause()
+        self.engine.save_checkpoint()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+
+    def _on_short_press(self):
+        engine = self.engine
+        if self.trip_name:
+            engine.motor.clear_trip()  # Acknowledged, the loop redraws RESUME
+            return
+        if engine.running():
+            engine.pause()
+        elif self.restart:
+            engine.clear_checkpoint()
+            engine.start()
+        elif engine.resumable():
+            engine.resume()
+        else:
+            engine.start()
+        self.restart = False
+        self._redraw_step()
+        self._redraw_button()
+
+    def _reset_rotary(self, rotary):
+        """Encoder at 0 for RESUME, 1 picks RESTART while paused"""
+        rotary.set(
+            min_val=0, max_val=1, value=0, incr=1, range_mode=rotary.RANGE_BOUNDED
+        )
+
+    def _handle_rotary(self, rotary):
+        restart = (
+            rotary.value() == 1 and self.engine.resumable() and not self.trip_name
+        )
+        if restart != self.restart:
+            self.restart = restart
+            self._redraw_button()
+
+    def _update_telemetry(self, motor):
+        """Log the whole program, until the motor has braked after it stops"""
+        if self.engine.running():
+            if not self.telemetry.running:
+                self.telemetry.start()
+        elif self.telemetry.running and not motor.in_transition():
+            self.telemetry.stop()
+
+    def _update_readouts(self, motor, readouts, delay_ms):
+        """
+        Refresh the live values every delay_ms. Labels are only redrawn when the displayed
+        digits change. Returns True if it was time to refresh.
+        """
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.previous_disp_update_time) > delay_ms:
+            self.previous_disp_update_time = now
+            engine = self.engine
+            r_phase, r_total, r_rpm, r_amps = readouts
+            left_ms = engine.total_remaining_ms()
+            r_phase.show((engine.remaining_ms() + 999) // 1000)
+            r_total.show((left_ms + 999) // 1000)
+            r_rpm.show(motor.get_rpm_1s())
+            r_amps.show(max(0, motor.get_current_1s_ma()))
+            done_ms = self.program_ms - left_ms
+            self._bar.set_value(done_ms * 1000 // self.program_ms, 0)
+            return True
+        return False
@@ -1,6 +1,11 @@
 import time
 import lvgl as lv
 
+try:
+    from gc import mem_free
+except ImportError:
+    mem_free = None  # Not MicroPython, e.g. the host stand-ins
+
 
 # ────────────────────────────── Enums ────────────────────────────────────
 class Direction:
@@ -12,6 +17,7 @@ class Direction:
 
 HOLD_MS = 800
 WHEEL_CIRCUMFERENCE = 0.002687  # meters
+WHEEL_CIRCUMFERENCE_UM = 2687  # micrometers, for integer maths
 
 VOLTAGE_MIN_MV = 500
 VOLTAGE_MAX_MV = 3000
@@ -27,6 +33,10 @@ VOLTAGE_DEFAULT_MV = 1500
 CURRENT_LIM_DEFAULT_MA = 500
 TEMP_LIM_DEFAULT_C = 40
 
+SWEEP_STEP_MIN_MV = 50
+SWEEP_STEP_MAX_MV = 500
+SWEEP_STEP_DEFAULT_MV = 250
+
 # TODO: add these to eeprom so they are persistent
 # [dir, vol_x10, dur_30, cool_30]
 BREAK_IN_STEPS = [
@@ -36,6 +46,7 @@ BREAK_IN_STEPS = [
     [Direction.REV, 15, 2, 2],
     [Direction.FWD, 15, 2, 2],
 ]
+BREAK_IN_CHECKPOINT = "/breakin.bin"  # Progress saved here to resume after a reset
 
 # ────────────────────── Display / Colours ──────────────────────────
 
@@ -48,6 +59,10 @@ TILE_H = 22
 # Delay on how frequently we update live values
 VALUE_UPDATE_MS = 200
 
+# Print the time and heap free around every screen change. Off in normal use, turn it on
+# from the REPL with `import ui_common; ui_common.REPORT_TRANSITIONS = True`
+REPORT_TRANSITIONS = False
+
 # Global Colours
 COL_TILE = lv.color_white()
 COL_TEXT = lv.color_black()
@@ -63,48 +78,287 @@ COL_BACK_BAR = lv.palette_main(lv.PALETTE.BLUE)
 COL_MANUAL = lv.palette_darken(lv.PALETTE.RED, 2)
 COL_BREAK_IN = lv.palette_darken(lv.PALETTE.BLUE, 2)
 COL_SPEED_TEST = lv.palette_darken(lv.PALETTE.TEAL, 2)
+COL_SWEEP = lv.palette_darken(lv.PALETTE.PURPLE, 2)
 COL_SETTINGS = lv.palette_darken(lv.PALETTE.AMBER, 2)
 
+# Tile states, the shared selected / editing styles are keyed on these
+TILE_NORMAL = lv.STATE.DEFAULT
+TILE_SELECTED = lv.STATE.CHECKED
+TILE_EDITING = lv.STATE.CHECKED | lv.STATE.EDITED
+TILE_STATES = TILE_EDITING
+
+
+# ─────────────────────────── Shared styles ──────────────────────────────
+
+
+class Styles:
+    """
+    lv.style_t objects shared by every screen, created once by get_styles().
+
+    Tiles carry the text colour and font so their labels inherit them instead of each
+    label holding its own local style properties. Selection and editing are state
+    selectors on the tile (TILE_SELECTED / TILE_EDITING), so moving the cursor is a
+    state change on two tiles rather than restyling every tile and label.
+
+    Example:
+
+        styles = get_styles()
+        tile.add_style(styles.tile, 0)
+        tile.add_style(styles.tile_selected, TILE_SELECTED)
+        UIBase._set_tile_state(tile, TILE_SELECTED)
+    """
+
+    def __init__(self):
+        self.screen = self._style(bg_color=COL_BCKGND)
+
+        # Readout tiles, grey with black text
+        self.tile = self._style(
+            bg_color=COL_BCKGND,
+            border_color=COL_BORDER,
+            border_width=1,
+            radius=3,
+            pad_all=2,
+            text_color=COL_TEXT,
+            text_font=lv.font_montserrat_12,
+        )
+        # Selectable tiles on top of tile
+        self.tile_nav = self._style(bg_color=COL_TILE)
+        self.tile_selected = self._selected(COL_SEL_BCKGND)
+        self.tile_editing = self._style(bg_color=COL_EDIT_BCKGND)
+
+        self.menu_tile = self._style(
+            bg_color=COL_TILE,
+            border_color=COL_BORDER,
+            border_width=1,
+            radius=3,
+            pad_all=0,
+            text_color=COL_TEXT,
+        )
+        self.page_selected = {
+            "Manual": self._selected(COL_MANUAL),
+            "Break-in": self._selected(COL_BREAK_IN),
+            "Speed Test": self._selected(COL_SPEED_TEST),
+            "Sweep": self._selected(COL_SWEEP),
+            "Settings": self._selected(COL_SETTINGS),
+        }
+
+        self.back_bar = self._style(
+            bg_color=COL_BACK_BAR, border_width=0, radius=0, pad_all=0
+        )
+
+    def _style(self, **props):
+        style = lv.style_t()
+        style.init()
+        for prop, value in props.items():
+            getattr(style, "set_" + prop)(value)
+        return style
+
+    def _selected(self, bg_color):
+        return self._style(bg_color=bg_color, border_width=0, text_color=COL_SEL_TEXT)
+
+
+_styles = None
+
+
+def get_styles():
+    """The shared Styles, built on first use once LVGL is up"""
+    global _styles
+    if _styles is None:
+        _styles = Styles()
+    return _styles
+
+
+# ─────────────────────────── Live readouts ──────────────────────────────
+
+
+class Readout:
+    """
+    Live value label fed with fixed point ints, e.g. mV with decimals=3 shows volts.
+
+    show() compares the raw value first and only formats when it changes, rendering the
+    digits into a preallocated buffer instead of building an f-string. The buffer is NUL
+    terminated and LVGL copies the text up to the NUL, so the only allocation is the bytes
+    handed to set_text() when the displayed digits change. An unchanged value costs an int
+    compare and allocates nothing.
+
+    Example:
+
+        amps = Readout(label, suffix="mA")
+        amps.show(motor.get_current_1s_ma())  # "512mA"
+        volts = Readout(label, decimals=2, suffix="V")
+        volts.show(motor.get_voltage_100ms_mv() // 10)  # "2.95V"
+    """
+
+    def __init__(self, label, decimals: int = 0, suffix: str = "", size: int = 16):
+        self.label = label
+        self.decimals = decimals
+        self.scale = 10**decimals
+        self.suffix = suffix.encode()
+        self.buf = bytearray(size)
+        self.value = None
+        self.updates = 0  # set_text() calls, for the benchmarks
+
+    def reset(self):
+        """Forget the shown value so the next show() always redraws"""
+        self.value = None
+
+    def show(self, value: int):
+        """Display value if it differs from what's shown. Returns True if redrawn."""
+        if value == self.value:
+            return False
+        self.value = value
+        n = self._render(value)
+        self.buf[n] = 0
+        self.label.set_text(bytes(self.buf))
+        self.updates += 1
+        return True
+
+    def _render(self, value):
+        buf = self.buf
+        i = 0
+        if value < 0:
+            buf[0] = 45  # "-"
+            i = 1
+            value = -value
+        if self.decimals:
+            i = self._put_digits(value // self.scale, i, 1)
+            buf[i] = 46  # "."
+            i = self._put_digits(value % self.scale, i + 1, self.decimals)
+        else:
+            i = self._put_digits(value, i, 1)
+        for c in self.suffix:
+            buf[i] = c
+            i += 1
+        return i
+
+    def _put_digits(self, n, i, width):
+        """Write n at buf[i:] zero padded to width digits, returns the index after"""
+        digits = 1
+        limit = 10
+        while n >= limit:
+            digits += 1
+            limit *= 10
+        if digits < width:
+            digits = width
+        end = i + digits
+        buf = self.buf
+        j = end
+        while j > i:
+            j -= 1
+            buf[j] = 48 + n % 10
+            n //= 10
+        return end
+
+
+class ClockReadout(Readout):
+    """Readout of a whole number of seconds as MM:SS"""
+
+    def _render(self, value):
+        i = self._put_digits(value // 60, 0, 2)
+        self.buf[i] = 58  # ":"
+        return self._put_digits(value % 60, i + 1, 2)
+
 
 class UIBase:
     """
     Shared LVGL helpers inherited by all screen classes.
     Not instantiated directly.
+
+    Each screen builds its widget tree once into its own lv.obj screen and swaps it in
+    with lv.screen_load on later visits, resetting live values in place.
+
+    Screen loops call _render() every tick, which lets the RenderScheduler draw a frame
+    when one is due, and _idle() at points where a pause is harmless.
     """
 
-    def __init__(self, display):
+    def __init__(
+        self, display, gc_manager=None, renderer=None, telemetry=None, stream=None
+    ):
         self.display = display
+        self.gc_manager = gc_manager
+        self.renderer = renderer
+        self.telemetry = telemetry
+        self.stream = stream
+        self.styles = get_styles()
+        self._placeholders = {}
+        self._transition_start_us = 0
+        self._transition_heap = 0
+        self.last_transition_us = 0
+
+    def _render(self):
+        """Render a frame if the RenderScheduler has one due"""
+        if self.renderer is not None:
+            self.renderer.poll()
+
+    def _idle(self):
+        """
+        A pause is harmless here, write out a telemetry block if one is waiting, send any
+        streamed frames and let the GCManager collect if it's due
+        """
+        if self.telemetry is not None:
+            self.telemetry.flush()
+        if self.stream is not None:
+            self.stream.pump()
+        if self.gc_manager is not None:
+            self.gc_manager.idle()
+
+    def _new_screen(self):
+        """A detached screen to build a widget tree into, shown with _load_screen()"""
+        scrn = lv.obj()
+        scrn.add_style(self.styles.screen, 0)
+        return scrn
+
+    def _begin_transition(self):
+        """Call before building / resetting the next screen, _load_screen() reports the time"""
+        self._transition_start_us = time.ticks_us()
+        self._transition_heap = mem_free() if mem_free else 0
 
-    def _clear_screen(self):
-        """Remove all LVGL children from the active screen."""
-        scrn = lv.screen_active()
-        while scrn.get_child_count() > 0:
-            scrn.get_child(0).delete()
+    def _load_screen(self, scrn, name):
+        lv.screen_load(scrn)
+        self.last_transition_us = time.ticks_diff(
+            time.ticks_us(), self._transition_start_us
+        )
+        if not REPORT_TRANSITIONS:
+            return
+        if mem_free is None:
+            print(f"{name}: {self.last_transition_us}us")
+        else:
+            print(
+                f"{name}: {self.last_transition_us}us, heap free {self._transition_heap} -> {mem_free()}"
+            )
 
-    def _make_tile(self, scrn, x, y, w, h):
+    def _make_tile(self, scrn, x, y, w, h, selectable=False):
         t = lv.obj(scrn)
         t.set_size(w, h)
         t.set_pos(x, y)
-        t.set_style_bg_color(COL_BCKGND, 0)
-        t.set_style_border_color(COL_BORDER, 0)
-        t.set_style_border_width(1, 0)
-        t.set_style_radius(3, 0)
-        t.set_style_pad_all(2, 0)
+        t.add_style(self.styles.tile, 0)
+        if selectable:
+            t.add_style(self.styles.tile_nav, 0)
+            t.add_style(self.styles.tile_selected, TILE_SELECTED)
+            t.add_style(self.styles.tile_editing, TILE_EDITING)
         return t
 
+    @staticmethod
+    def _set_tile_state(tile, state):
+        """
+        Switch a tile between TILE_NORMAL, TILE_SELECTED and TILE_EDITING. Only the state
+        bits that differ are touched, so an unchanged tile isn't invalidated.
+        """
+        old = tile.get_state() & TILE_STATES
+        if old & ~state:
+            tile.remove_state(old & ~state)
+        if state & ~old:
+            tile.add_state(state & ~old)
+
     def _tile_key(self, tile, text):
         k = lv.label(tile)
         k.set_text(text)
-        k.set_style_text_color(COL_TEXT, 0)
-        k.set_style_text_font(lv.font_montserrat_12, 0)
         k.align(lv.ALIGN.LEFT_MID, 0, 0)
         return k
 
     def _tile_val(self, tile, text):
         v = lv.label(tile)
         v.set_text(text)
-        v.set_style_text_color(COL_TEXT, 0)
-        v.set_style_text_font(lv.font_montserrat_12, 0)
         v.align(lv.ALIGN.RIGHT_MID, 0, 0)
         return v
 
@@ -114,6 +368,7 @@ class UIBase:
             enc_btn.read()
             if enc_btn.get_state() == enc_btn.IDLE:
                 break
+            self._render()
             time.sleep_ms(1)
 
     def _update_back_bar(self, fill, enc_btn, pressed_ms):
@@ -157,16 +412,27 @@ class UIBase:
         fill = lv.obj(scrn)
         fill.set_size(1, 2)
         fill.set_pos(0, 0)
-        fill.set_style_bg_color(COL_BACK_BAR, 0)
-        fill.set_style_border_width(0, 0)
-        fill.set_style_radius(0, 0)
-        fill.set_style_pad_all(0, 0)
+        fill.add_style(self.styles.back_bar, 0)
         return fill
 
     def _show_placeholder(self, title, enc_btn):
-        self._clear_screen()
-        scrn = lv.screen_active()
-        scrn.set_style_bg_color(COL_BCKGND, 0)
+        self._begin_transition()
+        if title not in self._placeholders:
+            self._placeholders[title] = self._build_placeholder(title)
+        scrn, back_fill = self._placeholders[title]
+        back_fill.set_width(1)
+        self._load_screen(scrn, title)
+
+        pressed_ms = 0
+        while True:
+            pressed_ms = self._update_back_bar(back_fill, enc_btn, pressed_ms)
+            if pressed_ms == -1:
+                return
+            self._render()
+            self._idle()
+
+    def _build_placeholder(self, title):
+        scrn = self._new_screen()
 
         header = lv.label(scrn)
         header.set_text(title)
@@ -186,10 +452,4 @@ class UIBase:
         hint.set_style_text_font(lv.font_montserrat_12, 0)
         hint.align(lv.ALIGN.BOTTOM_MID, 0, -10)
 
-        back_fill = self._make_back_bar(scrn)
-
-        pressed_ms = 0
-        while True:
-            pressed_ms = self._update_back_bar(back_fill, enc_btn, pressed_ms)
-            if pressed_ms == -1:
-                return
+        return scrn, self._make_back_bar(scrn)
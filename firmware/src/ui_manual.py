@@ -3,6 +3,8 @@ import lvgl as lv
 
 from ui_common import (
     UIBase,
+    Readout,
+    ClockReadout,
     Direction,
     VOLTAGE_MIN_MV,
     VOLTAGE_MAX_MV,
@@ -11,13 +13,9 @@ from ui_common import (
     DISP_HEIGHT,
     MARGIN,
     TILE_H,
-    COL_BCKGND,
-    COL_TILE,
-    COL_BORDER,
-    COL_TEXT,
-    COL_SEL_TEXT,
-    COL_SEL_BCKGND,
-    COL_EDIT_BCKGND,
+    TILE_NORMAL,
+    TILE_SELECTED,
+    TILE_EDITING,
     VALUE_UPDATE_MS,
 )
 
@@ -26,19 +24,25 @@ class ManualScreen(UIBase):
     """
     Manual motor test screen.
 
-    Row 0: [RPM]          : read-only live value
+    Row 0: [RPM] | [V]    : read-only live value
     Row 1: [TIMER]        : read-only live value
     Row 2: [AMPS] | [TEMP]: read-only live value
     Row 3: [DIR] | [VOLT] : nav 0 | nav 1
     Row 4: [START/STOP]   : nav 2
+
+    A current trip stops the motor and shows its reason on the START tile until a press
+    acknowledges it.
     """
 
-    def __init__(self, display):
-        super().__init__(display)
+    def __init__(
+        self, display, gc_manager=None, renderer=None, telemetry=None, stream=None
+    ):
+        super().__init__(display, gc_manager, renderer, telemetry, stream)
         self.motor_run_state = False
         self.manual_dir = Direction.FWD
         self.manual_vol_mv = VOLTAGE_DEFAULT_MV
         self.manual_run_start = None
+        self.trip_name = ""  # MotorControl.TRIP_NAMES entry on show, until acknowledged
         self.previous_disp_update_time = time.ticks_ms()
 
         # Dirty-flag mirrors
@@ -46,10 +50,11 @@ class ManualScreen(UIBase):
         self._old_dir = self.manual_dir
         self._old_vol_mv = self.manual_vol_mv
 
-        self._last_amps = ""
-        self._last_rpm = ""
-        self._last_temp = ""
-        self._last_timer = ""
+        # Widget tree, built on the first show()
+        self.scrn = None
+        self._back_fill = None
+        self._items = None
+        self._readouts = None
 
     # ── Private helpers ───────────────────────────────────────────────
 
@@ -60,47 +65,28 @@ class ManualScreen(UIBase):
             return f"{self.manual_vol_mv / 1000:.1f}V"
         return ""
 
-    def _set_tile_state(self, items, idx, state):
-        tile, key, val = items[idx]
-        if state == "selected":
-            tile.set_style_bg_color(COL_SEL_BCKGND, 0)
-            tile.set_style_border_width(0, 0)
-            val.set_style_text_color(COL_SEL_TEXT, 0)
-            if key:
-                key.set_style_text_color(COL_SEL_TEXT, 0)
-        elif state == "editing":
-            tile.set_style_bg_color(COL_EDIT_BCKGND, 0)
-            tile.set_style_border_width(0, 0)
-            val.set_style_text_color(COL_SEL_TEXT, 0)
-            if key:
-                key.set_style_text_color(COL_SEL_TEXT, 0)
-        else:
-            tile.set_style_bg_color(COL_TILE, 0)
-            tile.set_style_border_color(COL_BORDER, 0)
-            tile.set_style_border_width(1, 0)
-            val.set_style_text_color(COL_TEXT, 0)
-            if key:
-                key.set_style_text_color(COL_TEXT, 0)
-
     def _redraw_tiles(self, items, sel, editing=False):
-        for i in range(len(items) - 1):
-            self._set_tile_state(
-                items,
-                i,
-                (
-                    "editing"
-                    if (i == sel and editing)
-                    else "selected" if i == sel else "normal"
-                ),
-            )
+        """Move the selection / editing state to tile sel, only changed tiles redraw"""
+        for i in range(len(items)):
+            if i != sel:
+                state = TILE_NORMAL
+            elif editing:
+                state = TILE_EDITING
+            else:
+                state = TILE_SELECTED
+            self._set_tile_state(items[i][0], state)
+
+    def _redraw_params(self, items):
+        """Refresh the DIR / VOLT / START tile texts after a setting changes"""
         items[0][2].set_text(self._param_str("DIR"))
         items[1][2].set_text(self._param_str("VOLT"))
-        items[2][2].set_text(
-            lv.SYMBOL.PLAY + " START"
-            if not self.motor_run_state
-            else lv.SYMBOL.PAUSE + " PAUSE"
-        )
-        self._set_tile_state(items, 2, "selected" if sel == 2 else "normal")
+        if self.motor_run_state:
+            text = lv.SYMBOL.PAUSE + " PAUSE"
+        elif self.trip_name:
+            text = lv.SYMBOL.WARNING + " " + self.trip_name
+        else:
+            text = lv.SYMBOL.PLAY + " START"
+        items[2][2].set_text(text)
 
     def _half_tile_x(self, col):
         """Left edge x for a half-width tile in the given column (0 or 1)."""
@@ -116,21 +102,47 @@ class ManualScreen(UIBase):
     # ── Public entry point ────────────────────────────────────────────
 
     def show(self, motor, rotary, enc_btn):
-        self._build_gui(motor, rotary, enc_btn)
+        self._begin_transition()
+        if self.scrn is None:
+            self._build_gui()
+        self._reset_values(motor)
+        self._load_screen(self.scrn, "Manual")
+        self._run_loop(
+            motor, rotary, enc_btn, self._back_fill, self._items, self._readouts
+        )
 
-    def _build_gui(self, motor, rotary, enc_btn):
-        self._clear_screen()
-        scrn = lv.screen_active()
-        scrn.set_style_bg_color(COL_BCKGND, 0)
+    def _reset_values(self, motor):
+        """Put the live values and controls back to their starting state"""
+        self._back_fill.set_width(1)
+        r_rpm, r_meas_volt, r_timer, r_amps, r_temp = self._readouts
+        for readout in self._readouts:
+            readout.reset()
+        r_rpm.show(0)
+        r_meas_volt.show(0)
+        r_timer.show(0)
+        r_amps.show(0)
+        r_temp.show(motor.get_temp_10s_x10())
+
+        self.trip_name = motor.TRIP_NAMES[motor.trip_reason]
+        self._redraw_params(self._items)
+
+    def _build_gui(self):
+        scrn = self._new_screen()
         back_fill = self._make_back_bar(scrn)
 
-        # Row 0: RPM
+        # Row 0: RPM | measured voltage
         t_rpm = self._make_tile(
-            scrn, MARGIN, self._row_y(0), DISP_WIDTH - 2 * MARGIN, TILE_H
+            scrn, self._half_tile_x(0), self._row_y(0), self._half_tile_w(), TILE_H
         )
         self._tile_key(t_rpm, "RPM")
         v_rpm = self._tile_val(t_rpm, "0")
 
+        t_meas_volt = self._make_tile(
+            scrn, self._half_tile_x(1), self._row_y(0), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_meas_volt, "V")
+        v_meas_volt = self._tile_val(t_meas_volt, "0.00V")
+
         # Row 1: TIMER
         t_timer = self._make_tile(
             scrn, MARGIN, self._row_y(1), DISP_WIDTH - 2 * MARGIN, TILE_H
@@ -149,17 +161,27 @@ class ManualScreen(UIBase):
             scrn, self._half_tile_x(1), self._row_y(2), self._half_tile_w(), TILE_H
         )
         self._tile_key(t_temp, "T")
-        v_temp = self._tile_val(t_temp, f"{motor.get_temp_10s():.1f}°C")
+        v_temp = self._tile_val(t_temp, "0.0°C")
 
         # Row 3: DIR | VOLT
         t_dir = self._make_tile(
-            scrn, self._half_tile_x(0), self._row_y(3), self._half_tile_w(), TILE_H
+            scrn,
+            self._half_tile_x(0),
+            self._row_y(3),
+            self._half_tile_w(),
+            TILE_H,
+            selectable=True,
         )
         k_dir = self._tile_key(t_dir, "DIR")
         v_dir = self._tile_val(t_dir, self._param_str("DIR"))
 
         t_volt = self._make_tile(
-            scrn, self._half_tile_x(1), self._row_y(3), self._half_tile_w(), TILE_H
+            scrn,
+            self._half_tile_x(1),
+            self._row_y(3),
+            self._half_tile_w(),
+            TILE_H,
+            selectable=True,
         )
         k_volt = self._tile_key(t_volt, "VOLT")
         v_volt = self._tile_val(t_volt, self._param_str("VOLT"))
@@ -167,11 +189,15 @@ class ManualScreen(UIBase):
         # Row 4: START / STOP
         start_h = DISP_HEIGHT - (3 * MARGIN + 4 * (MARGIN + TILE_H))
         t_start_stop = self._make_tile(
-            scrn, MARGIN, self._row_y(4), DISP_WIDTH - 2 * MARGIN, start_h
+            scrn,
+            MARGIN,
+            self._row_y(4),
+            DISP_WIDTH - 2 * MARGIN,
+            start_h,
+            selectable=True,
         )
         v_start_stop = lv.label(t_start_stop)
         v_start_stop.set_text(lv.SYMBOL.PLAY + " START")
-        v_start_stop.set_style_text_color(COL_TEXT, 0)
         v_start_stop.set_style_text_font(lv.font_montserrat_14, 0)
         v_start_stop.align(lv.ALIGN.CENTER, 0, 0)
 
@@ -181,17 +207,19 @@ class ManualScreen(UIBase):
             (t_start_stop, None, v_start_stop),
         ]
 
-        self._run_loop(
-            motor, rotary, enc_btn, back_fill, items, v_rpm, v_timer, v_amps, v_temp
+        self.scrn = scrn
+        self._back_fill = back_fill
+        self._items = items
+        self._readouts = (
+            Readout(v_rpm),
+            Readout(v_meas_volt, decimals=2, suffix="V"),
+            ClockReadout(v_timer),
+            Readout(v_amps, suffix="mA"),
+            Readout(v_temp, decimals=1, suffix="°C"),
         )
 
-    def _run_loop(
-        self, motor, rotary, enc_btn, back_fill, items, v_rpm, v_timer, v_amps, v_temp
-    ):
+    def _run_loop(self, motor, rotary, enc_btn, back_fill, items, readouts):
         while True:
-            for i in range(len(items)):
-                self._set_tile_state(items, i, "normal")
-
             rotary.set(
                 min_val=0,
                 max_val=len(items) - 1,
@@ -203,7 +231,7 @@ class ManualScreen(UIBase):
             prev_sel = -1
             editing = False
             press_ms = 0
-            self._set_tile_state(items, 2, "selected")
+            self._redraw_tiles(items, sel)
 
             while True:
 
@@ -224,10 +252,17 @@ class ManualScreen(UIBase):
                         motor, rotary, enc_btn, items, sel, editing
                     )
 
+                trip_name = motor.TRIP_NAMES[motor.trip_reason]
+                if trip_name != self.trip_name:  # Tripped, or acknowledged
+                    self.trip_name = trip_name
+                    if trip_name:
+                        self.motor_run_state = False
+                    self._redraw_params(items)
                 self._update_motor(motor)
-                self._update_readouts(
-                    motor, v_rpm, v_timer, v_amps, v_temp, VALUE_UPDATE_MS
-                )
+                refreshed = self._update_readouts(motor, readouts, VALUE_UPDATE_MS)
+                self._render()
+                if refreshed:
+                    self._idle()  # Until the next refresh is the longest idle gap
 
     def _on_long_press(self, motor, rotary, enc_btn, items, sel, editing):
         if editing:
@@ -240,6 +275,8 @@ class ManualScreen(UIBase):
             )
         self.motor_run_state = False
         motor.set_state(motor.MOTOR_BRAKE, VOLTAGE_MIN_MV)
+        if self.telemetry is not None:
+            self.telemetry.stop()
 
     def _on_short_press(self, motor, rotary, enc_btn, items, sel, editing):
         """Handle a confirmed short press. Returns the new editing state."""
@@ -258,7 +295,7 @@ class ManualScreen(UIBase):
                 self.manual_dir = (
                     Direction.REV if self.manual_dir == Direction.FWD else Direction.FWD
                 )
-                self._redraw_tiles(items, sel)
+                self._redraw_params(items)
             elif sel == 1:  # Voltage Control
                 editing = True
                 rotary.set(
@@ -269,11 +306,13 @@ class ManualScreen(UIBase):
                     range_mode=rotary.RANGE_BOUNDED,
                 )
                 self._redraw_tiles(items, sel, editing=True)
+            elif sel == 2 and self.trip_name:
+                motor.clear_trip()  # Acknowledged, the loop redraws START
             elif sel == 2:
                 self.motor_run_state = not self.motor_run_state
                 if self.motor_run_state:
                     self.manual_run_start = time.ticks_ms()
-                self._redraw_tiles(items, sel)
+                self._redraw_params(items)
         return editing
 
     def _handle_rotary(self, rotary, items, sel, prev_sel, editing):
@@ -291,7 +330,10 @@ class ManualScreen(UIBase):
         return sel, prev_sel, editing
 
     def _update_motor(self, motor):
-        """Push state to motor driver only when something has changed."""
+        """
+        Push state to motor driver only when something has changed. The executive started
+        in main.py runs the motor state machine and sensing.
+        """
         if (
             self.motor_run_state != self._old_run_state
             or self.manual_dir != self._old_dir
@@ -310,39 +352,35 @@ class ManualScreen(UIBase):
 
             motor.set_state(mode, self.manual_vol_mv)
 
-        motor.update_state()
-        motor.update_current_ma()
-        motor.update_rpm()
-        motor.update_temp()
+        if self.telemetry is not None:
+            self._update_telemetry(motor)
+
+    def _update_telemetry(self, motor):
+        """Log from START until the motor has ramped down and braked after PAUSE"""
+        if self.motor_run_state:
+            if not self.telemetry.running:
+                self.telemetry.start()
+        elif self.telemetry.running and not motor.in_transition():
+            self.telemetry.stop()
 
-    def _update_readouts(self, motor, v_rpm, v_timer, v_amps, v_temp, delay_ms):
-        """Refresh all live-value labels only if they've changed and it's been more than delay ms since last update"""
+    def _update_readouts(self, motor, readouts, delay_ms):
+        """
+        Refresh the live values every delay_ms. Labels are only redrawn when the displayed
+        digits change. Returns True if it was time to refresh.
+        """
 
         now = time.ticks_ms()
         if time.ticks_diff(now, self.previous_disp_update_time) > delay_ms:
             self.previous_disp_update_time = now
+            r_rpm, r_meas_volt, r_timer, r_amps, r_temp = readouts
 
-            current_ma = max(0, motor.get_current_1s())
-            new_amps = f"{current_ma:.0f}mA"
-            if new_amps != self._last_amps:
-                self._last_amps = new_amps
-                v_amps.set_text(new_amps)
-
-            new_rpm = f"{motor.get_rpm_1s():d}"
-            if new_rpm != self._last_rpm:
-                self._last_rpm = new_rpm
-                v_rpm.set_text(new_rpm)
-
-            new_temp = f"{motor.get_temp_10s():.1f}°C"
-            if new_temp != self._last_temp:
-                self._last_temp = new_temp
-                v_temp.set_text(new_temp)
+            # Measured alongside the current, no extra sensor reads. Shown in 10mV steps.
+            r_meas_volt.show((motor.get_voltage_100ms_mv() + 5) // 10)
+            r_amps.show(max(0, motor.get_current_1s_ma()))
+            r_rpm.show(motor.get_rpm_1s())
+            r_temp.show(motor.get_temp_10s_x10())
 
             if self.manual_run_start is not None and self.motor_run_state:
-                elapsed_s = (
-                    time.ticks_diff(time.ticks_ms(), self.manual_run_start) // 1000
-                )
-                new_timer = f"{elapsed_s // 60:02d}:{elapsed_s % 60:02d}"
-                if new_timer != self._last_timer:
-                    self._last_timer = new_timer
-                    v_timer.set_text(new_timer)
+                r_timer.show(time.ticks_diff(now, self.manual_run_start) // 1000)
+            return True
+        return False
@@ -1,20 +1,12 @@
 import time
-import lvgl as lv
 
 from ui_common import (
     UIBase,
-    WHEEL_CIRCUMFERENCE,
+    Readout,
+    WHEEL_CIRCUMFERENCE_UM,
     DISP_WIDTH,
-    DISP_HEIGHT,
     MARGIN,
     TILE_H,
-    COL_BCKGND,
-    COL_TILE,
-    COL_BORDER,
-    COL_TEXT,
-    COL_SEL_TEXT,
-    COL_SEL_BCKGND,
-    COL_EDIT_BCKGND,
     VALUE_UPDATE_MS,
 )
 
@@ -27,14 +19,17 @@ class SpeedScreen(UIBase):
     Row 2: [kph] : read-only live value
     """
 
-    def __init__(self, display):
-        super().__init__(display)
+    def __init__(
+        self, display, gc_manager=None, renderer=None, telemetry=None, stream=None
+    ):
+        super().__init__(display, gc_manager, renderer, telemetry, stream)
 
         self.previous_disp_update_time = time.ticks_ms()
 
-        self._last_rpm = ""
-        self._last_ms = ""
-        self._last_kph = ""
+        # Widget tree, built on the first show()
+        self.scrn = None
+        self._back_fill = None
+        self._readouts = None
 
     def _row_y(self, row):
         return 2 * MARGIN + row * (MARGIN + TILE_H)
@@ -42,12 +37,22 @@ class SpeedScreen(UIBase):
     # ── Public entry point ────────────────────────────────────────────
 
     def show(self, wheel_sensor, enc_btn):
-        self._build_gui(wheel_sensor, enc_btn)
-
-    def _build_gui(self, wheel_sensor, enc_btn):
-        self._clear_screen()
-        scrn = lv.screen_active()
-        scrn.set_style_bg_color(COL_BCKGND, 0)
+        self._begin_transition()
+        if self.scrn is None:
+            self._build_gui()
+        self._reset_values()
+        self._load_screen(self.scrn, "Speed")
+        self._run_loop(wheel_sensor, enc_btn, self._back_fill, *self._readouts)
+
+    def _reset_values(self):
+        """Put the live values back to their starting state"""
+        self._back_fill.set_width(1)
+        for readout in self._readouts:
+            readout.reset()
+            readout.show(0)
+
+    def _build_gui(self):
+        scrn = self._new_screen()
         back_fill = self._make_back_bar(scrn)
 
         # Row 0: RPM
@@ -71,9 +76,15 @@ class SpeedScreen(UIBase):
         self._tile_key(t_kph, "Speed (kph)")
         v_kph = self._tile_val(t_kph, "0")
 
-        self._run_loop(wheel_sensor, enc_btn, back_fill, v_rpm, v_ms, v_kph)
+        self.scrn = scrn
+        self._back_fill = back_fill
+        self._readouts = (
+            Readout(v_rpm),
+            Readout(v_ms, decimals=1),
+            Readout(v_kph, decimals=1),
+        )
 
-    def _run_loop(self, wheel_sensor, enc_btn, back_fill, v_rpm, v_ms, v_kph):
+    def _run_loop(self, wheel_sensor, enc_btn, back_fill, r_rpm, r_ms, r_kph):
 
         press_ms = 0
 
@@ -83,32 +94,28 @@ class SpeedScreen(UIBase):
                 self._wait_btn_release(enc_btn)
                 return
 
-            wheel_sensor.update_pulse_count()
-            self._update_readouts(wheel_sensor, v_rpm, v_ms, v_kph, VALUE_UPDATE_MS)
+            refreshed = self._update_readouts(
+                wheel_sensor, r_rpm, r_ms, r_kph, VALUE_UPDATE_MS
+            )
+            self._render()
+            if refreshed:
+                self._idle()  # Until the next refresh is the longest idle gap
 
-    def _update_readouts(self, wheel_sensor, v_rpm, v_ms, v_kph, delay_ms):
-        """Refresh all live-value labels only if they've changed and it's been more than delay ms since last update"""
+    def _update_readouts(self, wheel_sensor, r_rpm, r_ms, r_kph, delay_ms):
+        """
+        Refresh the live values every delay_ms. Labels are only redrawn when the displayed
+        digits change. Returns True if it was time to refresh.
+        """
 
         now = time.ticks_ms()
         if time.ticks_diff(now, self.previous_disp_update_time) > delay_ms:
             self.previous_disp_update_time = now
 
-            new_rpm = f"{wheel_sensor.get_rpm_1s():d}"
-            if new_rpm != self._last_rpm:
-                self._last_rpm = new_rpm
-                v_rpm.set_text(new_rpm)
-
-            wheel_hz = wheel_sensor.get_hz_1s()
-            wheel_ms = wheel_hz * WHEEL_CIRCUMFERENCE
-
-            new_ms = f"{wheel_ms:.1f}"
-            if new_ms != self._last_ms:
-                self._last_ms = new_ms
-                v_ms.set_text(new_ms)
-
-            wheel_kph = wheel_ms * 3.6
+            r_rpm.show(wheel_sensor.get_rpm_1s())
 
-            new_kph = f"{wheel_kph:.1f}"
-            if new_kph != self._last_kph:
-                self._last_ms = new_kph
-                v_kph.set_text(new_kph)
+            # Wheel surface speed in um/s, shown in tenths of m/s and kph
+            wheel_um_s = wheel_sensor.get_hz_1s() * WHEEL_CIRCUMFERENCE_UM
+            r_ms.show((wheel_um_s + 50000) // 100000)
+            r_kph.show((wheel_um_s * 36 + 500000) // 1000000)
+            return True
+        return False
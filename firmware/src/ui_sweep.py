@@ -0,0 +1,375 @@
+import time
+import lvgl as lv
+
+from ui_common import (
+    UIBase,
+    Readout,
+    SWEEP_STEP_MIN_MV,
+    SWEEP_STEP_MAX_MV,
+    SWEEP_STEP_DEFAULT_MV,
+    DISP_WIDTH,
+    DISP_HEIGHT,
+    MARGIN,
+    TILE_H,
+    TILE_NORMAL,
+    TILE_SELECTED,
+    TILE_EDITING,
+    VALUE_UPDATE_MS,
+)
+from voltage_sweep import (
+    VoltageSweep,
+    PATTERN_UP,
+    PATTERN_UP_DOWN,
+    PATTERN_NAMES,
+    FLAG_TIMEOUT,
+)
+
+
+class SweepScreen(UIBase):
+    """
+    Automated voltage sweep screen, runs a VoltageSweep and shows each point as it settles.
+
+    Row 0: [PT n/N] | [SET]   : read-only live value
+    Row 1: [RPM] | [I]        : read-only live value
+    Row 2: [last result]      : updated as each point is recorded
+    Row 3: [STEP] | [MODE]    : nav 0 | nav 1
+    Row 4: [START/STOP]       : nav 2
+
+    A current trip stops the sweep and shows its reason on the START tile until a press
+    acknowledges it, the points recorded so far are kept.
+    """
+
+    def __init__(
+        self, display, gc_manager=None, renderer=None, telemetry=None, stream=None
+    ):
+        super().__init__(display, gc_manager, renderer, telemetry, stream)
+        self.step_mv = SWEEP_STEP_DEFAULT_MV
+        self.pattern = PATTERN_UP
+        self.sweep = None  # Made on the first show(), it needs the motor
+        self.trip_name = ""  # MotorControl.TRIP_NAMES entry on show, until acknowledged
+        self.previous_disp_update_time = time.ticks_ms()
+
+        # Widget tree, built on the first show()
+        self.scrn = None
+        self._back_fill = None
+        self._items = None
+        self._readouts = None
+        self._v_point = None
+        self._v_result = None
+
+    # ── Private helpers ───────────────────────────────────────────────
+
+    def _param_str(self, key):
+        if key == "STEP":
+            return f"{self.step_mv}mV"
+        if key == "MODE":
+            return PATTERN_NAMES[self.pattern]
+        return ""
+
+    def _redraw_tiles(self, items, sel, editing=False):
+        """Move the selection / editing state to tile sel, only changed tiles redraw"""
+        for i in range(len(items)):
+            if i != sel:
+                state = TILE_NORMAL
+            elif editing:
+                state = TILE_EDITING
+            else:
+                state = TILE_SELECTED
+            self._set_tile_state(items[i][0], state)
+
+    def _redraw_params(self, items):
+        """Refresh the STEP / MODE / START tile texts after a setting changes"""
+        items[0][2].set_text(self._param_str("STEP"))
+        items[1][2].set_text(self._param_str("MODE"))
+        if self.sweep.running():
+            text = lv.SYMBOL.STOP + " STOP"
+        elif self.trip_name:
+            text = lv.SYMBOL.WARNING + " " + self.trip_name
+        else:
+            text = lv.SYMBOL.PLAY + " START"
+        items[2][2].set_text(text)
+
+    def _redraw_progress(self):
+        """Point counter and the last recorded result, only when a point changes"""
+        sweep = self.sweep
+        shown = sweep.index + 1 if sweep.running() else sweep.count
+        self._v_point.set_text(f"{shown}/{len(sweep.points)}")
+        if sweep.done():
+            self._v_result.set_text(
+                f"Done, {sweep.count} points in {sweep.elapsed_ms() / 1000:.1f}s"
+            )
+        elif sweep.count:
+            set_mv, bus_mv, ma, rpm, settle_ms, flags = sweep.result(sweep.count - 1)
+            self._v_result.set_text(
+                f"{set_mv / 1000:.2f}V {rpm}rpm {ma}mA "
+                + ("timeout" if flags & FLAG_TIMEOUT else f"{settle_ms / 1000:.1f}s")
+            )
+        else:
+            self._v_result.set_text("-")
+
+    def _half_tile_x(self, col):
+        """Left edge x for a half-width tile in the given column (0 or 1)."""
+        half_w = int((DISP_WIDTH - 3 * MARGIN) / 2)
+        return MARGIN + col * (half_w + MARGIN)
+
+    def _half_tile_w(self):
+        return int((DISP_WIDTH - 3 * MARGIN) / 2)
+
+    def _row_y(self, row):
+        return 2 * MARGIN + row * (MARGIN + TILE_H)
+
+    # ── Public entry point ────────────────────────────────────────────
+
+    def show(self, motor, rotary, enc_btn):
+        self._begin_transition()
+        if self.sweep is None:
+            self.sweep = VoltageSweep(motor, step_mv=self.step_mv, pattern=self.pattern)
+        if self.scrn is None:
+            self._build_gui()
+        self.trip_name = motor.TRIP_NAMES[motor.trip_reason]
+        self._reset_values()
+        self._load_screen(self.scrn, "Sweep")
+        self._run_loop(
+            motor, rotary, enc_btn, self._back_fill, self._items, self._readouts
+        )
+
+    def _reset_values(self):
+        """Put the live values and controls back to their starting state"""
+        self._back_fill.set_width(1)
+        for readout in self._readouts:
+            readout.reset()
+            readout.show(0)
+        self._redraw_params(self._items)
+        self._redraw_progress()
+
+    def _build_gui(self):
+        scrn = self._new_screen()
+        back_fill = self._make_back_bar(scrn)
+
+        # Row 0: point counter | set voltage
+        t_point = self._make_tile(
+            scrn, self._half_tile_x(0), self._row_y(0), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_point, "PT")
+        v_point = self._tile_val(t_point, "0/0")
+
+        t_set = self._make_tile(
+            scrn, self._half_tile_x(1), self._row_y(0), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_set, "SET")
+        v_set = self._tile_val(t_set, "0.00V")
+
+        # Row 1: RPM | current
+        t_rpm = self._make_tile(
+            scrn, self._half_tile_x(0), self._row_y(1), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_rpm, "RPM")
+        v_rpm = self._tile_val(t_rpm, "0")
+
+        t_amps = self._make_tile(
+            scrn, self._half_tile_x(1), self._row_y(1), self._half_tile_w(), TILE_H
+        )
+        self._tile_key(t_amps, "I")
+        v_amps = self._tile_val(t_amps, "0mA")
+
+        # Row 2: last result
+        t_result = self._make_tile(
+            scrn, MARGIN, self._row_y(2), DISP_WIDTH - 2 * MARGIN, TILE_H
+        )
+        v_result = lv.label(t_result)
+        v_result.set_text("-")
+        v_result.align(lv.ALIGN.LEFT_MID, 0, 0)
+
+        # Row 3: STEP | MODE
+        t_step = self._make_tile(
+            scrn,
+            self._half_tile_x(0),
+            self._row_y(3),
+            self._half_tile_w(),
+            TILE_H,
+            selectable=True,
+        )
+        k_step = self._tile_key(t_step, "STEP")
+        v_step = self._tile_val(t_step, self._param_str("STEP"))
+
+        t_mode = self._make_tile(
+            scrn,
+            self._half_tile_x(1),
+            self._row_y(3),
+            self._half_tile_w(),
+            TILE_H,
+            selectable=True,
+        )
+        k_mode = self._tile_key(t_mode, "MODE")
+        v_mode = self._tile_val(t_mode, self._param_str("MODE"))
+
+        # Row 4: START / STOP
+        start_h = DISP_HEIGHT - (3 * MARGIN + 4 * (MARGIN + TILE_H))
+        t_start_stop = self._make_tile(
+            scrn,
+            MARGIN,
+            self._row_y(4),
+            DISP_WIDTH - 2 * MARGIN,
+            start_h,
+            selectable=True,
+        )
+        v_start_stop = lv.label(t_start_stop)
+        v_start_stop.set_text(lv.SYMBOL.PLAY + " START")
+        v_start_stop.set_style_text_font(lv.font_montserrat_14, 0)
+        v_start_stop.align(lv.ALIGN.CENTER, 0, 0)
+
+        self.scrn = scrn
+        self._back_fill = back_fill
+        self._items = [
+            (t_step, k_step, v_step),
+            (t_mode, k_mode, v_mode),
+            (t_start_stop, None, v_start_stop),
+        ]
+        self._readouts = (
+            Readout(v_set, decimals=2, suffix="V"),
+            Readout(v_rpm),
+            Readout(v_amps, suffix="mA"),
+        )
+        self._v_point = v_point
+        self._v_result = v_result
+
+    def _run_loop(self, motor, rotary, enc_btn, back_fill, items, readouts):
+        sweep = self.sweep
+        rotary.set(
+            min_val=0,
+            max_val=len(items) - 1,
+            value=2,
+            incr=1,
+            range_mode=rotary.RANGE_BOUNDED,
+        )
+        sel = 2
+        prev_sel = -1
+        editing = False
+        press_ms = 0
+        was_running = sweep.running()
+        self._redraw_tiles(items, sel)
+
+        while True:
+            sel, prev_sel, editing = self._handle_rotary(
+                rotary, items, sel, prev_sel, editing
+            )
+
+            press_ms = self._update_back_bar(back_fill, enc_btn, press_ms)
+            if press_ms == -1:
+                self._on_long_press(rotary, items, sel, editing)
+                self._wait_btn_release(enc_btn)
+                return
+            elif press_ms == -2:
+                press_ms = 0
+                editing = self._on_short_press(rotary, items, sel, editing)
+
+            if sweep.update():
+                self._redraw_progress()
+            trip_name = motor.TRIP_NAMES[motor.trip_reason]
+            if trip_name != self.trip_name:  # Tripped, or acknowledged
+                self.trip_name = trip_name
+                self._redraw_params(items)
+            if sweep.running() != was_running:
+                was_running = sweep.running()
+                self._redraw_params(items)
+                self._redraw_progress()
+                if not was_running:
+                    sweep.report()
+            if self.telemetry is not None:
+                self._update_telemetry(motor)
+
+            refreshed = self._update_readouts(motor, readouts, VALUE_UPDATE_MS)
+            self._render()
+            if refreshed:
+                self._idle()  # Until the next refresh is the longest idle gap
+
+    def _on_long_press(self, rotary, items, sel, editing):
+        if editing:
+            rotary.set(
+                min_val=0,
+                max_val=len(items) - 1,
+                value=sel,
+                incr=1,
+                range_mode=rotary.RANGE_BOUNDED,
+            )
+        if self.sweep.running():
+            self.sweep.stop()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+
+    def _on_short_press(self, rotary, items, sel, editing):
+        """Handle a confirmed short press. Returns the new editing state."""
+        sweep = self.sweep
+        if editing:
+            editing = False
+            rotary.set(
+                min_val=0,
+                max_val=len(items) - 1,
+                value=sel,
+                incr=1,
+                range_mode=rotary.RANGE_BOUNDED,
+            )
+            sweep.configure(self.step_mv, self.pattern)
+            self._redraw_tiles(items, sel)
+            self._redraw_progress()
+        elif sel == 0 and not sweep.running():  # Step size
+            editing = True
+            rotary.set(
+                min_val=SWEEP_STEP_MIN_MV,
+                max_val=SWEEP_STEP_MAX_MV,
+                value=self.step_mv,
+                incr=50,
+                range_mode=rotary.RANGE_BOUNDED,
+            )
+            self._redraw_tiles(items, sel, editing=True)
+        elif sel == 1 and not sweep.running():  # Step pattern
+            self.pattern = (self.pattern + 1) % (PATTERN_UP_DOWN + 1)
+            sweep.configure(self.step_mv, self.pattern)
+            self._redraw_params(items)
+            self._redraw_progress()
+        elif sel == 2 and self.trip_name:
+            sweep.motor.clear_trip()  # Acknowledged, the loop redraws START
+        elif sel == 2:
+            if sweep.running():
+                sweep.stop()
+            else:
+                sweep.start()
+            # The loop sees the change and redraws
+        return editing
+
+    def _handle_rotary(self, rotary, items, sel, prev_sel, editing):
+        """Process rotary encoder movement. Returns updated (sel, prev_sel, editing)."""
+        rv = rotary.value()
+        if editing:
+            if sel == 0 and rv != self.step_mv:
+                self.step_mv = rv
+                items[0][2].set_text(self._param_str("STEP"))
+        else:
+            if rv != prev_sel:
+                sel = rv
+                prev_sel = sel
+                self._redraw_tiles(items, sel)
+        return sel, prev_sel, editing
+
+    def _update_telemetry(self, motor):
+        """Log each sweep until the motor has ramped down and braked at the end"""
+        if self.sweep.running():
+            if not self.telemetry.running:
+                self.telemetry.start()
+        elif self.telemetry.running and not motor.in_transition():
+            self.telemetry.stop()
+
+    def _update_readouts(self, motor, readouts, delay_ms):
+        """
+        Refresh the live values every delay_ms. Labels are only redrawn when the displayed
+        digits change. Returns True if it was time to refresh.
+        """
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.previous_disp_update_time) > delay_ms:
+            self.previous_disp_update_time = now
+            r_set, r_rpm, r_amps = readouts
+            r_set.show(motor.voltage_mv // 10)  # Part way through a ramp, in 10mV steps
+            r_rpm.show(motor.get_rpm_100ms())
+            r_amps.show(max(0, motor.get_current_100ms_ma()))
+            return True
+        return False
@@ -0,0 +1,184 @@
+from machine import Timer
+import array
+import math
+import time
+
+
+class VoltageRamp:
+    """
+    Slew limited PSU voltage ramp, stepped from a hardware timer.
+
+    The DAC codes for every step between min_mv and max_mv are worked out once at init, so
+    a step is an index change and a 3 byte DAC write from a reused buffer, with no float
+    maths or allocation in the timer callback. Targets snap to the step grid.
+
+    The slew rate sets the timer period and how many table steps each tick moves: up to
+    step_mv per ms it's one step every step_mv / slew_mv_per_ms ms, above that it's several
+    steps per 1ms tick. Rates between those round down, the ramp never slews faster than
+    asked. The timer only runs while the output is moving. With timer_id=None the caller
+    has to call step() every period_ms instead.
+
+    set_pace() overrides the slew rate from outside the timer, e.g. from the current
+    sampling, without restarting the timer. The pace is kept as steps per tick in 1/256ths
+    and accumulated each tick, so it can go from holding still up to max_steps_per_tick
+    with int maths only. set_pace(None) goes back to the configured slew rate.
+
+    Example:
+
+        ramp = VoltageRamp(psu, 500, 3000, step_mv=50, slew_mv_per_ms=50)
+        ramp.set_target(3000)  # Ramps in the background, 50mV every 1ms
+        ramp.voltage_mv  # Voltage currently set
+        ramp.get_time_to_target_ms()  # Expected time left
+        ramp.last_ramp_us  # Measured time the last completed ramp took
+        ramp.set_pace(120)  # 120mV/ms until the next set_pace(), 0 holds
+    """
+
+    def __init__(
+        self,
+        psu,
+        min_mv: int,
+        max_mv: int,
+        step_mv: int = 50,
+        slew_mv_per_ms: float = 50,
+        timer_id: int = 2,
+        max_steps_per_tick: int = 4,
+    ):
+        if max_mv <= min_mv or step_mv <= 0:
+            raise ValueError(f"Bad ramp range {min_mv}-{max_mv}mV in {step_mv}mV steps")
+        self.psu = psu
+        self.min_mv = min_mv
+        self.max_mv = max_mv
+        self.step_mv = step_mv
+        self.max_pace_q8 = max_steps_per_tick << 8
+        self.pace_q8 = None  # None for the slew rate, else steps per tick x 256
+        self._pace_acc = 0
+
+        n = (max_mv - min_mv) // step_mv + 1
+        self.codes = array.array("H", [0] * n)
+        for i in range(n):
+            self.codes[i] = psu.dac_code_for_mv(min_mv + i * step_mv)
+
+        self.index = 0
+        self.target_index = 0
+        self.running = False
+        self._ramp_start_us = time.ticks_us()
+        self.last_ramp_us = 0
+        self.last_ramp_steps = 0
+        self._ramp_from = 0
+
+        self.timer_id = timer_id
+        self.timer = None if timer_id is None else Timer(timer_id)
+        self.set_slew_rate(slew_mv_per_ms)
+
+    @property
+    def voltage_mv(self):
+        return self.min_mv + self.index * self.step_mv
+
+    @property
+    def target_mv(self):
+        return self.min_mv + self.target_index * self.step_mv
+
+    def snap_mv(self, voltage_mv: int):
+        """The voltage on the step grid that a target of voltage_mv ends up at"""
+        return self.min_mv + self._index_for(voltage_mv) * self.step_mv
+
+    def _index_for(self, voltage_mv):
+        voltage_mv = max(self.min_mv, min(self.max_mv, voltage_mv))
+        return (int(voltage_mv) - self.min_mv + self.step_mv // 2) // self.step_mv
+
+    def set_slew_rate(self, slew_mv_per_ms: float):
+        if slew_mv_per_ms <= 0:
+            raise ValueError(f"Slew rate must be positive, got {slew_mv_per_ms}mV/ms")
+        self.slew_mv_per_ms = slew_mv_per_ms
+        self.period_ms = max(1, math.ceil(self.step_mv / slew_mv_per_ms))
+        steps = int(slew_mv_per_ms * self.period_ms / self.step_mv)
+        self.steps_per_tick = max(1, steps)
+        if self.running:
+            self._start_timer()
+
+    def set_pace(self, slew_mv_per_ms: float):
+        """Slew at slew_mv_per_ms until told otherwise, 0 holds, None for the slew rate"""
+        if slew_mv_per_ms is None:
+            self.pace_q8 = None
+            return
+        pace = int(slew_mv_per_ms * self.period_ms * 256 / self.step_mv)
+        self.pace_q8 = max(0, min(self.max_pace_q8, pace))
+
+    def reset(self, voltage_mv: int):
+        """Jump straight to voltage_mv without ramping, only while the output is off"""
+        self._stop_timer()
+        self.index = self.target_index = self._index_for(voltage_mv)
+        self.psu.set_dac_code(self.codes[self.index])
+
+    def set_target(self, voltage_mv: int):
+        """Ramp towards voltage_mv, the measured time starts again if the target changes"""
+        target = self._index_for(voltage_mv)
+        if target == self.target_index:
+            return
+        self.target_index = target
+        if target == self.index:
+            self._stop_timer()
+            return
+        self._ramp_start_us = time.ticks_us()
+        self._ramp_from = self.index
+        if not self.running:
+            self._start_timer()
+
+    def at_target(self):
+        return self.index == self.target_index
+
+    def get_time_to_target_ms(self, voltage_mv: int = None):
+        """
+        Expected time until the output reaches voltage_mv (the current target by default) at
+        the configured slew rate, set_pace() can make it quicker or slower
+        """
+        target = self.target_index if voltage_mv is None else self._index_for(voltage_mv)
+        steps = abs(target - self.index)
+        ticks = (steps + self.steps_per_tick - 1) // self.steps_per_tick
+        return ticks * self.period_ms
+
+    def _start_timer(self):
+        self.running = True
+        if self.timer is not None:
+            self.timer.init(
+                period=self.period_ms, mode=Timer.PERIODIC, callback=self._on_tick
+            )
+
+    def _stop_timer(self):
+        self.running = False
+        if self.timer is not None:
+            self.timer.deinit()
+
+    # Below is called every timer tick
+    def _on_tick(self, timer):
+        self.step()
+
+    def step(self):
+        """Move one tick towards the target. Returns True while there is further to go."""
+        index = self.index
+        target = self.target_index
+        if index == target:
+            if self.running:
+                self._stop_timer()
+            return False
+        if self.pace_q8 is None:
+            steps = self.steps_per_tick
+        else:
+            acc = self._pace_acc + self.pace_q8
+            steps = acc >> 8
+            self._pace_acc = acc & 0xFF
+            if not steps:
+                return True  # Holding, or slower than a step a tick
+        if target > index:
+            index = min(index + steps, target)
+        else:
+            index = max(index - steps, target)
+        self.psu.set_dac_code(self.codes[index])
+        self.index = index
+
+        if index != target:
+            return True
+        self.last_ramp_us = time.ticks_diff(time.ticks_us(), self._ramp_start_us)
+        self.last_ramp_steps = abs(target - self._ramp_from)
+        self._stop_timer()
+        return False
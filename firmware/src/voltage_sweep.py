@@ -0,0 +1,232 @@
+import array
+import time
+from stats import Window
+
+# Step patterns
+PATTERN_UP = 0
+PATTERN_DOWN = 1
+PATTERN_UP_DOWN = 2
+PATTERN_NAMES = ("UP", "DOWN", "UP-DN")
+
+# Sweep states
+IDLE = 0
+RAMPING = 1  # Waiting for the motor to reach the point's voltage
+SETTLING = 2  # Watching RPM and current until they're steady
+DONE = 3
+
+# Result flags
+FLAG_TIMEOUT = 0x01  # Hadn't settled by max_dwell_ms, the values are the last window's
+
+
+class VoltageSweep:
+    """
+    Steps the motor through a range of voltages and records the settled RPM and current
+    at each one, moving on as soon as the motor has settled rather than after a fixed
+    dwell.
+
+    update() is non-blocking, call it from the screen loop. Each point is set with
+    MotorControl.set_state(), once the ramp finishes the latest RPM and 100ms mean current
+    go into a Window of `window` samples every sample_ms. The point has settled when the
+    window is full and the standard deviation of both is within tol_pct of their mean, or
+    under their noise floors. The RPM floor defaults to the RPM sensor's resolution.
+    Points that haven't settled by max_dwell_ms are recorded anyway and flagged
+    FLAG_TIMEOUT.
+
+    Results go in a compact table of arrays, one entry per point: target_mv, bus_mv,
+    current_ma, rpm, settle_ms (time from setting the point to recording it) and flags.
+
+    Example:
+
+        sweep = VoltageSweep(motor, step_mv=250, pattern=PATTERN_UP_DOWN)
+        sweep.start()
+        while not sweep.done():
+            sweep.update()
+        sweep.report()  # The results table and total time
+    """
+
+    def __init__(
+        self,
+        motor,
+        direction: int = None,
+        start_mv: int = None,
+        stop_mv: int = None,
+        step_mv: int = 250,
+        pattern: int = PATTERN_UP,
+        window: int = 5,
+        sample_ms: int = 100,
+        tol_pct: int = 2,
+        rpm_floor: int = None,
+        current_floor_ma: int = 5,
+        max_dwell_ms: int = 10000,
+    ):
+        self.motor = motor
+        self.direction = motor.MOTOR_FORWARD if direction is None else direction
+        self.start_mv = motor.VOLTAGE_MIN_MV if start_mv is None else start_mv
+        self.stop_mv = motor.VOLTAGE_MAX_MV if stop_mv is None else stop_mv
+        self.sample_ms = sample_ms
+        self.tol_pct = tol_pct
+        if rpm_floor is None:
+            # One pulse in a 100ms gate, the reading's step size. Period based RPM from
+            # PulseCounter.MODE_PERIOD is much finer.
+            rpm = motor.rpm
+            gate = 60000 // (100 * rpm.pulses_per_rev)
+            rpm_floor = 50 if rpm.mode == rpm.MODE_PERIOD else gate
+        self.rpm_floor = rpm_floor
+        self.current_floor_ma = current_floor_ma
+        self.max_dwell_ms = max_dwell_ms
+        # RPM in tens so the window's sum of squares stays a small int
+        self.rpm_window = Window(window)
+        self.current_window = Window(window)
+
+        self.state = IDLE
+        self.start_ms = self.end_ms = time.ticks_ms()
+        self.configure(step_mv, pattern)
+
+    def configure(self, step_mv: int, pattern: int):
+        """Set the step and pattern, rebuilding the point list. Not while running."""
+        if step_mv < 50:
+            raise ValueError(f"Sweep step must be at least 50mV, got {step_mv}")
+        if pattern not in (PATTERN_UP, PATTERN_DOWN, PATTERN_UP_DOWN):
+            raise ValueError(f"Unknown sweep pattern {pattern}")
+        if self.running():
+            raise ValueError("Can't change a sweep while it's running")
+        self.step_mv = step_mv
+        self.pattern = pattern
+
+        lo = min(self.start_mv, self.stop_mv)
+        hi = max(self.start_mv, self.stop_mv)
+        up = list(range(lo, hi, step_mv)) + [hi]
+        if pattern == PATTERN_DOWN:
+            points = up[::-1]
+        elif pattern == PATTERN_UP_DOWN:
+            points = up + up[-2::-1]
+        else:
+            points = up
+        self.points = array.array("H", points)
+
+        # Results table, one entry per point
+        n = len(points)
+        self.bus_mv = array.array("H", [0] * n)
+        self.current_ma = array.array("h", [0] * n)
+        self.rpm = array.array("H", [0] * n)
+        self.settle_ms = array.array("H", [0] * n)
+        self.flags = array.array("B", [0] * n)
+        self.count = 0
+        self.index = 0
+        self.state = IDLE
+
+    # ── Run control ───────────────────────────────────────────────────
+
+    def start(self):
+        self.count = 0
+        self.start_ms = time.ticks_ms()
+        self.end_ms = self.start_ms
+        self._set_point(0)
+
+    def stop(self):
+        """Abort, or finish, and brake the motor"""
+        if self.state in (RAMPING, SETTLING):
+            self.end_ms = time.ticks_ms()
+        self.state = DONE if self.count == len(self.points) else IDLE
+        self.motor.set_state(self.motor.MOTOR_BRAKE, self.motor.VOLTAGE_MIN_MV)
+
+    def running(self):
+        return self.state in (RAMPING, SETTLING)
+
+    def done(self):
+        return self.state == DONE
+
+    def elapsed_ms(self):
+        """Time the sweep has taken, or took"""
+        if self.running():
+            return time.ticks_diff(time.ticks_ms(), self.start_ms)
+        return time.ticks_diff(self.end_ms, self.start_ms)
+
+    def _set_point(self, index):
+        self.index = index
+        self.point_start_ms = time.ticks_ms()
+        self.motor.set_state(self.direction, self.points[index])
+        self.state = RAMPING
+
+    # ── Below is called from the screen loop ──────────────────────────
+
+    def update(self):
+        """
+        Advance the sweep, returns True when a point has just been recorded so the
+        caller knows to refresh its results
+        """
+        state = self.state
+        if state != RAMPING and state != SETTLING:
+            return False
+        if self.motor.trip_reason:
+            self.stop()  # Tripped on over-current or stall, keep the points so far
+            return True
+        now = time.ticks_ms()
+        dwell = time.ticks_diff(now, self.point_start_ms)
+
+        if state == RAMPING:
+            if self.motor.in_transition() and dwell < self.max_dwell_ms:
+                return False
+            self.rpm_window.reset()
+            self.current_window.reset()
+            self.next_sample_ms = now
+            self.state = SETTLING
+
+        if time.ticks_diff(now, self.next_sample_ms) < 0:
+            return False
+        self.next_sample_ms = time.ticks_add(now, self.sample_ms)
+        self.rpm_window.add(self.motor.get_rpm() // 10)
+        self.current_window.add(self.motor.get_current_100ms_ma())
+
+        timed_out = dwell >= self.max_dwell_ms
+        if not (timed_out or self._settled()):
+            return False
+        self._record(dwell, FLAG_TIMEOUT if timed_out else 0)
+        if self.index + 1 < len(self.points):
+            self._set_point(self.index + 1)
+        else:
+            self.stop()
+        return True
+
+    def _settled(self):
+        if not self.rpm_window.full():
+            return False
+        return self._steady(self.rpm_window, self.rpm_floor // 10) and self._steady(
+            self.current_window, self.current_floor_ma
+        )
+
+    def _steady(self, window, floor):
+        limit = max(floor, abs(window.mean()) * self.tol_pct / 100)
+        return window.variance() <= limit * limit
+
+    def _record(self, dwell_ms, flags):
+        i = self.count
+        self.bus_mv[i] = self.motor.get_voltage_100ms_mv()
+        self.current_ma[i] = self.current_window.mean_int()
+        self.rpm[i] = self.rpm_window.mean_int() * 10
+        self.settle_ms[i] = min(dwell_ms, 0xFFFF)
+        self.flags[i] = flags
+        self.count = i + 1
+
+    def result(self, i):
+        """(target_mv, bus_mv, current_ma, rpm, settle_ms, flags) of recorded point i"""
+        return (
+            self.points[i],
+            self.bus_mv[i],
+            self.current_ma[i],
+            self.rpm[i],
+            self.settle_ms[i],
+            self.flags[i],
+        )
+
+    def report(self):
+        """Print the results table and the time the sweep took"""
+        print("set_mv  bus_mv  mA     rpm    settle_ms")
+        for i in range(self.count):
+            set_mv, bus_mv, ma, rpm, settle, flags = self.result(i)
+            timeout = " timeout" if flags & FLAG_TIMEOUT else ""
+            print(f"{set_mv:6} {bus_mv:7} {ma:5} {rpm:7} {settle:9}{timeout}")
+        print(
+            f"{self.count}/{len(self.points)} points in {self.elapsed_ms()}ms, "
+            f"{PATTERN_NAMES[self.pattern]} in {self.step_mv}mV steps"
+        )
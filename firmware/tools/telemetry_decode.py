@@ -0,0 +1,255 @@
+"""
+Decode the framed telemetry stream from the tester's USB serial port.
+
+Reads frames sent by TelemetryStream (src/telemetry_stream.py) from a serial port, a
+captured file or stdin, and writes them to CSV or, with NumPy installed, an .npz of one
+array per field. Anything between frames, e.g. print output from the firmware, and any
+frame that fails its length or CRC check is skipped and decoding picks up at the next
+sync. A t_us column is added with ticks_us unwrapped into microseconds since the first
+frame, and the state byte is split into direction, over_temp, transition and trip, the
+MotorControl.TRIP_* reason the motor stopped on (0 none, 1 over-current, 2 stall).
+
+Usage:
+
+    python firmware/tools/telemetry_decode.py /dev/ttyACM0 --csv run.csv [--seconds 30]
+    python firmware/tools/telemetry_decode.py capture.bin --npz run.npz
+
+Serial ports need pyserial. Stop a live capture with Ctrl-C, the output is still written.
+"""
+
+import argparse
+import binascii
+import csv
+import os
+import struct
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from telemetry_stream import (  # noqa: E402
+    FRAME_SIZE,
+    PAYLOAD_FIELDS,
+    PAYLOAD_FORMAT,
+    PAYLOAD_SIZE,
+    STATE_DIRECTION_MASK,
+    STATE_OVER_TEMP,
+    STATE_TRANSITION,
+    STATE_TRIP_MASK,
+    STATE_TRIP_SHIFT,
+    SYNC,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import serial
+except ImportError:
+    serial = None
+
+# MicroPython's ticks_us() wraps at 2**30
+TICKS_PERIOD = 1 << 30
+
+STATE_COLUMNS = ("direction", "over_temp", "transition", "trip")
+TRIP_NAMES = ("", "OVER CURRENT", "STALL")  # MotorControl.TRIP_NAMES
+
+
+def decode_state(state):
+    """The state byte as (direction, over_temp, transition, trip) ints"""
+    return (
+        state & STATE_DIRECTION_MASK,
+        int(bool(state & STATE_OVER_TEMP)),
+        int(bool(state & STATE_TRANSITION)),
+        (state & STATE_TRIP_MASK) >> STATE_TRIP_SHIFT,
+    )
+
+
+class FrameDecoder:
+    """
+    Incremental decoder, feed() it bytes as they arrive and it returns the payloads of
+    the whole frames found so far. A partial frame at the end is kept for the next feed().
+
+    Example:
+
+        decoder = FrameDecoder()
+        for payload in decoder.feed(port.read(4096)):
+            values = struct.unpack(PAYLOAD_FORMAT, payload)
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0  # Bytes that weren't part of a good frame
+
+    def feed(self, data):
+        buf = self.buf
+        buf += data
+        payloads = []
+        pos = 0
+        end = len(buf)
+        while True:
+            found = buf.find(SYNC, pos)
+            if found < 0:
+                # Keep a trailing first sync byte, the second may be in the next read
+                keep = end - 1 if end > pos and buf[end - 1] == SYNC[0] else end
+                self.skipped_bytes += keep - pos
+                pos = keep
+                break
+            self.skipped_bytes += found - pos
+            pos = found
+            if end - pos < FRAME_SIZE:
+                break  # Wait for the rest of the frame
+            if buf[pos + 2] != PAYLOAD_SIZE:
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+            body_end = pos + 3 + PAYLOAD_SIZE
+            crc = buf[body_end] | (buf[body_end + 1] << 8)
+            if binascii.crc_hqx(buf[pos + 2 : body_end], 0xFFFF) != crc:
+                # Corrupt, or a sync pattern inside other data, resync one byte on
+                self.crc_errors += 1
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+            payloads.append(bytes(buf[pos + 3 : body_end]))
+            self.frames += 1
+            pos += FRAME_SIZE
+        del buf[:pos]
+        return payloads
+
+
+class _Unwrap:
+    """ticks_us values to microseconds since the first one, across wraps"""
+
+    def __init__(self):
+        self.last = None
+        self.total = 0
+
+    def __call__(self, ticks):
+        if self.last is not None:
+            self.total += (ticks - self.last) % TICKS_PERIOD
+        self.last = ticks
+        return self.total
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(("t_us",) + PAYLOAD_FIELDS + STATE_COLUMNS)
+        self.unwrap = _Unwrap()
+        self.trip = 0
+
+    def write(self, payloads):
+        rows = []
+        for payload in payloads:
+            values = struct.unpack(PAYLOAD_FORMAT, payload)
+            state = decode_state(values[-1])
+            if state[3]:
+                self.trip = state[3]
+            rows.append((self.unwrap(values[0]),) + values + state)
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class NpzWriter:
+    """Keeps the raw payloads and converts them in one go with a structured dtype"""
+
+    def __init__(self, path):
+        if np is None:
+            raise RuntimeError("Writing .npz needs NumPy, use --csv instead")
+        self.path = path
+        self.raw = bytearray()
+        self.dtype = np.dtype(
+            [
+                (name, "<" + code)
+                for name, code in zip(PAYLOAD_FIELDS, PAYLOAD_FORMAT.lstrip("<"))
+            ]
+        )
+        assert self.dtype.itemsize == PAYLOAD_SIZE
+        self.trip = 0
+
+    def write(self, payloads):
+        self.raw += b"".join(payloads)
+
+    def close(self):
+        frames = np.frombuffer(self.raw, dtype=self.dtype)
+        ticks = frames["ticks_us"].astype(np.int64)
+        steps = np.diff(ticks) % TICKS_PERIOD
+        t_us = np.concatenate(([0], np.cumsum(steps))) if len(ticks) else ticks
+        arrays = {name: frames[name] for name in PAYLOAD_FIELDS}
+        state = frames["state"]
+        arrays["direction"] = state & STATE_DIRECTION_MASK
+        arrays["over_temp"] = (state & STATE_OVER_TEMP) != 0
+        arrays["transition"] = (state & STATE_TRANSITION) != 0
+        arrays["trip"] = (state & STATE_TRIP_MASK) >> STATE_TRIP_SHIFT
+        tripped = arrays["trip"][arrays["trip"] != 0]
+        self.trip = int(tripped[-1]) if len(tripped) else 0
+        np.savez(self.path, t_us=t_us, **arrays)
+
+
+def _open_source(source):
+    """A read(n) callable for a serial port, a file, or - for stdin"""
+    if source == "-":
+        stream = sys.stdin.buffer
+        return lambda n: stream.read1(n), stream
+    if os.path.isfile(source):
+        f = open(source, "rb")
+        return f.read, f
+    if serial is None:
+        raise RuntimeError(f"{source} isn't a file and pyserial isn't installed")
+    # USB CDC ignores the baud rate, the timeout lets Ctrl-C and --seconds through
+    port = serial.Serial(source, 115200, timeout=0.1)
+    return port.read, port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", help="serial port, captured file or - for stdin")
+    out = parser.add_mutually_exclusive_group(required=True)
+    out.add_argument("--csv", help="write frames to this CSV file")
+    out.add_argument("--npz", help="write one NumPy array per field to this .npz file")
+    parser.add_argument("--seconds", type=float, help="stop a live capture after this")
+    parser.add_argument("--chunk", type=int, default=4096, help="bytes per read")
+    args = parser.parse_args()
+    if args.npz and np is None:
+        parser.error("--npz needs NumPy, use --csv instead")
+
+    read, handle = _open_source(args.source)
+    writer = CsvWriter(args.csv) if args.csv else NpzWriter(args.npz)
+    decoder = FrameDecoder()
+    end = None if args.seconds is None else time.monotonic() + args.seconds
+    live = not os.path.isfile(args.source)
+    try:
+        while end is None or time.monotonic() < end:
+            data = read(args.chunk)
+            if not data:
+                if live and args.source != "-":
+                    continue  # Read timed out, nothing sent yet
+                break
+            writer.write(decoder.feed(data))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        handle.close()
+        writer.close()
+
+    print(
+        f"{decoder.frames} frames, {decoder.crc_errors} CRC errors, "
+        f"{decoder.skipped_bytes} bytes skipped",
+        file=sys.stderr,
+    )
+    if writer.trip:
+        print(f"Motor tripped on {TRIP_NAMES[writer.trip]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
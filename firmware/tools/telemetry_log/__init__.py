@@ -0,0 +1,21 @@
+"""
+Host side reader for the binary run logs TelemetryLogger writes to the tester's flash.
+
+    from telemetry_log import LogFile
+    log = LogFile("run_0001.bin")  # Memory mapped, nothing read yet
+    log.time_slice(2000, 12000)["rpm"].mean()
+
+Needs NumPy. Run python -m telemetry_log from firmware/tools for a summary or export,
+and python -m telemetry_log.characterize to fit motor parameters from runs, or
+telemetry_log.characterize.characterize() from Python.
+"""
+
+from .reader import LogFile, LogFormatError, dtype_from_format, open_logs, read_header
+
+__all__ = [
+    "LogFile",
+    "LogFormatError",
+    "dtype_from_format",
+    "open_logs",
+    "read_header",
+]
@@ -0,0 +1,70 @@
+"""
+Summarise telemetry logs, or export a time range of one to .npy or CSV.
+
+Usage:
+
+    python -m telemetry_log logs/run_0001.bin [logs/run_0002.bin ...]
+    python -m telemetry_log logs/run_0001.bin --start-ms 2000 --end-ms 12000 --csv out.csv
+"""
+
+import argparse
+
+import numpy as np
+
+from .reader import LogFile
+
+
+def _summary(log):
+    print(log)
+    if not len(log):
+        return
+    for chunk_stats in _field_ranges(log):
+        print("    {:<14} {:>10} {:>10} {:>12.1f}".format(*chunk_stats))
+
+
+def _field_ranges(log):
+    """min, max and mean of each field, a chunk at a time so the file is never all in RAM"""
+    lo = {name: None for name in log.fields}
+    hi = dict(lo)
+    total = dict.fromkeys(log.fields, 0)
+    for chunk in log.chunks():
+        for name in log.fields:
+            column = chunk[name]
+            cmin, cmax = column.min(), column.max()
+            lo[name] = cmin if lo[name] is None else min(lo[name], cmin)
+            hi[name] = cmax if hi[name] is None else max(hi[name], cmax)
+            total[name] += int(column.sum(dtype=np.int64))
+    for name in log.fields:
+        yield name, int(lo[name]), int(hi[name]), total[name] / len(log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--start-ms", type=int)
+    parser.add_argument("--end-ms", type=int)
+    out = parser.add_mutually_exclusive_group()
+    out.add_argument("--npy", help="save the records in range as a structured .npy")
+    out.add_argument("--csv", help="save the records in range as CSV")
+    args = parser.parse_args()
+
+    if not (args.npy or args.csv):
+        for path in args.logs:
+            _summary(LogFile(path))
+        return
+    if len(args.logs) != 1:
+        parser.error("Export takes one log")
+
+    log = LogFile(args.logs[0])
+    records = log.time_slice(args.start_ms, args.end_ms)
+    if args.npy:
+        np.save(args.npy, records)
+    else:
+        np.savetxt(
+            args.csv, records, fmt="%d", delimiter=",", header=",".join(log.fields), comments=""
+        )
+    print(f"{len(records)} records written")
+
+
+if __name__ == "__main__":
+    main()
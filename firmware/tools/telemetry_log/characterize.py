@@ -0,0 +1,253 @@
+"""
+Motor characterisation from recorded runs, fitted for many motors at once with NumPy.
+
+Uses the steady state DC motor model, with the rail voltage from the INA219 as the motor
+voltage so the DRV8837's on resistance ends up in R:
+
+    V = R * I + Ke * w            (w in rad/s)
+    I = I0 + b * w                (free running, no load)
+
+The first fit uses every driven sample, ramps included, since start up inrush is what
+separates R from Ke. That needs the speed at the same time as the current, so it's taken
+from the edges field, the RPM sensor's running edge count, over a span centred on each
+sample. The logged rpm is a 100ms gated rate that lags by up to a whole gate and reads 0
+through most of the inrush, so logs without edges only fit on settled samples, which
+only separate R from Ke as far as the settled current varies (loaded runs). The second
+fit only uses settled samples, SETTLE_MS clear of a ramp or brake. From those:
+
+    Kv = 1 / Ke in rpm/V, Kt = Ke in N.m/A, friction torque = Kt * I0,
+    viscous drag = Kt * b, and the efficiency curve at a supply voltage.
+
+Samples from every run of a motor are pooled into one fit. All motors are fitted
+together from sums taken with np.bincount over one array of samples, so there's no Python
+loop per motor or per sample.
+
+Usage:
+
+    python -m telemetry_log.characterize logs/ [logs2/ ...] --csv motors.csv [--volts 3]
+
+Each directory of run_NNNN.bin logs is one motor, named after the directory. Log files
+given directly are a motor each.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from .reader import LogFile, open_logs
+
+FLAG_TRANSITION = 0x02  # telemetry.FLAG_TRANSITION
+DRIVEN = (2, 3)  # MotorControl.MOTOR_FORWARD, MOTOR_REVERSE
+EDGES_PER_REV = 1  # PulseCounter.pulses_per_rev of the motor's RPM sensor
+SPEED_SPAN_MS = 100  # Edge count span the speed is taken over, centred on the sample
+SETTLE_MS = 500  # After a ramp or brake before a sample counts as settled
+RPM_TO_RAD_S = 2 * np.pi / 60
+MIN_SPEED_SPREAD = 0.05  # Settled speeds' standard deviation over mean to fit drag
+
+SUMMARY_DTYPE = np.dtype(
+    [
+        ("motor", "U32"),
+        ("runs", "<i4"),
+        ("samples", "<i4"),
+        ("r_ohm", "<f4"),
+        ("kv_rpm_per_v", "<f4"),
+        ("kt_mnm_per_a", "<f4"),
+        ("i0_ma", "<f4"),
+        ("friction_unm", "<f4"),  # micro N.m, Mini 4WD motors are tiny
+        ("viscous_unm_per_krpm", "<f4"),
+        ("no_load_rpm", "<f4"),
+        ("stall_ma", "<f4"),
+        ("peak_eff", "<f4"),
+        ("peak_eff_rpm", "<f4"),
+        ("fit_rms_mv", "<f4"),
+    ]
+)
+
+
+def _speed(records):
+    """rad/s from the edge counts over SPEED_SPAN_MS centred on each record"""
+    t = records["t_ms"].astype(np.int64)
+    steps = np.diff(records["edges"].astype(np.int64)) & 0xFFFF  # Count wraps at 2^16
+    edges = np.concatenate(([0], np.cumsum(steps)))
+    lo = np.searchsorted(t, t - SPEED_SPAN_MS // 2)
+    hi = np.searchsorted(t, t + SPEED_SPAN_MS // 2, side="right") - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hz = (edges[hi] - edges[lo]) * 1000.0 / ((t[hi] - t[lo]) * EDGES_PER_REV)
+    return np.nan_to_num(hz) * 2 * np.pi
+
+
+def _samples(records):
+    """
+    Volts, amps, rad/s, a settled mask and a mask of those the R / Ke fit can use, for
+    the driven samples of a run's records
+    """
+    driven = np.isin(records["direction"], DRIVEN) & (records["bus_mv"] > 0)
+    t = records["t_ms"].astype(np.float64)
+    moving = ~driven | ((records["flags"] & FLAG_TRANSITION) != 0)
+    last_moved = np.maximum.accumulate(np.where(moving, t, -np.inf))
+    settled = (t - last_moved >= SETTLE_MS)[driven]
+    if "edges" in records.dtype.names:
+        w = _speed(records)[driven]
+        usable = np.ones(len(w), dtype=bool)
+    else:
+        w = records["rpm"][driven] * RPM_TO_RAD_S
+        usable = settled
+    r = records[driven]
+    v = r["bus_mv"] / 1000.0
+    i = r["current_ma"] / 1000.0
+    return v, i, w, settled, usable
+
+
+def fit(v, i, w, settled, usable, motor, motors: int):
+    """
+    Fit every motor at once. v, i, w, settled and usable are per sample, motor is the
+    index of the motor each sample belongs to. R and Ke are fitted on the usable samples.
+    Returns a dict of per motor arrays of r_ohm, ke, i0_a, b_a_per_rad_s, samples and
+    fit_rms_v, NaN where a motor had too little data.
+    """
+
+    def total(x, where=None):
+        weights = x if where is None else np.where(where, x, 0.0)
+        return np.bincount(motor, weights=weights, minlength=motors)
+
+    # V = R * I + Ke * w, least squares through the origin via the 2x2 normal equations
+    sii, siw, sww = total(i * i, usable), total(i * w, usable), total(w * w, usable)
+    siv, swv = total(i * v, usable), total(w * v, usable)
+    det = sii * sww - siw * siw
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (siv * sww - swv * siw) / det
+        ke = (sii * swv - siw * siv) / det
+
+        # I = I0 + b * w over the settled samples, ordinary least squares
+        n = total(np.ones_like(w), settled)
+        sw, si = total(w, settled), total(i, settled)
+        sww_s, swi_s = total(w * w, settled), total(w * i, settled)
+        var_w = n * sww_s - sw * sw
+        b = (n * swi_s - sw * si) / var_w
+        i0 = (si - b * sw) / n
+        # Under MIN_SPEED_SPREAD the slope is just rpm noise, so the motor's settled
+        # current is all no load current
+        flat = ~np.isfinite(b) | (var_w <= (MIN_SPEED_SPREAD * sw) ** 2)
+        b = np.where(flat, 0.0, b)
+        i0 = np.where(flat, si / n, i0)
+
+        residual = v - r[motor] * i - ke[motor] * w
+        rms = np.sqrt(
+            total(residual * residual, usable) / total(np.ones_like(v), usable)
+        )
+
+    bad = ~(det > 0) | ~(r > 0) | ~(ke > 0)
+    r = np.where(bad, np.nan, r)
+    ke = np.where(bad, np.nan, ke)
+    return {
+        "r_ohm": r,
+        "ke": ke,
+        "i0_a": i0,
+        "b_a_per_rad_s": b,
+        "samples": np.bincount(motor, minlength=motors),
+        "fit_rms_v": rms,
+    }
+
+
+def efficiency_curve(params, volts: float, points: int = 101):
+    """
+    Speed (rpm) and efficiency arrays, motors by points, from stall to no load at volts,
+    for the parameters returned by fit()
+    """
+    r = params["r_ohm"][:, None]
+    ke = params["ke"][:, None]
+    i0 = params["i0_a"][:, None]
+    b = params["b_a_per_rad_s"][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # No load: V = R * (I0 + b * w) + Ke * w
+        w_nl = (volts - r * i0) / (ke + r * b)
+        w = np.linspace(0.0, 1.0, points)[None, :] * np.maximum(w_nl, 0.0)
+        current = (volts - ke * w) / r
+        p_out = ke * (current - i0 - b * w) * w
+        eff = np.clip(p_out / (volts * current), 0.0, 1.0)
+    return w / RPM_TO_RAD_S, eff
+
+
+def summarise(names, runs, params, volts: float = 3.0):
+    """A SUMMARY_DTYPE row per motor from fit() results, rated at volts"""
+    rpm, eff = efficiency_curve(params, volts)
+    r, ke = params["r_ohm"], params["ke"]
+    kt = ke  # SI units, Kt in N.m/A equals Ke in V.s/rad
+    peak = np.nanargmax(np.where(np.isfinite(eff), eff, -1.0), axis=1)
+    rows = np.arange(len(names))
+
+    out = np.zeros(len(names), dtype=SUMMARY_DTYPE)
+    out["motor"] = names
+    out["runs"] = runs
+    out["samples"] = params["samples"]
+    out["r_ohm"] = r
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["kv_rpm_per_v"] = 1.0 / (ke * RPM_TO_RAD_S)
+        out["stall_ma"] = volts / r * 1000
+    out["kt_mnm_per_a"] = kt * 1000
+    out["i0_ma"] = params["i0_a"] * 1000
+    out["friction_unm"] = kt * params["i0_a"] * 1e6
+    out["viscous_unm_per_krpm"] = kt * params["b_a_per_rad_s"] * 1000 * RPM_TO_RAD_S * 1e6
+    out["no_load_rpm"] = rpm[:, -1]
+    out["peak_eff"] = eff[rows, peak]
+    out["peak_eff_rpm"] = rpm[rows, peak]
+    out["fit_rms_mv"] = params["fit_rms_v"] * 1000
+    return out
+
+
+def characterize(motors, volts: float = 3.0):
+    """
+    Summary rows for a dict of motor name to a list of record arrays, e.g.
+    LogFile.records, one row per motor in the dict's order
+    """
+    names = list(motors)
+    parts = [[], [], [], [], []]
+    index = []
+    for m, name in enumerate(names):
+        for records in motors[name]:
+            for part, values in zip(parts, _samples(records)):
+                part.append(values)
+            index.append(np.full(len(part[-1]), m, dtype=np.intp))
+    v, i, w, settled, usable = (
+        np.concatenate(p) if p else np.zeros(0, dtype=bool if k >= 3 else float)
+        for k, p in enumerate(parts)
+    )
+    motor = np.concatenate(index) if index else np.zeros(0, dtype=np.intp)
+    params = fit(v, i, w, settled, usable, motor, len(names))
+    runs = [len(motors[name]) for name in names]
+    return summarise(names, runs, params, volts)
+
+
+def _load(paths):
+    """Motor name to the records of its logs, a directory per motor or a file each"""
+    motors = {}
+    for path in paths:
+        if os.path.isdir(path):
+            name = os.path.basename(os.path.normpath(path))
+            motors[name] = [log.records for log in open_logs(path)]
+        else:
+            name = os.path.splitext(os.path.basename(path))[0]
+            motors[name] = [LogFile(path).records]
+    return motors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="+", help="a directory of logs per motor, or logs")
+    parser.add_argument("--volts", type=float, default=3.0, help="rate the motors at")
+    parser.add_argument("--csv", help="write the summary here as well as printing it")
+    args = parser.parse_args()
+
+    summary = characterize(_load(args.paths), args.volts)
+    header = ",".join(SUMMARY_DTYPE.names)
+    fmt = ["%s", "%d", "%d"] + ["%.4g"] * (len(SUMMARY_DTYPE.names) - 3)
+    if args.csv:
+        np.savetxt(args.csv, summary, fmt=fmt, delimiter=",", header=header, comments="")
+    print(header)
+    for row in summary:
+        print(",".join(f % value for f, value in zip(fmt, row)))
+
+
+if __name__ == "__main__":
+    main()
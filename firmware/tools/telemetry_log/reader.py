@@ -0,0 +1,194 @@
+import os
+import struct
+import sys
+
+import numpy as np
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src"
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from telemetry import HEADER_FORMAT, MAGIC, VERSION  # noqa: E402
+
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+
+class LogFormatError(ValueError):
+    """The file isn't a telemetry log this reader understands"""
+
+
+def dtype_from_format(fmt, names):
+    """NumPy structured dtype with the same layout as a struct format, one field per name"""
+    order = fmt[0] if fmt[0] in "<>=!@" else "@"
+    byteorder = {"<": "<", ">": ">", "!": ">", "=": "=", "@": "="}[order]
+    codes = fmt.lstrip("<>=!@")
+    if len(codes) != len(names) or not codes.isalpha():
+        raise LogFormatError(f"Record format {fmt!r} doesn't match fields {names}")
+    return np.dtype([(name, byteorder + code) for name, code in zip(names, codes)])
+
+
+def read_header(f):
+    """
+    Parse a log header from an open binary file, returns a dict of header_size,
+    record_size, period_ms, record_format, fields and dtype
+    """
+    raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise LogFormatError("File too short for a telemetry log header")
+    magic, version, header_size, record_size, period_ms = struct.unpack(HEADER_FORMAT, raw)
+    if magic != MAGIC:
+        raise LogFormatError(f"Bad magic {magic!r}, expected {MAGIC!r}")
+    if version > VERSION:
+        raise LogFormatError(f"Log version {version} is newer than this reader ({VERSION})")
+    rest = f.read(header_size - HEADER_SIZE)
+    if len(rest) < header_size - HEADER_SIZE:
+        raise LogFormatError("Truncated header")
+    fmt_len = rest[0]
+    fmt = rest[1 : 1 + fmt_len].decode()
+    (names_len,) = struct.unpack_from("<H", rest, 1 + fmt_len)
+    start = 3 + fmt_len
+    names = tuple(rest[start : start + names_len].decode().split(","))
+
+    dtype = dtype_from_format(fmt, names)
+    if dtype.itemsize != record_size:
+        raise LogFormatError(
+            f"Record format {fmt!r} is {dtype.itemsize} bytes, header says {record_size}"
+        )
+    return {
+        "header_size": header_size,
+        "record_size": record_size,
+        "period_ms": period_ms,
+        "record_format": fmt,
+        "fields": names,
+        "dtype": dtype,
+    }
+
+
+class LogFile:
+    """
+    A telemetry log written by TelemetryLogger, memory mapped as a NumPy structured array.
+
+    Opening only reads the header and maps the records, nothing else is read until it's
+    used, so opening a log of any size is near instant and the OS pages records in and
+    out as they're touched. records is a read only, zero copy view of the whole file with
+    one field per RECORD_FIELDS name. A partial record at the end, e.g. from a power cut
+    mid write, is ignored.
+
+    chunks() walks a big log a fixed number of records at a time, and time_slice() finds
+    a range of t_ms through a sparse index of every index_stride'th timestamp, reading
+    only the index and the two index blocks either end instead of the whole t_ms column.
+    t_ms must rise through the file, which it does for runs under 6 days.
+
+    Example:
+
+        log = LogFile("logs/run_0001.bin")
+        log.records["current_ma"].max()
+        for chunk in log.chunks(1 << 20):
+            total += chunk["current_ma"].sum(dtype=np.int64)
+        settled = log.time_slice(2000, 12000)  # t_ms 2s up to 12s
+    """
+
+    def __init__(self, path, index_stride: int = 4096):
+        if index_stride < 1:
+            raise ValueError(f"Index stride must be at least 1, got {index_stride}")
+        self.path = path
+        self.index_stride = index_stride
+        with open(path, "rb") as f:
+            header = read_header(f)
+        self.header_size = header["header_size"]
+        self.record_size = header["record_size"]
+        self.period_ms = header["period_ms"]
+        self.record_format = header["record_format"]
+        self.fields = header["fields"]
+        self.dtype = header["dtype"]
+
+        self.file_size = os.path.getsize(path)
+        count = (self.file_size - self.header_size) // self.record_size
+        if count:
+            self.records = np.memmap(
+                path, dtype=self.dtype, mode="r", offset=self.header_size, shape=(count,)
+            )
+        else:
+            self.records = np.empty(0, dtype=self.dtype)  # mmap can't map nothing
+        self._index = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def __repr__(self):
+        return (
+            f"LogFile({self.path!r}, {len(self)} records of {self.record_size} bytes, "
+            f"{self.duration_ms()}ms)"
+        )
+
+    def duration_ms(self):
+        """Time from the first to the last record"""
+        if not len(self):
+            return 0
+        t = self.records["t_ms"]
+        return int(t[-1]) - int(t[0])
+
+    def chunks(self, size: int = 1 << 20, start: int = 0, stop: int = None):
+        """Zero copy views of size records at a time, from record start up to stop"""
+        if size < 1:
+            raise ValueError(f"Chunk size must be at least 1, got {size}")
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop, size):
+            yield self.records[i : min(i + size, stop)]
+
+    # ── Time index ────────────────────────────────────────────────────
+
+    @property
+    def index(self):
+        """t_ms of every index_stride'th record, built on first use"""
+        if self._index is None:
+            self._index = np.array(self.records["t_ms"][:: self.index_stride])
+        return self._index
+
+    def find_ms(self, t_ms):
+        """Position of the first record at or after t_ms, like np.searchsorted"""
+        n = len(self)
+        if not n:
+            return 0
+        stride = self.index_stride
+        # Index entry i is record i * stride, the answer lies in the block before the
+        # first entry at or after t_ms
+        block = int(np.searchsorted(self.index, t_ms, side="left"))
+        if block == 0:
+            return 0
+        lo = (block - 1) * stride
+        hi = min(block * stride, n)
+        t = self.records["t_ms"][lo:hi]
+        return lo + int(np.searchsorted(t, t_ms, side="left"))
+
+    def time_slice(self, start_ms=None, end_ms=None):
+        """Zero copy view of the records with start_ms <= t_ms < end_ms"""
+        first = 0 if start_ms is None else self.find_ms(start_ms)
+        last = len(self) if end_ms is None else self.find_ms(end_ms)
+        return self.records[first:max(first, last)]
+
+    def close(self):
+        """Drop the mapping, views taken from records keep it alive until they go"""
+        self.records = np.empty(0, dtype=self.dtype)
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_logs(directory, prefix: str = "run_", **kwargs):
+    """LogFile for every run_NNNN.bin in directory, in run order"""
+    names = sorted(
+        name
+        for name in os.listdir(directory)
+        if name.startswith(prefix) and name.endswith(".bin")
+    )
+    return [LogFile(os.path.join(directory, name), **kwargs) for name in names]